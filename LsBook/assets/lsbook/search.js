@@ -0,0 +1,411 @@
+/**
+ * 搜索
+ *
+ * 查询构建时生成的倒排索引，格式参见 LsBook/renderer/search_index.py：
+ * 搜索框获得焦点时读取清单 search_index.json，查询时只获取需要的词分片与页面分片。
+ * 分词与 search_index.py 一致：中日韩单字查询匹配单字，多字查询按相邻两字切分，其它文字按单词切分。
+ */
+(function () {
+  var VERSION = 2;
+  var MAX_WORD_SIZE = 32;
+  // 最后一个词按前缀匹配时最多展开的词数
+  var MAX_PREFIX_TERMS = 50;
+  // 最多显示的结果数
+  var MAX_RESULTS = 100;
+  var TOKEN_RE = /([\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af]+)|([0-9a-z_\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u024f\u0370-\u03ff\u0400-\u04ff]+)/g;
+
+  // 清单
+  var MANIFEST = null;
+  // 分片文件名 -> 读取中的分片
+  var LOADING = {};
+  // 分片文件名 -> 分片
+  var SHARDS = {};
+  // 词分片文件名 -> 排序后的词，用于前缀匹配
+  var TERMS = {};
+  // 最近一次查询的序号
+  var LATEST = 0;
+  var usePushState = (typeof window.history.pushState !== 'undefined');
+  var $body = $('body');
+
+  // 切分文本
+  function tokenize(text) {
+    var tokens = [];
+    var match, cjk, i;
+    TOKEN_RE.lastIndex = 0;
+    while ((match = TOKEN_RE.exec(text.toLowerCase())) !== null) {
+      if (match[2]) {
+        if (match[2].length <= MAX_WORD_SIZE) tokens.push({term: match[2], prefix: true});
+      } else {
+        cjk = match[1];
+        if (cjk.length === 1) {
+          // 索引包含每个单字，完全匹配即可找到所有出现位置
+          tokens.push({term: cjk, prefix: false});
+        } else {
+          for (i = 0; i < cjk.length - 1; i++) tokens.push({term: cjk.substr(i, 2), prefix: false});
+        }
+      }
+    }
+    return tokens;
+  }
+
+  // 读取 json：分片文件名携带内容哈希，允许浏览器缓存；清单文件名不变，每次从服务器读取
+  function getJSON(name, cache) {
+    return $.ajax({
+      url: lsbook.state.basePath + '/' + name,
+      dataType: 'json',
+      cache: cache
+    });
+  }
+
+  // 读取清单，只读取一次
+  function loadManifest() {
+    if (!MANIFEST) {
+      MANIFEST = getJSON('search_index.json', false).then(function (data) {
+        if (data.version !== VERSION) return $.Deferred().reject();
+        return data;
+      });
+      MANIFEST.fail(function () {
+        MANIFEST = null;
+      });
+    }
+    return MANIFEST;
+  }
+
+  // 读取分片，全部读取后完成
+  function loadShards(names) {
+    return $.when.apply($, names.map(function (name) {
+      if (SHARDS.hasOwnProperty(name)) return null;
+      if (!LOADING[name]) {
+        LOADING[name] = getJSON(name, true).then(function (data) {
+          SHARDS[name] = data;
+        });
+        LOADING[name].always(function () {
+          delete LOADING[name];
+        }).fail(function () {
+          // 分片不存在时清单已过期，下次查询重新读取
+          MANIFEST = null;
+        });
+      }
+      return LOADING[name];
+    }));
+  }
+
+  // 首个词不大于 term 的最后一个词分片的位置
+  function shardOf(manifest, term) {
+    var lo = 0, hi = manifest.terms.length - 1, mid;
+    while (lo < hi) {
+      mid = (lo + hi + 1) >> 1;
+      if (manifest.terms[mid][0] <= term) lo = mid;
+      else hi = mid - 1;
+    }
+    return lo;
+  }
+
+  // 查询词可能所在的词分片
+  function termShards(manifest, token) {
+    var first = shardOf(manifest, token.term);
+    var last = token.prefix ? shardOf(manifest, token.term + '\uffff') : first;
+    var names = [];
+    for (var i = first; i <= last; i++) names.push(manifest.terms[i][1]);
+    return names;
+  }
+
+  // 第一个不小于 term 的词的位置
+  function lowerBound(terms, term) {
+    var lo = 0, hi = terms.length, mid;
+    while (lo < hi) {
+      mid = (lo + hi) >> 1;
+      if (terms[mid] < term) lo = mid + 1;
+      else hi = mid;
+    }
+    return lo;
+  }
+
+  // 查询词对应的倒排列表：完全匹配，prefix 为真时加上以其开头的词
+  function expand(token) {
+    var postings = [];
+    token.shards.forEach(function (name) {
+      var shard = SHARDS[name];
+      if (!token.prefix) {
+        if (shard.hasOwnProperty(token.term)) postings.push(shard[token.term]);
+        return;
+      }
+      if (!TERMS[name]) TERMS[name] = Object.keys(shard).sort();
+      var terms = TERMS[name];
+      for (var i = lowerBound(terms, token.term); i < terms.length && postings.length < MAX_PREFIX_TERMS; i++) {
+        if (terms[i].lastIndexOf(token.term, 0) !== 0) break;
+        postings.push(shard[terms[i]]);
+      }
+    });
+    return postings;
+  }
+
+  // 页码 -> 得分：词频 * 逆文档频率
+  function score(postings, total) {
+    var scores = {};
+    postings.forEach(function (posting) {
+      var idf = Math.log(1 + total / (posting.length / 2));
+      for (var i = 0, doc = 0; i < posting.length; i += 2) {
+        doc += posting[i];
+        scores[doc] = (scores[doc] || 0) + posting[i + 1] * idf;
+      }
+    });
+    return scores;
+  }
+
+  // 查询：所有查询词都出现的页面，按得分排序，完成时返回 {count: 页面数量, pages: [[页面地址, 标题, 摘要], ...]}
+  function search(keyword) {
+    return loadManifest().then(function (manifest) {
+      var tokens = tokenize(keyword);
+      var seen = {};
+      var names = [];
+      tokens = tokens.filter(function (token, i) {
+        // 只有最后一个词按前缀匹配
+        token.prefix = token.prefix && i === tokens.length - 1;
+        if (seen[token.term]) return false;
+        seen[token.term] = true;
+        token.shards = termShards(manifest, token);
+        names = names.concat(token.shards);
+        return true;
+      });
+
+      return loadShards(names).then(function () {
+        var result = null;
+        tokens.forEach(function (token) {
+          var scores = score(expand(token), manifest.count);
+          if (result === null) {
+            result = scores;
+            return;
+          }
+          var merged = {};
+          for (var doc in result) {
+            if (scores.hasOwnProperty(doc)) merged[doc] = result[doc] + scores[doc];
+          }
+          result = merged;
+        });
+        var docs = Object.keys(result || {}).sort(function (a, b) {
+          return result[b] - result[a] || a - b;
+        });
+        var shown = docs.slice(0, MAX_RESULTS);
+        var pageShards = shown.map(function (doc) {
+          return manifest.pages[Math.floor(doc / manifest.page_size)];
+        });
+
+        return loadShards(pageShards).then(function () {
+          return {
+            count: docs.length,
+            pages: shown.map(function (doc, i) {
+              return SHARDS[pageShards[i]][doc % manifest.page_size];
+            })
+          };
+        });
+      });
+    });
+  }
+
+  function escapeHtml(text) {
+    return $('<div>').text(text).html();
+  }
+
+  function escapeRegExp(keyword) {
+    return String(keyword).replace(/([-.*+?^${}()|[\]/\\])/g, '\\$1');
+  }
+
+  // 摘要中标出查询词
+  function highlight(snippet, keyword) {
+    var words = keyword.split(/\s+/).filter(function (word) {
+      return word;
+    }).map(function (word) {
+      return escapeRegExp(escapeHtml(word));
+    });
+    var html = escapeHtml(snippet);
+    if (!words.length) return html;
+    return html.replace(new RegExp('(' + words.join('|') + ')', 'gi'), '<span class="search-highlight-keyword">$1</span>');
+  }
+
+  function displayResults(keyword, res) {
+    var $bookSearchResults = $('#book-search-results');
+    var $searchList = $bookSearchResults.find('.search-results-list');
+    var $searchTitle = $bookSearchResults.find('.search-results-title');
+
+    $bookSearchResults.addClass('open');
+    $bookSearchResults.toggleClass('no-results', res.count === 0);
+    $searchList.empty();
+    $searchTitle.find('.search-results-count').text(res.count);
+    $searchTitle.find('.search-query').text(keyword);
+
+    res.pages.forEach(function (page) {
+      var $li = $('<li>', {
+        'class': 'search-results-item'
+      });
+      var $title = $('<h3>');
+      var $link = $('<a>', {
+        'href': lsbook.state.basePath + '/' + page[0] + '?h=' + encodeURIComponent(keyword),
+        'text': page[1],
+        'data-is-search': 1
+      });
+
+      if ($link[0].href.split('?')[0] === window.location.href.split('?')[0]) {
+        $link[0].setAttribute('data-need-reload', 1);
+      }
+
+      $link.appendTo($title);
+      $title.appendTo($li);
+      $('<p>').html(highlight(page[2], keyword) + '...').appendTo($li);
+      $li.appendTo($searchList);
+    });
+    $('.body-inner').scrollTop(0);
+  }
+
+  function query(keyword) {
+    if (keyword == null || keyword.trim() === '') return;
+    var id = ++LATEST;
+    var display = function (res) {
+      // 忽略已被后续查询取代的结果
+      if (id === LATEST) displayResults(keyword, res);
+    };
+    search(keyword).then(display, function () {
+      // 清单已过期（分片已删除）：重新读取清单再查询一次，仍然失败时显示无结果
+      search(keyword).then(display, function () {
+        display({count: 0, pages: []});
+      });
+    });
+  }
+
+  function launchSearch(keyword) {
+    $body.addClass('with-search');
+    query(keyword);
+  }
+
+  function closeSearch() {
+    $body.removeClass('with-search');
+    $('#book-search-results').removeClass('open');
+  }
+
+  function bindSearch() {
+    // 根据输入内容启动查询
+    function handleUpdate() {
+      var keyword = $('#book-search-input input').val();
+
+      if (keyword.length === 0) {
+        closeSearch();
+        $('.page-inner').unmark();
+      } else {
+        launchSearch(keyword);
+      }
+    }
+
+    // 搜索框获得焦点时读取清单
+    $body.on('focus', '#book-search-input input', function () {
+      loadManifest();
+    });
+
+    $body.on('keyup', '#book-search-input input', function (e) {
+      if (e.keyCode === 13) {
+        if (usePushState) {
+          var uri = updateQueryString('q', $(this).val());
+          window.history.pushState({
+            path: uri
+          }, null, uri);
+        }
+      }
+      handleUpdate();
+    });
+
+    // Push to history on blur
+    $body.on('blur', '#book-search-input input', function (e) {
+      // 更新历史状态
+      if (usePushState) {
+        var uri = updateQueryString('q', $(this).val());
+        window.history.pushState({
+          path: uri
+        }, null, uri);
+      }
+    });
+  }
+
+  lsbook.events.on('start', bindSearch);
+
+  var markConfig = {
+    'ignoreJoiners': true,
+    'acrossElements': true,
+    'separateWordSearch': false
+  };
+  // 强调
+  var highLightPageInner = function (keyword) {
+    var pageInner = $('.page-inner');
+    if (/(?:(.+)?\:)(.+)/.test(keyword)) {
+      pageInner.mark(RegExp.$1, markConfig);
+    }
+    pageInner.mark(keyword, markConfig);
+
+    setTimeout(function () {
+      var mark = $('mark[data-markjs="true"]');
+      if (mark.length) {
+        mark[0].scrollIntoView();
+      }
+    }, 100);
+  };
+
+  function showResult() {
+    var keyword, type;
+    if (/\b(q|h)=([^&]+)/.test(window.location.search)) {
+      type = RegExp.$1;
+      keyword = decodeURIComponent(RegExp.$2);
+      if (type === 'q') {
+        launchSearch(keyword);
+      } else {
+        highLightPageInner(keyword);
+      }
+      $('#book-search-input input').val(keyword);
+    }
+  }
+
+  lsbook.events.on('page.change', showResult);
+
+  function updateQueryString(key, value) {
+    value = encodeURIComponent(value);
+
+    var url = window.location.href.replace(/([?&])(?:q|h)=([^&]+)(&|$)/, function (all, pre, value, end) {
+      if (end === '&') {
+        return pre;
+      }
+      return '';
+    });
+    var re = new RegExp('([?&])' + key + '=.*?(&|#|$)(.*)', 'gi');
+    var hash;
+
+    if (re.test(url)) {
+      if (typeof value !== 'undefined' && value !== null) {
+        return url.replace(re, '$1' + key + '=' + value + '$2$3');
+      } else {
+        hash = url.split('#');
+        url = hash[0].replace(re, '$1$3').replace(/(&|\?)$/, '');
+        if (typeof hash[1] !== 'undefined' && hash[1] !== null) {
+          url += '#' + hash[1];
+        }
+        return url;
+      }
+    } else {
+      if (typeof value !== 'undefined' && value !== null) {
+        var separator = url.indexOf('?') !== -1 ? '&' : '?';
+        hash = url.split('#');
+        url = hash[0] + separator + key + '=' + value;
+        if (typeof hash[1] !== 'undefined' && hash[1] !== null) {
+          url += '#' + hash[1];
+        }
+        return url;
+      } else {
+        return url;
+      }
+    }
+  }
+
+  window.addEventListener('click', function (e) {
+    if (e.target.tagName === 'A' && e.target.getAttribute('data-need-reload')) {
+      setTimeout(function () {
+        window.location.reload();
+      }, 100);
+    }
+  }, true);
+})();
@@ -0,0 +1,90 @@
+/**
+ * 共享目录
+ *
+ * 书籍目录只生成一次（summary.<hash>.html），路径相对于书籍根目录，
+ * 页面中仅保留占位符。目录片段加载一次后缓存，切换页面时转换为相对于本页面的路径并标记当前章节，
+ * 结果与内联目录一致。
+ */
+(function () {
+  var KEY = 'lsbook:summary:';
+  var fragments = {};
+
+  // 读取目录片段：内存 -> sessionStorage -> 网络
+  function loadSummary(url, name, done) {
+    if (fragments[name]) return done(fragments[name]);
+
+    try {
+      var cached = sessionStorage.getItem(KEY + name);
+      if (cached) {
+        fragments[name] = cached;
+        return done(cached);
+      }
+    } catch (e) {
+    }
+
+    $.ajax({
+      type: 'GET',
+      url: url,
+      dataType: 'html',
+      // 文件名携带内容哈希，允许浏览器缓存
+      cache: true,
+      success: function (html) {
+        fragments[name] = html;
+        try {
+          sessionStorage.setItem(KEY + name, html);
+        } catch (e) {
+        }
+        done(html);
+      }
+    });
+  }
+
+  function isRelative(href) {
+    return !/^([a-z][a-z0-9+.\-]*:|\/|#)/i.test(href);
+  }
+
+  // 相对于书籍根目录的路径转换为相对于目录 dir
+  function relative(dir, path) {
+    var from = dir ? dir.split('/') : [];
+    var to = path.split('/');
+    var i = 0;
+    while (i < from.length && i < to.length - 1 && from[i] === to[i]) i++;
+    var parts = [];
+    for (var j = i; j < from.length; j++) parts.push('..');
+    return parts.concat(to.slice(i)).join('/');
+  }
+
+  // 目录片段转换为目录级别为 level 的页面的目录 html
+  function render(html, level) {
+    var attr = ' data-level="' + level + '"';
+    var match = html.match(new RegExp(attr.replace(/\./g, '\\.') + ' data-path="([^"]*)"'));
+    var path = match ? match[1] : '';
+    var dir = path.lastIndexOf('/') === -1 ? '' : path.slice(0, path.lastIndexOf('/'));
+
+    return html.replace(/ (href|data-path)="([^"]*)"/g, function (all, name, value) {
+      return isRelative(value) ? ' ' + name + '="' + relative(dir, value) + '"' : all;
+    }).replace('class="chapter"' + attr, 'class="chapter active"' + attr);
+  }
+
+  // 使用目录片段替换占位符
+  function injectSummary() {
+    var $placeholder = $('.book-summary .summary-placeholder');
+    if (!$placeholder.length) return;
+
+    var name = $placeholder.attr('data-summary');
+    var level = $placeholder.attr('data-level');
+    var basePath = lsbook.state.basePath || '.';
+
+    loadSummary(basePath + '/' + name, name, function (html) {
+      $placeholder.replaceWith($.parseHTML(render(html, level)));
+      // 目录在 page.change 之后插入，重新查找当前章节
+      if (typeof preparePage === 'function') preparePage(false);
+    });
+  }
+
+  lsbook.summary = {
+    render: render
+  };
+
+  lsbook.events.bind('page.change', injectSummary);
+})();
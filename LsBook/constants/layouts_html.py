@@ -61,6 +61,7 @@ js = Template("""
 <script charset="UTF-8" src="${base_assets_path}/lsbook/jquery_mar/jquery.mark.js"></script>
 <script src="${base_assets_path}/lsbook/lightbox/js/lightbox.min.js"></script>
 <script src="${base_assets_path}/lsbook/lsbook.min.js"></script>
+<script src="${base_assets_path}/lsbook/search.js"></script>
 """)
 
 _html_body_map = {
@@ -143,6 +144,18 @@ book_summary_3_sub_chapter_active = Template("""<ul class="articles"><li class="
 </li></ul>
 """)
 
+_book_summary_shared_map = {
+    "summary": "共享目录文件名，相对于书籍根目录",
+    "data_level": "本页目录级别",
+}
+book_summary_shared = Template("""<li class="summary-placeholder" data-summary="${summary}" data-level="${data_level}"></li>""")
+
+_summary_js_map = {
+    "base_assets_path": "本页面相对于根的资源相对路径",
+}
+summary_js = Template("""<script src="${base_assets_path}/lsbook/summary.js"></script>
+""")
+
 _book_body_map = {
     "previous_page_link": "上一页",
     "next_page_link": "下一页",
@@ -1,17 +1,21 @@
 import json
 import logging
 import os
-from concurrent.futures.process import ProcessPoolExecutor
 from threading import Thread
 from urllib import request
 
-from LsBook.utils.fs import copytree, rmdir
+from LsBook.utils.fs import remove_path
 from . import __version__
 from .models.book import Book
 from .output.generateBook import generateBook
+from .output.serveBook import serveBook
+from .output.watchBook import watchBook
 from .utils.argument import cmd_argument
+from .utils.assets import install_assets
+from .utils import profiler
 from .utils.logger import log_init
 from .utils.path import get_pure_path
+from .utils.pool import WorkerPool
 
 msg = None
 
@@ -38,31 +42,53 @@ def main(debug=False):
 
     args = cmd_argument()
     build: bool = args.build
+    watch: bool = args.watch
+    serve: bool = args.serve
+    port: int = args.port
     book_path: str = args.book
     book_output: str = args.output
     log_level: str = args.log
     base_assets = args.base_assets
     assets = args.assets
+    cache_dir = args.cache_dir
+    force: bool = args.force
+    assets_mode: str = args.assets_mode
+    assets_store = args.assets_store
+    profile = args.profile
+    jobs = args.jobs
+    executor = args.executor
     log_init(log_level)
 
     logging.debug(f"入参：{args}")
 
     try:
-        if build:
+        if serve:
+            logging.info("启动预览服务")
+            serveBook(Book(book_path, book_output, None, base_assets), port)
+        elif build or watch:
             logging.info("开始生成书籍")
-            if debug:
-                pool = ProcessPoolExecutor(1)
-            else:
-                pool = ProcessPoolExecutor()
-            book = Book(book_path, book_output, pool, base_assets)
+            pool = WorkerPool(executor, 1 if debug and jobs is None else jobs)
+            book = Book(book_path, book_output, pool, base_assets, cache_dir, force, assets_mode, assets_store)
 
-            # 生成书籍
-            generateBook(book)
+            if profile:
+                profiler.enable()
+
+            try:
+                # 生成书籍
+                generateBook(book)
+
+                if profile:
+                    profiler.write_trace(profile)
+
+                if watch:
+                    watchBook(book)
+            finally:
+                pool.shutdown()
         elif assets:
             out = get_pure_path(assets, "lsbook")
             logging.info(f"释放资源：{out}")
-            rmdir(out)
-            copytree(get_pure_path(os.path.dirname(__file__), "assets", "lsbook"), out)
+            remove_path(out)
+            install_assets(get_pure_path(os.path.dirname(__file__), "assets", "lsbook"), out, assets_mode, assets_store)
             logging.info(f"释放资源完毕")
         else:
             logging.warning("lsbook 查看帮助")
@@ -1,11 +1,22 @@
 from .block_token import Document
 from .html_renderer import HTMLRenderer
+from .plain_text import PlainText
 from .summary_renderer import SummaryRenderer
 
 
-def html_renderer(page: str):
-    with HTMLRenderer() as renderer:
-        page_html = renderer.render(Document(page))
+def html_renderer(page, out=None, plain_text=None):
+    """
+    :param page: 页面内容，或页面行迭代器（逐行解析）
+    :param out: 输出列表，给出时页面 html 分段追加到 out 并返回 out，不拼接为字符串
+    :param plain_text: PlainText，给出时在生成 html 的同时收集页面纯文本
+    """
+    with HTMLRenderer(plain_text=plain_text) as renderer:
+        document = Document(page)
+        if out is None:
+            page_html = renderer.render(document)
+        else:
+            renderer.write(document, out)
+            page_html = out
     return renderer, page_html
 
 
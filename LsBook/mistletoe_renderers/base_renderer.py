@@ -8,6 +8,26 @@ import sys
 from . import block_token, span_token
 
 
+def buffered(write_func):
+    """
+    Decorator for render functions that append their output to a list
+    instead of returning a string.
+
+    The decorated function write_func(self, token, out) becomes a normal
+    render function returning a string, so it can still be called
+    directly or through super(); BaseRenderer.write calls write_func
+    itself, so that a whole document is rendered into one list.
+    """
+    def render_func(self, token):
+        out = []
+        write_func(self, token, out)
+        return ''.join(out)
+    render_func.__name__ = write_func.__name__
+    render_func.__doc__ = write_func.__doc__
+    render_func.write = write_func
+    return render_func
+
+
 class BaseRenderer(object):
     """
     Base class for renderers.
@@ -20,6 +40,8 @@ class BaseRenderer(object):
     *   ... add additional tokens into the parsing process by passing custom
         tokens to super().__init__();
     *   ... add additional render functions by appending to self.render_map;
+    *   ... append to a shared output list instead of returning a string,
+        by decorating render functions with @buffered.
 
     Usage:
         Suppose SomeRenderer inherits BaseRenderer, and fin is the input file.
@@ -35,8 +57,12 @@ class BaseRenderer(object):
 
     Attributes:
         render_map (dict): maps tokens to their corresponding render functions.
+                           It is looked up once per token class, on the first
+                           token of that class rendered.
         _extras (list): a list of custom tokens to be added to the
                         parsing process.
+        _writers (dict): maps token classes to (function, buffered) pairs,
+                         see self.write.
     """
     _parse_name = re.compile(r"([A-Z][a-z]+|[A-Z]+(?![a-z]))")
 
@@ -83,21 +109,49 @@ class BaseRenderer(object):
             render_func = getattr(self, self._cls_to_func(token.__name__))
             self.render_map[token.__name__] = render_func
 
+        self._writers = {}
         self.footnotes = {}
 
     def render(self, token):
         """
-        Grabs the class name from input token and finds its corresponding
-        render function.
-
-        Basically a janky way to do polymorphism.
+        Renders token with the render function registered for its class.
 
         Arguments:
             token: whose __class__.__name__ is in self.render_map.
         """
-        return self.render_map[token.__class__.__name__](token)
+        out = []
+        self.write(token, out)
+        return ''.join(out)
 
-    def render_inner(self, token):
+    def write(self, token, out):
+        """
+        Appends the rendered token to out, a list of strings.
+
+        Render functions decorated with @buffered write to out directly,
+        the result of other render functions is appended.
+
+        Arguments:
+            token: whose __class__.__name__ is in self.render_map.
+            out (list): output buffer.
+        """
+        func, is_buffered = self._writers.get(token.__class__) or self._writer(token.__class__)
+        if is_buffered:
+            func(token, out)
+        else:
+            out.append(func(token))
+
+    def _writer(self, token_cls):
+        render_func = self.render_map[token_cls.__name__]
+        write_func = getattr(render_func, 'write', None)
+        if write_func is not None and getattr(render_func, '__self__', None) is self:
+            writer = write_func.__get__(self), True
+        else:
+            writer = render_func, False
+        self._writers[token_cls] = writer
+        return writer
+
+    @buffered
+    def render_inner(self, token, out):
         """
         Recursively renders child tokens. Joins the rendered
         strings with no space in between.
@@ -110,7 +164,9 @@ class BaseRenderer(object):
         Arguments:
             token: a branch node who has children attribute.
         """
-        return ''.join(map(self.render, token.children))
+        write = self.write
+        for child in token.children:
+            write(child, out)
 
     def __enter__(self):
         """
@@ -122,10 +178,12 @@ class BaseRenderer(object):
         """
         Make renderer classes into context managers.
 
-        Reset block_token._token_types and span_token._token_types.
+        Reset the block and span token types of the current context
+        if custom tokens were added.
         """
-        block_token.reset_tokens()
-        span_token.reset_tokens()
+        if self._extras:
+            block_token.reset_tokens()
+            span_token.reset_tokens()
 
     @classmethod
     def _cls_to_func(cls, cls_name):
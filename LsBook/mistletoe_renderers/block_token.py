@@ -2,11 +2,12 @@
 Built-in block-level token classes.
 """
 
+import contextvars
 import re
 import sys
 from itertools import zip_longest
 
-from . import block_tokenizer, span_token
+from . import block_tokenizer, parse_context, span_token
 from .core_tokens import (
     is_link_label,
     follows,
@@ -22,14 +23,6 @@ Tokens to be included in the parsing process, in the order specified.
 __all__ = ['SecBlock', 'MathBlock', 'HTMLBlock', 'BlockCode', 'Heading', 'Quote', 'CodeFence', 'ThematicBreak',
            'List', 'Table', 'Footnote', 'Paragraph']
 
-"""
-Stores a reference to the current document token.
-
-When parsing, footnote entries will be stored in the document by
-accessing this pointer.
-"""
-_root_node = None
-
 
 def tokenize(lines):
     """
@@ -44,38 +37,53 @@ def tokenize(lines):
 
     See also: block_tokenizer.tokenize, span_token.tokenize_inner.
     """
-    return block_tokenizer.tokenize(lines, _token_types)
+    if parse_context.current() is None:
+        with parse_context.parsing():
+            return block_tokenizer.tokenize(lines, _token_types.get())
+    return block_tokenizer.tokenize(lines, _token_types.get())
+
+
+def token_types():
+    """
+    Returns the block-level token classes used in the current context.
+    """
+    return _token_types.get()
 
 
 def add_token(token_cls, position=0):
     """
     Allows external manipulation of the parsing process.
-    This function is usually called in BaseRenderer.__enter__.
+    This function is usually called in BaseRenderer.__init__.
+
+    The change only affects the current thread (context).
 
     Arguments:
         token_cls (SpanToken): token to be included in the parsing process.
         position (int): the position for the token class to be inserted into.
     """
-    _token_types.insert(position, token_cls)
+    types = list(_token_types.get())
+    types.insert(position, token_cls)
+    _token_types.set(types)
 
 
 def remove_token(token_cls):
     """
     Allows external manipulation of the parsing process.
-    This function is usually called in BaseRenderer.__exit__.
 
     Arguments:
         token_cls (BlockToken): token to be removed from the parsing process.
     """
-    _token_types.remove(token_cls)
+    types = list(_token_types.get())
+    types.remove(token_cls)
+    _token_types.set(types)
 
 
 def reset_tokens():
     """
-    Resets global _token_types to all token classes in __all__.
+    Resets _token_types of the current context to all token classes in __all__.
+    This function is called in BaseRenderer.__exit__ when custom tokens were added.
     """
-    global _token_types
-    _token_types = [globals()[cls_name] for cls_name in __all__]
+    _token_types.set(_default_token_types)
 
 
 class BlockToken(object):
@@ -97,6 +105,12 @@ class BlockToken(object):
           of the current token. Every subclass of BlockToken must define a
           start function (see block_tokenizer.tokenize).
 
+        * BlockToken.leaders is a string of the characters a line can
+          start with (after leading whitespace) for start to return True,
+          or None if start should be tried on every line. The tokenizer
+          uses it to skip token types that cannot match
+          (see block_tokenizer.dispatcher).
+
         * BlockToken.read takes the rest of the lines in the ducment as an
           iterator (including the start line), and consumes all the lines
           that should be read into this token.
@@ -117,6 +131,8 @@ class BlockToken(object):
     Attributes:
         children (list): inner tokens.
     """
+    __slots__ = ('children',)
+    leaders = None
 
     def __init__(self, lines, tokenize_func):
         self.children = tokenize_func(lines)
@@ -137,19 +153,19 @@ class BlockToken(object):
 class Document(BlockToken):
     """
     Document token.
+
+    lines can be a string, a list of lines, or any iterable of lines
+    (e.g. an open file), which is read lazily by the block tokenizer.
     """
+    __slots__ = ('footnotes',)
 
     def __init__(self, lines):
         if isinstance(lines, str):
             lines = lines.splitlines(keepends=True)
-        lines = [line if line.endswith('\n') else '{}\n'.format(line) for line in lines]
+        lines = (line if line.endswith('\n') else '{}\n'.format(line) for line in lines)
         self.footnotes = {}
-        global _root_node
-        _root_node = self
-        span_token._root_node = self
-        self.children = tokenize(lines)
-        span_token._root_node = None
-        _root_node = None
+        with parse_context.parsing(self):
+            self.children = tokenize(lines)
 
 
 class Heading(BlockToken):
@@ -161,9 +177,9 @@ class Heading(BlockToken):
         level (int): heading level.
         children (list): inner tokens.
     """
+    __slots__ = ('level',)
     pattern = re.compile(r' {0,3}(#{1,6})(?:\n|\s+?(.*?)(?:\n|\s+?#+\s*?$))')
-    level = 0
-    content = ''
+    leaders = '#'
 
     def __init__(self, match):
         self.level, content = match
@@ -171,19 +187,15 @@ class Heading(BlockToken):
 
     @classmethod
     def start(cls, line):
-        match_obj = cls.pattern.match(line)
-        if match_obj is None:
-            return False
-        cls.level = len(match_obj.group(1))
-        cls.content = (match_obj.group(2) or '').strip()
-        if set(cls.content) == {'#'}:
-            cls.content = ''
-        return True
+        return cls.pattern.match(line) is not None
 
     @classmethod
     def read(cls, lines):
-        next(lines)
-        return cls.level, cls.content
+        match_obj = cls.pattern.match(next(lines))
+        content = (match_obj.group(2) or '').strip()
+        if set(content) == {'#'}:
+            content = ''
+        return len(match_obj.group(1)), content
 
 
 class SetextHeading(BlockToken):
@@ -192,6 +204,7 @@ class SetextHeading(BlockToken):
     
     Not included in the parsing process, but called by Paragraph.__new__.
     """
+    __slots__ = ('level',)
 
     def __init__(self, lines):
         self.level = 1 if lines.pop().lstrip().startswith('=') else 2
@@ -211,6 +224,8 @@ class Quote(BlockToken):
     """
     Quote token. (["> # heading\\n", "> paragraph\\n"])
     """
+    __slots__ = ()
+    leaders = '>'
 
     def __init__(self, parse_buffer):
         # span-level tokenizing happens here.
@@ -267,9 +282,10 @@ class Quote(BlockToken):
 
         # block level tokens are parsed here, so that footnotes
         # in quotes can be recognized before span-level tokenizing.
-        Paragraph.parse_setext = False
-        parse_buffer = block_tokenizer.tokenize_block(line_buffer, _token_types)
-        Paragraph.parse_setext = True
+        context = parse_context.current()
+        context.parse_setext = False
+        parse_buffer = block_tokenizer.tokenize_block(line_buffer, _token_types.get())
+        context.parse_setext = True
         return parse_buffer
 
     @staticmethod
@@ -293,8 +309,8 @@ class Paragraph(BlockToken):
     Paragraph token. (["some\\n", "continuous\\n", "lines\\n"])
     Boundary between span-level and block-level tokens.
     """
+    __slots__ = ()
     setext_pattern = re.compile(r' {0,3}(=|-)+ *$')
-    parse_setext = True  # can be disabled by Quote
 
     def __new__(cls, lines):
         if not isinstance(lines, list):
@@ -337,7 +353,8 @@ class Paragraph(BlockToken):
                 break
 
             # check if we see a setext underline
-            if cls.parse_setext and cls.is_setext_heading(next_line):
+            # can be disabled by Quote
+            if parse_context.current().parse_setext and cls.is_setext_heading(next_line):
                 line_buffer.append(next(lines))
                 return SetextHeading(line_buffer)
 
@@ -363,6 +380,7 @@ class BlockCode(BlockToken):
         children (list): contains a single span_token.RawText token.
         language (str): always the empty string.
     """
+    __slots__ = ('language',)
 
     def __init__(self, lines):
         self.language = ''
@@ -409,9 +427,10 @@ class CodeFence(BlockToken):
         children (list): contains a single span_token.RawText token.
         language (str): language of code block (default to empty).
     """
+    __slots__ = ('language',)
     # pattern = re.compile(r'( {0,3})((?:`|~){3,}) *(\S*)')
     pattern = re.compile(r'( {0,3})((?:`){3,}|(?:~){3,}) *(\S*)')
-    _open_info = None
+    leaders = '`~'
 
     def __init__(self, match):
         lines, open_info = match
@@ -419,33 +438,40 @@ class CodeFence(BlockToken):
         self.children = (span_token.RawText(''.join(lines)),)
 
     @classmethod
-    def start(cls, line):
+    def open_info(cls, line):
+        """
+        Returns (indent, leader, language) if line opens a code fence, otherwise None.
+        """
         match_obj = cls.pattern.match(line)
         if not match_obj:
-            return False
+            return None
         prepend, leader, lang = match_obj.groups()
         if leader[0] in lang or leader[0] in line[match_obj.end():]:
-            return False
-        cls._open_info = len(prepend), leader, lang
-        return True
+            return None
+        return len(prepend), leader, lang
+
+    @classmethod
+    def start(cls, line):
+        return cls.open_info(line) is not None
 
     @classmethod
     def read(cls, lines):
-        next(lines)
+        open_info = cls.open_info(next(lines))
         line_buffer = []
         for line in lines:
             stripped_line = line.lstrip(' ')
             diff = len(line) - len(stripped_line)
-            if (stripped_line.startswith(cls._open_info[1])
+            if (stripped_line.startswith(open_info[1])
                     and len(stripped_line.split(maxsplit=1)) == 1
                     and diff < 4):
                 break
-            if diff > cls._open_info[0]:
-                stripped_line = ' ' * (diff - cls._open_info[0]) + stripped_line
+            if diff > open_info[0]:
+                stripped_line = ' ' * (diff - open_info[0]) + stripped_line
             line_buffer.append(stripped_line)
-        return line_buffer, cls._open_info
+        return line_buffer, open_info
 
 
+# List has no __slots__: instances set self.start, which is also the start classmethod
 class List(BlockToken):
     """
     List token.
@@ -456,6 +482,7 @@ class List(BlockToken):
         start (NoneType or int): None if unordered, starting number if ordered.
     """
     pattern = re.compile(r' {0,3}(?:\d{0,9}[.)]|[+\-*])(?:[ \t]*$|[ \t]+)')
+    leaders = '0123456789.)+-*'
 
     def __init__(self, matches):
         self.children = [ListItem(*match) for match in matches]
@@ -504,6 +531,7 @@ class ListItem(BlockToken):
     """
     List items. Not included in the parsing process, but called by List.
     """
+    __slots__ = ('leader', 'prepend', 'loose')
 
     pattern = re.compile(r'\s*(\d{0,9}[.)]|[+\-*])(\s*$|\s+)')
 
@@ -565,7 +593,7 @@ class ListItem(BlockToken):
             line_buffer.append(line[prepend:])
         next_line = lines.peek()
         if empty_first_line and next_line is not None and next_line.strip() == '':
-            parse_buffer = block_tokenizer.tokenize_block([next(lines)], _token_types)
+            parse_buffer = block_tokenizer.tokenize_block([next(lines)], _token_types.get())
             next_line = lines.peek()
             if next_line is not None:
                 marker_info = cls.parse_marker(next_line)
@@ -614,7 +642,7 @@ class ListItem(BlockToken):
 
         # block-level tokens are parsed here, so that footnotes can be
         # recognized before span-level parsing.
-        parse_buffer = block_tokenizer.tokenize_block(line_buffer, _token_types)
+        parse_buffer = block_tokenizer.tokenize_block(line_buffer, _token_types.get())
         return (parse_buffer, prepend, leader), next_marker
 
 
@@ -627,6 +655,7 @@ class Table(BlockToken):
         column_align (list): align options for each column (default to [None]).
         children (list): inner tokens (TableRows).
     """
+    __slots__ = ('header', 'column_align')
 
     def __init__(self, lines):
         if '---' in lines[1]:
@@ -685,6 +714,7 @@ class TableRow(BlockToken):
 
     Should only be called by Table.__init__().
     """
+    __slots__ = ('row_align',)
     RE_CODE_PIPES = re.compile(r'(?:(\\\\)|(\\`+)|(`+)|(\\\|)|(\|))')
     RE_END_BORDER = re.compile(r'(?<!\\)(?:\\\\)*\|$')
 
@@ -778,6 +808,7 @@ class TableCell(BlockToken):
         align (bool): align option for current cell (default to None).
         children (list): inner (span-)tokens.
     """
+    __slots__ = ('align',)
 
     def __init__(self, content, align=None):
         self.align = align
@@ -791,7 +822,9 @@ class Footnote(BlockToken):
     The constructor returns None, because the footnote information
     is stored in Footnote.read.
     """
+    __slots__ = ()
     label_pattern = re.compile(r'[ \n]{0,3}\[(.+?)\]', re.DOTALL)
+    leaders = '['
 
     def __new__(cls, _):
         return None
@@ -816,7 +849,7 @@ class Footnote(BlockToken):
                 break
             offset, match = match_info
             matches.append(match)
-        cls.append_footnotes(matches, _root_node)
+        cls.append_footnotes(matches, parse_context.current().root)
         return matches or None
 
     @classmethod
@@ -955,7 +988,9 @@ class ThematicBreak(BlockToken):
     """
     Thematic break token (a.k.a. horizontal rule.)
     """
+    __slots__ = ()
     pattern = re.compile(r' {0,3}(?:([-_*])\s*?)(?:\1\s*?){2,}$')
+    leaders = '-_*'
 
     def __init__(self, _):
         pass
@@ -976,61 +1011,64 @@ class HTMLBlock(BlockToken):
     Attributes:
         content (str): literal strings rendered as-is.
     """
-    _end_cond = None
+    __slots__ = ('content',)
     multiblock = re.compile(r'<(script|pre|style)[ >\n]')
     predefined = re.compile(r'<\/?(.+?)(?:\/?>|[ \n])')
     custom_tag = re.compile(r'(?:' + '|'.join((span_token._open_tag,
                                                span_token._closing_tag)) + r')\s*$')
+    leaders = '<'
 
     def __init__(self, lines):
         self.content = ''.join(lines).rstrip('\n')
 
     @classmethod
     def start(cls, line):
+        return cls.match(line)[0]
+
+    @classmethod
+    def match(cls, line):
+        """
+        Returns (rule, end condition): rule is the matching HTML block rule (1-7)
+        or False; end condition is None if the block ends at a blank line.
+        """
         stripped = line.lstrip()
         if len(line) - len(stripped) >= 4:
-            return False
+            return False, None
         # rule 1: <pre>, <script> or <style> tags, allow newlines in block
         match_obj = cls.multiblock.match(stripped)
         if match_obj is not None:
-            cls._end_cond = '</{}>'.format(match_obj.group(1).casefold())
-            return 1
+            return 1, '</{}>'.format(match_obj.group(1).casefold())
         # rule 2: html comment tags, allow newlines in block
         if stripped.startswith('<!--'):
-            cls._end_cond = '-->'
-            return 2
+            return 2, '-->'
         # rule 3: tags that starts with <?, allow newlines in block
         if stripped.startswith('<?'):
-            cls._end_cond = '?>'
-            return 3
+            return 3, '?>'
         # rule 4: tags that starts with <!, allow newlines in block
         if stripped.startswith('<!') and stripped[2].isupper():
-            cls._end_cond = '>'
-            return 4
+            return 4, '>'
         # rule 5: CDATA declaration, allow newlines in block
         if stripped.startswith('<![CDATA['):
-            cls._end_cond = ']]>'
-            return 5
+            return 5, ']]>'
         # rule 6: predefined tags (see html_token._tags), read until newline
         match_obj = cls.predefined.match(stripped)
         if match_obj is not None and match_obj.group(1).casefold() in span_token._tags:
-            cls._end_cond = None
-            return 6
+            return 6, None
         # rule 7: custom tags, read until newline
         match_obj = cls.custom_tag.match(stripped)
         if match_obj is not None:
-            cls._end_cond = None
-            return 7
-        return False
+            return 7, None
+        return False, None
 
     @classmethod
     def read(cls, lines):
         # note: stop condition can trigger on the starting line
+        _, end_cond = cls.match(lines.peek())
         line_buffer = []
         for line in lines:
             line_buffer.append(line)
-            if cls._end_cond is not None:
-                if cls._end_cond in line.casefold():
+            if end_cond is not None:
+                if end_cond in line.casefold():
                     break
             elif line.strip() == '':
                 line_buffer.pop()
@@ -1040,11 +1078,10 @@ class HTMLBlock(BlockToken):
 
 class SecBlock(BlockToken):
     """read"""
-    show = False
-    title = ""
-    count = 0
+    __slots__ = ('content', 'count', 'title', 'show')
     pattern_start = re.compile(r'^[\t ]*<!--sec([\s\S]+?)ces-->[^\S]')
     pattern_end = re.compile(r'^[\t ]*<!--endsec-->[^\S]')
+    leaders = '<'
 
     def __init__(self, token):
         lines, count, title, show = token
@@ -1054,41 +1091,34 @@ class SecBlock(BlockToken):
         self.show = show
         super().__init__(lines, tokenize)
 
-    @classmethod
-    def init(cls):
-        """每个文档重置参数"""
-        cls.show = False
-        cls.title = ""
-        cls.count = 0
-
     @classmethod
     def start(cls, line):
-        match_obj = cls.pattern_start.match(line)
-        if match_obj is None:
-            return False
-        cls.title = ""
-        cls.show = False
-        for item in match_obj.group(1).split():
-            cls.title = item.split("=")[1].strip("'").strip('"') if "title" in item else cls.title
-            cls.show = item.split("=")[1].lower() == 'true' if "show" in item else cls.show
-        return True
+        return cls.pattern_start.match(line) is not None
 
     @classmethod
     def read(cls, lines):
+        title = ""
+        show = False
+        for item in cls.pattern_start.match(next(lines)).group(1).split():
+            title = item.split("=")[1].strip("'").strip('"') if "title" in item else title
+            show = item.split("=")[1].lower() == 'true' if "show" in item else show
         line_buffer = []
-        next(lines)
         for line in lines:
             line_buffer.append(line)
             if cls.pattern_end.match(line):
                 line_buffer.pop()
                 break
-        cls.count += 1
-        return line_buffer, cls.count, cls.title, cls.show
+        # 每个文档单独计数
+        context = parse_context.current()
+        context.sec_count += 1
+        return line_buffer, context.sec_count, title, show
 
 
 class MathBlock(BlockToken):
+    __slots__ = ('content',)
     pattern_start = re.compile(r'^[ \t]*\${1,2}[^$][ \t\n]*$')
     pattern_end = re.compile(r'^[ \t]*\${1,2}[^$\S]')
+    leaders = '$'
 
     def __init__(self, lines):
         self.content = ''.join(lines)
@@ -1109,5 +1139,5 @@ class MathBlock(BlockToken):
         return line_buffer
 
 
-_token_types = []
-reset_tokens()
+_default_token_types = [globals()[cls_name] for cls_name in __all__]
+_token_types = contextvars.ContextVar("block_token_types", default=_default_token_types)
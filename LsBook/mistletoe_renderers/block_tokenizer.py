@@ -2,24 +2,59 @@
 Block-level tokenizer for mistletoe.
 """
 
+# tuple of token types -> dispatch table, see dispatcher
+_dispatchers = {}
+
 
 class FileWrapper:
+    """
+    Input lines of the block tokenizer.
+
+    lines can be a list, or any iterable of lines (e.g. a file or a
+    generator), which is read lazily: only the lines from the start of
+    the current block on are kept, see release.
+
+    _index and _anchor are line numbers in the whole input;
+    self.lines[0] is line number self._base.
+    """
     def __init__(self, lines):
-        self.lines = lines if isinstance(lines, list) else list(lines)
+        self._streaming = not isinstance(lines, list)
+        if self._streaming:
+            self.lines = []
+            self._iter = iter(lines)
+        else:
+            self.lines = lines
+            self._iter = None
+        self._base = 0
         self._index = -1
         self._anchor = 0
 
+    def _fill(self, index):
+        """
+        Reads lines until line number index is buffered.
+        Returns False if the input ends before it.
+        """
+        while index - self._base >= len(self.lines):
+            if self._iter is None:
+                return False
+            try:
+                self.lines.append(next(self._iter))
+            except StopIteration:
+                self._iter = None
+                return False
+        return True
+
     def __next__(self):
-        if self._index + 1 < len(self.lines):
+        if self._fill(self._index + 1):
             self._index += 1
-            return self.lines[self._index]
+            return self.lines[self._index - self._base]
         raise StopIteration
 
     def __iter__(self):
         return self
 
     def __repr__(self):
-        return repr(self.lines[self._index+1:])
+        return repr(self.lines[self._index+1-self._base:])
 
     def anchor(self):
         self._anchor = self._index
@@ -28,14 +63,24 @@ class FileWrapper:
         self._index = self._anchor
 
     def peek(self):
-        if self._index + 1 < len(self.lines):
-            return self.lines[self._index+1]
+        if self._fill(self._index + 1):
+            return self.lines[self._index+1-self._base]
         return None
 
     def backstep(self):
         if self._index != -1:
             self._index -= 1
 
+    def release(self):
+        """
+        Drops the lines read before the last consumed one. Called between
+        blocks, when no token can backtrack into them any more.
+        Lines passed in as a list are left untouched.
+        """
+        if self._streaming and self._index > self._base:
+            del self.lines[:self._index - self._base]
+            self._base = self._index
+
 
 def tokenize(iterable, token_types):
     """
@@ -60,9 +105,10 @@ def tokenize_block(iterable, token_types):
     """
     lines = FileWrapper(iterable)
     parse_buffer = ParseBuffer()
+    table, fallback = dispatcher(token_types)
     line = lines.peek()
     while line is not None:
-        for token_type in token_types:
+        for token_type in candidates(table, fallback, line.lstrip()[:1]):
             if token_type.start(line):
                 result = token_type.read(lines)
                 if result is not None:
@@ -71,10 +117,46 @@ def tokenize_block(iterable, token_types):
         else:  # unmatched newlines
             next(lines)
             parse_buffer.loose = True
+        lines.release()
         line = lines.peek()
     return parse_buffer
 
 
+def candidates(table, fallback, char):
+    """
+    Returns the token types to try for a line starting with char.
+    Non-ASCII digits (e.g. full-width '１') match \\d in the token
+    patterns, so they are dispatched like '0'.
+    """
+    result = table.get(char)
+    if result is None:
+        result = table.get('0', fallback) if char.isdigit() else fallback
+    return result
+
+
+def dispatcher(token_types):
+    """
+    Returns (table, fallback) for token_types: table maps the first
+    non-whitespace character of a line to the token types that can start
+    with it (see BlockToken.leaders); fallback lists the token types to
+    try for any other line. Both keep the order of token_types.
+
+    Token types without a leaders attribute (e.g. custom tokens added
+    through block_token.add_token) are tried on every line.
+    """
+    key = tuple(token_types)
+    result = _dispatchers.get(key)
+    if result is None:
+        leaders = [getattr(token_type, 'leaders', None) for token_type in token_types]
+        chars = set(''.join(leader for leader in leaders if leader is not None))
+        table = {char: [token_type for token_type, leader in zip(token_types, leaders)
+                        if leader is None or char in leader]
+                 for char in chars}
+        fallback = [token_type for token_type, leader in zip(token_types, leaders) if leader is None]
+        result = _dispatchers[key] = (table, fallback)
+    return result
+
+
 def make_tokens(parse_buffer):
     """
     Takes a list of pairs (token_type, read_result) and
@@ -10,12 +10,22 @@ punctuation = {'!', '"', '#', '$', '%', '&', '\'', '(', ')', '*', '+', ',',
                '-', '.', '/', ':', ';', '<', '=', '>', '?', '@', '[', '\\',
                ']', '^', '_', '`', '{', '|', '}', '~'}
 code_pattern = re.compile(r"(?<!\\|`)(?:\\\\)*(`+)(?!`)(.+?)(?<!`)\1(?!`)", re.DOTALL)
+# characters that change the scanner state; runs of other characters are skipped
+special = {'\\', '*', '_', '[', ']', '!'}
+special_pattern = re.compile(r'[\\*_\[\]!]')
 
 
-_code_matches = []
+def find_core_tokens(string, root, code_matches):
+    """
+    Finds emphasis, link and image matches in string.
 
+    Inline code matches are appended to code_matches, so that
+    span_token.InlineCode can pick them up without searching again.
 
-def find_core_tokens(string, root):
+    Only the characters in special (and the start of code spans) change
+    the state of the scanner; after the first character of a run of
+    other characters, the rest of the run is skipped.
+    """
     delimiters = []
     matches = []
     escaped = False
@@ -23,14 +33,31 @@ def find_core_tokens(string, root):
     in_image = False
     start = 0
     i = 0
+    length = len(string)
     code_match = code_pattern.search(string)
-    while i < len(string):
+    while i < length:
         if code_match is not None and i == code_match.start():
-            _code_matches.append(code_match)
+            code_matches.append(code_match)
             i = code_match.end()
             code_match = code_pattern.search(string, i)
             continue
         c = string[i]
+        if c not in special:
+            if in_delimiter_run is not None:
+                delimiters.append(Delimiter(start, i if not escaped else i-1, string))
+                in_delimiter_run = None
+            if escaped:
+                escaped = False
+            else:
+                in_image = False
+            special_match = special_pattern.search(string, i + 1)
+            next_i = special_match.start() if special_match is not None else length
+            if code_match is not None and i < code_match.start() < next_i:
+                next_i = code_match.start()
+            if next_i > i + 1:
+                in_image = False
+            i = next_i
+            continue
         if c == '\\' and not escaped:
             escaped = True
             i += 1
@@ -52,7 +79,9 @@ def find_core_tokens(string, root):
                 in_image = True
             elif c == ']':
                 i = find_link_image(string, i, delimiters, matches, root)
-                code_match = code_pattern.search(string, i)
+                # a code span at or after i is still the next one
+                if code_match is not None and code_match.start() < i:
+                    code_match = code_pattern.search(string, i)
             elif in_image:
                 in_image = False
         else:
@@ -391,6 +420,8 @@ def deactivate_delimiters(delimiters, index, delimiter_type):
 
 
 class Delimiter:
+    __slots__ = ('type', 'number', 'active', 'start', 'end', 'open', 'close')
+
     def __init__(self, start, end, string):
         self.type = string[start:end]
         self.number = end - start
@@ -427,6 +458,8 @@ class Delimiter:
 
 
 class MatchObj:
+    __slots__ = ('_start', '_end', 'fields', 'type')
+
     def __init__(self, start, end, *fields):
         self._start = start
         self._end = end
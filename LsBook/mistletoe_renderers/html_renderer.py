@@ -5,8 +5,8 @@ HTML renderer for mistletoe.
 import html
 import re
 
-from .base_renderer import BaseRenderer
-from .block_token import SecBlock
+from .base_renderer import BaseRenderer, buffered
+from .block_token import Paragraph
 from ..constants.code_extensions import Extensions
 
 postfix = list(map(lambda x: x.upper(), [
@@ -14,6 +14,21 @@ postfix = list(map(lambda x: x.upper(), [
     "doc", "docx", "xlsx", "ppt", "mpp", "mpt", "xps", "xlsb", "csv", "xml"
 ]))
 
+# html.entities.html5 includes entitydefs not ending with ';',
+# CommonMark seems to hate them, so...
+_charref = re.compile(r'&(#[0-9]+;'
+                      r'|#[xX][0-9a-fA-F]+;'
+                      r'|[^\t\n\f <&#;]{1,32};)')
+
+
+def unescape(s):
+    """
+    html.unescape with CommonMark entity references, without patching the html module.
+    """
+    if '&' not in s:
+        return s
+    return _charref.sub(html._replace_charref, s)
+
 
 class HTMLRenderer(BaseRenderer):
     """
@@ -22,20 +37,16 @@ class HTMLRenderer(BaseRenderer):
     See mistletoe.base_renderer module for more info.
     """
 
-    def __init__(self, *extras):
+    def __init__(self, *extras, plain_text=None):
         """
         Args:
             extras (list): allows subclasses to add even more custom tokens.
+            plain_text (PlainText): collects the plain text of the rendered
+                                    document, see plain_text module.
         """
         self._suppress_p_tag_stack = [False]
         super().__init__(*extras)
-        # html.entities.html5 includes entitydefs not ending with ';',
-        # CommonMark seems to hate them, so...
-        self._stdlib_charref = html._charref
-        _charref = re.compile(r'&(#[0-9]+;'
-                              r'|#[xX][0-9a-fA-F]+;'
-                              r'|[^\t\n\f <&#;]{1,32};)')
-        html._charref = _charref
+        self.plain_text = plain_text
         self.toc_tree = []
         self.count = {
             "h1": 0,
@@ -52,33 +63,47 @@ class HTMLRenderer(BaseRenderer):
         self.tag_prism = False
         self.tag_lightbox = False
 
-    def __exit__(self, *args):
-        super().__exit__(*args)
-        html._charref = self._stdlib_charref
-
     def render_to_plain(self, token):
         if hasattr(token, 'children'):
             inner = [self.render_to_plain(child) for child in token.children]
             return ''.join(inner)
         return self.escape_html(token.content)
 
-    def render_strong(self, token):
-        template = '<strong>{}</strong>'
-        return template.format(self.render_inner(token))
-
-    def render_emphasis(self, token):
-        template = '<em>{}</em>'
-        return template.format(self.render_inner(token))
+    def write_children(self, token, out, sep=None):
+        """
+        Writes the rendered children of token to out, separated by sep.
+        """
+        write = self.write
+        for i, child in enumerate(token.children):
+            if i and sep is not None:
+                out.append(sep)
+            write(child, out)
+
+    @buffered
+    def render_strong(self, token, out):
+        out.append('<strong>')
+        self.write_children(token, out)
+        out.append('</strong>')
+
+    @buffered
+    def render_emphasis(self, token, out):
+        out.append('<em>')
+        self.write_children(token, out)
+        out.append('</em>')
 
     def render_inline_code(self, token):
         self.tag_prism = True
         template = '<code class="language-vim">{}</code>'
         inner = html.escape(token.children[0].content)
+        if self.plain_text is not None:
+            self.plain_text.add('InlineCode', token.children[0].content)
         return template.format(inner)
 
-    def render_strikethrough(self, token):
-        template = '<del>{}</del>'
-        return template.format(self.render_inner(token))
+    @buffered
+    def render_strikethrough(self, token, out):
+        out.append('<del>')
+        self.write_children(token, out)
+        out.append('</del>')
 
     def render_image(self, token):
         self.tag_lightbox = True
@@ -91,42 +116,49 @@ class HTMLRenderer(BaseRenderer):
             title = f' title="{alt}"'
         return template.format(img_id=self._img_id, src=token.src, alt=alt, title=title)
 
-    def render_link(self, token):
+    @buffered
+    def render_link(self, token, out):
         target = token.target
 
         if self.if_blank(target):
-            template = '<a target=_Blank href="{target}"{title}>{inner}</a>'
+            out.append(f'<a target=_Blank href="{target}"')
         else:
-            template = '<a href="{target}"{title}>{inner}</a>'
+            out.append(f'<a href="{target}"')
 
         if token.title:
-            title = ' title="{}"'.format(self.escape_html(token.title))
-        else:
-            title = ''
-        inner = self.render_inner(token)
-        return template.format(target=target, title=title, inner=inner)
+            out.append(' title="{}"'.format(self.escape_html(token.title)))
+        out.append('>')
+        self.write_children(token, out)
+        out.append('</a>')
 
-    def render_auto_link(self, token):
+    @buffered
+    def render_auto_link(self, token, out):
         if token.mailto:
             target = 'mailto:{}'.format(token.target)
         else:
             target = token.target
 
         if self.if_blank(target):
-            template = '<a target=_Blank href="{target}">{inner}</a>'
+            out.append(f'<a target=_Blank href="{target}">')
         else:
-            template = '<a href="{target}">{inner}</a>'
-        inner = self.render_inner(token)
-        return template.format(target=target, inner=inner)
+            out.append(f'<a href="{target}">')
+        self.write_children(token, out)
+        out.append('</a>')
 
-    def render_escape_sequence(self, token):
-        return self.render_inner(token)
+    @buffered
+    def render_escape_sequence(self, token, out):
+        self.write_children(token, out)
 
     def render_raw_text(self, token):
-        return self.escape_html(token.content)
-
-    @staticmethod
-    def render_html_span(token):
+        if self.plain_text is None:
+            return self.escape_html(token.content)
+        text = unescape(token.content)
+        self.plain_text.add('RawText', text)
+        return html.escape(text).replace('&#x27;', "'")
+
+    def render_html_span(self, token):
+        if self.plain_text is not None:
+            self.plain_text.add('HTMLSpan', token.content)
         return token.content
 
     def render_heading(self, token):
@@ -137,6 +169,8 @@ class HTMLRenderer(BaseRenderer):
     </a>{inner}
 </h{level}>"""
         inner = self.render_inner(token)
+        if self.plain_text is not None:
+            self.plain_text.separate()
 
         self._id += 1
         _id = f"anchor_{self._id}"
@@ -198,22 +232,34 @@ class HTMLRenderer(BaseRenderer):
 
         return template.format(level=token.level, inner=inner, _id=_id)
 
-    def render_quote(self, token):
-        elements = ['<blockquote>']
+    @buffered
+    def render_quote(self, token, out):
+        out.append('<blockquote>\n')
         self._suppress_p_tag_stack.append(False)
-        elements.extend([self.render(child) for child in token.children])
+        for child in token.children:
+            self.write(child, out)
+            out.append('\n')
         self._suppress_p_tag_stack.pop()
-        elements.append('</blockquote>')
-        return '\n'.join(elements)
+        out.append('</blockquote>')
 
-    def render_paragraph(self, token):
+    @buffered
+    def render_paragraph(self, token, out):
         if self._suppress_p_tag_stack[-1]:
-            return '{}'.format(self.render_inner(token))
-        return '<p>{}</p>'.format(self.render_inner(token))
+            self.write_children(token, out)
+        else:
+            out.append('<p>')
+            self.write_children(token, out)
+            out.append('</p>')
+        if self.plain_text is not None:
+            self.plain_text.separate()
 
     def render_block_code(self, token):
         language = token.language.lower() if token.language else "vim"
         inner = html.escape(token.children[0].content)
+        if self.plain_text is not None:
+            self.plain_text.separate()
+            self.plain_text.add(token.__class__.__name__, token.children[0].content)
+            self.plain_text.separate()
         # mermaid
         if language == "mermaid":
             self.tag_mermaid = True
@@ -224,30 +270,33 @@ class HTMLRenderer(BaseRenderer):
         language = Extensions.get(language, language)
         return f'<pre class="line-numbers"><code class="lang-{language} rainbow-braces">{inner}</code></pre>'
 
-    def render_list(self, token):
-        template = '<{tag}{attr}>\n{inner}\n</{tag}>'
+    @buffered
+    def render_list(self, token, out):
         if token.start is not None:
             tag = 'ol'
             attr = ' start="{}"'.format(token.start) if token.start != 1 else ''
         else:
             tag = 'ul'
             attr = ''
+        out.append(f'<{tag}{attr}>\n')
         self._suppress_p_tag_stack.append(not token.loose)
-        inner = '\n'.join([self.render(child) for child in token.children])
+        self.write_children(token, out, '\n')
         self._suppress_p_tag_stack.pop()
-        return template.format(tag=tag, attr=attr, inner=inner)
+        out.append(f'\n</{tag}>')
 
-    def render_list_item(self, token):
+    @buffered
+    def render_list_item(self, token, out):
         if len(token.children) == 0:
-            return '<li></li>'
-        inner = '\n'.join([self.render(child) for child in token.children])
-        inner_template = '\n{}\n'
-        if self._suppress_p_tag_stack[-1]:
-            if token.children[0].__class__.__name__ == 'Paragraph':
-                inner_template = inner_template[1:]
-            if token.children[-1].__class__.__name__ == 'Paragraph':
-                inner_template = inner_template[:-1]
-        return '<li>{}</li>'.format(inner_template.format(inner))
+            out.append('<li></li>')
+            return
+        suppress = self._suppress_p_tag_stack[-1]
+        out.append('<li>')
+        if not (suppress and isinstance(token.children[0], Paragraph)):
+            out.append('\n')
+        self.write_children(token, out, '\n')
+        if not (suppress and isinstance(token.children[-1], Paragraph)):
+            out.append('\n')
+        out.append('</li>')
 
     def render_table(self, token):
         # This is actually gross and I wonder if there's a better way to do it.
@@ -283,46 +332,68 @@ class HTMLRenderer(BaseRenderer):
             align = 'left'
         attr = ' align="{}"'.format(align)
         inner = self.render_inner(token)
+        if self.plain_text is not None:
+            self.plain_text.separate()
         return template.format(tag=tag, attr=attr, inner=inner)
 
     @staticmethod
     def render_thematic_break(token):
         return '<hr />'
 
-    @staticmethod
-    def render_line_break(token):
+    def render_line_break(self, token):
+        if self.plain_text is not None:
+            self.plain_text.add('LineBreak', '\n')
         return '\n' if token.soft else '<br />\n'
 
-    @staticmethod
-    def render_html_block(token):
+    def render_html_block(self, token):
+        if self.plain_text is not None:
+            self.plain_text.separate()
+            self.plain_text.add('HTMLBlock', token.content)
+            self.plain_text.separate()
         return token.content
 
-    def render_document(self, token):
-        SecBlock.init()
+    @buffered
+    def render_document(self, token, out):
         self.footnotes.update(token.footnotes)
-        inner = '\n'.join([self.render(child) for child in token.children])
-        return '{}\n'.format(inner) if inner else ''
+        start = len(out)
+        self.write_children(token, out, '\n')
+        if any(out[start:]):
+            out.append('\n')
 
     @staticmethod
     def escape_html(raw):
-        return html.escape(html.unescape(raw)).replace('&#x27;', "'")
+        return html.escape(unescape(raw)).replace('&#x27;', "'")
 
-    def render_sec_block(self, token):
-        inner = ''.join([self.render(child) for child in token.children])
-        return f'<sec data-title="{token.title}"><div class="panel panel-default"><div class="panel-heading"><b>{token.title}<a class="pull-right section atTitle btn btn-default {"sec-show" if token.show else ""}" target="sectionx{token.count}"><span class="fa {"fa-angle-up" if token.show else "fa-angle-down"}" /></a></b></div><div class="panel-collapse {"in" if token.show else "collapse"}" id="sectionx{token.count}"><div class="panel-body">{inner}</div></div></div></sec>'
+    @buffered
+    def render_sec_block(self, token, out):
+        if self.plain_text is not None:
+            self.plain_text.add('RawText', token.title)
+            self.plain_text.separate()
+        out.append(f'<sec data-title="{token.title}"><div class="panel panel-default"><div class="panel-heading"><b>{token.title}<a class="pull-right section atTitle btn btn-default {"sec-show" if token.show else ""}" target="sectionx{token.count}"><span class="fa {"fa-angle-up" if token.show else "fa-angle-down"}" /></a></b></div><div class="panel-collapse {"in" if token.show else "collapse"}" id="sectionx{token.count}"><div class="panel-body">')
+        self.write_children(token, out)
+        out.append('</div></div></div></sec>')
 
     def render_math(self, token):
         self.tag_katex = True
+        if self.plain_text is not None:
+            self.plain_text.add('Math', token.content)
         return rf'\({token.content}\)'
 
     def render_math_block(self, token):
         self.tag_katex = True
+        if self.plain_text is not None:
+            self.plain_text.separate()
+            self.plain_text.add('MathBlock', token.content)
+            self.plain_text.separate()
         return rf"\[{token.content}\]"
 
-    def render_spoiler(self, token):
+    @buffered
+    def render_spoiler(self, token, out):
         """鼠标扫过显示"""
         # return f'<span class="spoiler">{token.content}</span>'
-        return f'<span class="spoiler"><span class="spoiler_span">{"".join(map(self.render, token.children))}</span></span>'
+        out.append('<span class="spoiler"><span class="spoiler_span">')
+        self.write_children(token, out)
+        out.append('</span></span>')
 
     @staticmethod
     def if_blank(target):
@@ -0,0 +1,56 @@
+"""
+Per-document parse state.
+
+Everything that used to live in module globals and class attributes while a
+document is being parsed (the root node holding footnotes, inline code matches
+found by core_tokens, the setext switch used by Quote, the SecBlock counter)
+is kept in a ParseContext. The active context is stored in a ContextVar, so
+each thread parses its own document and nested documents restore the outer
+context when they are done.
+"""
+
+import contextvars
+from contextlib import contextmanager
+
+
+class ParseContext(object):
+    """
+    Parse state of a single document.
+
+    Attributes:
+        root (Document): the document being parsed; footnotes are stored in root.footnotes.
+        code_matches (list): inline code matches found by core_tokens, consumed by InlineCode.find.
+        parse_setext (bool): whether paragraphs may become setext headings, disabled by Quote.
+        sec_count (int): number of SecBlock tokens read so far.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+        self.code_matches = []
+        self.parse_setext = True
+        self.sec_count = 0
+
+
+_current = contextvars.ContextVar("parse_context", default=None)
+
+
+def current():
+    """
+    Returns the context of the document being parsed, or None outside parsing.
+    """
+    return _current.get()
+
+
+@contextmanager
+def parsing(root=None):
+    """
+    Makes a fresh ParseContext current for the duration of the block.
+
+    Arguments:
+        root (Document): the document being parsed.
+    """
+    token = _current.set(ParseContext(root))
+    try:
+        yield _current.get()
+    finally:
+        _current.reset(token)
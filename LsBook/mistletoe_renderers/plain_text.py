@@ -0,0 +1,83 @@
+"""
+Plain text collected while rendering, for the search index.
+"""
+
+import re
+
+from .html_renderer import unescape
+
+_tag = re.compile(r'<[^>]+>')
+_space = re.compile(r'\s+')
+
+
+class PlainText(object):
+    """
+    Collects the plain text of a document during the render pass.
+
+    The text is not html-escaped; the markup of HTML tokens is removed and
+    their entity references are resolved.
+
+    HTMLRenderer calls self.add with the class name of the token the text
+    comes from, and self.separate between blocks, so that words of
+    adjacent blocks are not joined.
+
+    Attributes:
+        rules (dict): maps token class names to how their text is collected:
+                      True collects all of it, False skips it, an int n
+                      keeps only its first n lines. Tokens not listed are
+                      collected in full.
+        limit (int): collection stops after limit bytes of utf-8 text;
+                     None for no limit.
+    """
+    __slots__ = ('rules', 'limit', 'size', 'parts')
+
+    default_rules = {
+        'CodeFence': 10,
+        'BlockCode': 10,
+        'Math': False,
+        'MathBlock': False,
+    }
+    default_limit = 64 * 1024
+
+    def __init__(self, rules=None, limit=default_limit):
+        self.rules = dict(self.default_rules, **(rules or {}))
+        self.limit = limit
+        self.size = 0
+        self.parts = []
+
+    @property
+    def full(self):
+        return self.limit is not None and self.size >= self.limit
+
+    def add(self, name, text):
+        """
+        Collects text of a token of class name, according to self.rules.
+        """
+        if self.full:
+            return
+        rule = self.rules.get(name, True)
+        if rule is not True:
+            if not rule:
+                return
+            text = '\n'.join(text.split('\n', rule)[:rule])
+        if name in ('HTMLBlock', 'HTMLSpan'):
+            text = unescape(_tag.sub('', text))
+        size = len(text.encode('utf-8'))
+        if self.limit is not None and self.size + size > self.limit:
+            text = text.encode('utf-8')[:self.limit - self.size].decode('utf-8', 'ignore')
+            size = self.limit - self.size
+        self.size += size
+        self.parts.append(text)
+
+    def separate(self):
+        """
+        Marks the end of a block.
+        """
+        if self.parts and self.parts[-1] != '\n':
+            self.parts.append('\n')
+
+    def text(self):
+        """
+        The collected text, with runs of whitespace collapsed to one space.
+        """
+        return _space.sub(' ', ''.join(self.parts)).strip()
@@ -2,8 +2,9 @@
 内联一级令牌
 """
 
+import contextvars
 import re
-from . import span_tokenizer, core_tokens
+from . import span_tokenizer, core_tokens, parse_context
 
 """
 在解析过程中包含的令牌,在指定的顺序中。
@@ -11,8 +12,6 @@ from . import span_tokenizer, core_tokens
 __all__ = ['Math', 'Spoiler', 'HTMLSpan', 'EscapeSequence', 'Strikethrough', 'AutoLink', 'CoreTokens',
            'InlineCode', 'LineBreak', 'RawText']
 
-_root_node = None
-
 
 def tokenize_inner(content):
     """
@@ -27,43 +26,62 @@ def tokenize_inner(content):
 
     See also: span_tokenizer.tokenize, block_token.tokenize.
     """
-    return span_tokenizer.tokenize(content, _token_types)
+    if parse_context.current() is None:
+        with parse_context.parsing():
+            return span_tokenizer.tokenize(content, _token_types.get())
+    return span_tokenizer.tokenize(content, _token_types.get())
+
+
+def token_types():
+    """
+    Returns the span-level token classes used in the current context.
+    """
+    return _token_types.get()
 
 
 def add_token(token_cls, position=1):
     """
     Allows external manipulation of the parsing process.
-    This function is called in BaseRenderer.__enter__.
+    This function is called in BaseRenderer.__init__.
+
+    The change only affects the current thread (context).
 
     Arguments:
         token_cls (SpanToken): token to be included in the parsing process.
     """
-    _token_types.insert(position, token_cls)
+    types = list(_token_types.get())
+    types.insert(position, token_cls)
+    _token_types.set(types)
 
 
 def remove_token(token_cls):
     """
     Allows external manipulation of the parsing process.
-    This function is called in BaseRenderer.__exit__.
 
     Arguments:
         token_cls (SpanToken): token to be removed from the parsing process.
     """
-    _token_types.remove(token_cls)
+    types = list(_token_types.get())
+    types.remove(token_cls)
+    _token_types.set(types)
 
 
 def reset_tokens():
     """
-    Resets global _token_types to all token classes in __all__.
+    Resets _token_types of the current context to all token classes in __all__.
+    This function is called in BaseRenderer.__exit__ when custom tokens were added.
     """
-    global _token_types
-    _token_types = [globals()[cls_name] for cls_name in __all__]
+    _token_types.set(_default_token_types)
 
 
 class SpanToken:
+    __slots__ = ('content', 'children')
     parse_inner = True
     parse_group = 1
     precedence = 5
+    # characters one of which must appear in the string for find() to match;
+    # None means find() is always called
+    trigger = None
 
     def __init__(self, match):
         if not self.parse_inner:
@@ -80,35 +98,42 @@ class SpanToken:
 
 
 class CoreTokens(SpanToken):
+    __slots__ = ()
     precedence = 3
+    trigger = '`*_['
 
     def __new__(self, match):
         return globals()[match.type](match)
 
     @classmethod
     def find(cls, string):
-        return core_tokens.find_core_tokens(string, _root_node)
+        context = parse_context.current()
+        return core_tokens.find_core_tokens(string, context.root, context.code_matches)
 
 
 class Strong(SpanToken):
     """
     Strong tokens. ("**some text**")
     """
+    __slots__ = ()
 
 
 class Emphasis(SpanToken):
     """
     Emphasis tokens. ("*some text*")
     """
+    __slots__ = ()
 
 
 class InlineCode(SpanToken):
     """
     Inline code tokens. ("`some code`")
     """
+    __slots__ = ()
     pattern = re.compile(r"(?<!\\|`)(?:\\\\)*(`+)(?!`)(.+?)(?<!`)\1(?!`)", re.DOTALL)
     parse_inner = False
     parse_group = 2
+    trigger = '`'
 
     def __init__(self, match):
         content = match.group(self.parse_group)
@@ -116,8 +141,10 @@ class InlineCode(SpanToken):
 
     @classmethod
     def find(cls, string):
-        matches = core_tokens._code_matches
-        core_tokens._code_matches = []
+        # found by CoreTokens.find, which runs first
+        context = parse_context.current()
+        matches = context.code_matches
+        context.code_matches = []
         return matches
 
 
@@ -125,7 +152,9 @@ class Strikethrough(SpanToken):
     """
     Strikethrough tokens. ("~~some text~~")
     """
+    __slots__ = ()
     pattern = re.compile(r"(?<!\\)(?:\\\\)*~~(.+?)~~", re.DOTALL)
+    trigger = '~'
 
 
 class Image(SpanToken):
@@ -136,6 +165,7 @@ class Image(SpanToken):
         src (str): image source.
         title (str): image title (default to empty).
     """
+    __slots__ = ('src', 'title')
 
     def __init__(self, match):
         self.src = match.group(2).strip()
@@ -149,6 +179,7 @@ class Link(SpanToken):
     Attributes:
         target (str): link target.
     """
+    __slots__ = ('target', 'title')
 
     def __init__(self, match):
         self.target = EscapeSequence.strip(match.group(2).strip())
@@ -163,9 +194,11 @@ class AutoLink(SpanToken):
         children (iterator): a single RawText node for alternative text.
         target (str): link target.
     """
+    __slots__ = ('target', 'mailto')
     pattern = re.compile(
         r"(?<!\\)(?:\\\\)*<([A-Za-z][A-Za-z0-9+.-]{1,31}:[^ <>]*?|[A-Za-z0-9.!#$%&'*+/=?^_`{|}~-]+@[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?(?:\.[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?)*)>")
     parse_inner = False
+    trigger = '<'
 
     def __init__(self, match):
         content = match.group(self.parse_group)
@@ -181,9 +214,11 @@ class EscapeSequence(SpanToken):
     Attributes:
         children (iterator): a single RawText node for alternative text.
     """
+    __slots__ = ()
     pattern = re.compile(r"\\([!\"#$%&'()*+,-./:;<=>?@\[\\\]^_`{|}~])")
     parse_inner = False
     precedence = 2
+    trigger = '\\'
 
     def __init__(self, match):
         self.children = (RawText(match.group(self.parse_group)),)
@@ -197,9 +232,11 @@ class LineBreak(SpanToken):
     """
     Hard or soft line breaks.
     """
+    __slots__ = ('soft',)
     pattern = re.compile(r'( *|\\)\n')
     parse_inner = False
     parse_group = 0
+    trigger = '\n'
 
     def __init__(self, match):
         content = match.group(1)
@@ -214,6 +251,7 @@ class RawText(SpanToken):
     RawText is the only token that accepts a string for its constructor,
     instead of a match object. Also, all recursions should bottom out here.
     """
+    __slots__ = ()
 
     def __init__(self, content):
         self.content = content
@@ -247,24 +285,30 @@ class HTMLSpan(SpanToken):
     Attributes:
         content (str): literal strings rendered as-is.
     """
+    __slots__ = ()
     pattern = re.compile('|'.join([_open_tag, _closing_tag, _comment,
                                    _instruction, _declaration, _cdata]),
                          re.DOTALL)
     parse_inner = False
     parse_group = 0
+    trigger = '<'
 
 
 class Math(SpanToken):
+    __slots__ = ()
     pattern = re.compile(r'(\${1,2})([^$\n]+?)\1')
     parse_inner = False
     parse_group = 2
+    trigger = '$'
 
 
 class Spoiler(SpanToken):
+    __slots__ = ()
     pattern = re.compile(r'{%s%}(.*?){%ends%}')
     parse_inner = True
     parse_group = 1
+    trigger = '{'
 
 
-_token_types = []
-reset_tokens()
+_default_token_types = [globals()[cls_name] for cls_name in __all__]
+_token_types = contextvars.ContextVar("span_token_types", default=_default_token_types)
@@ -2,10 +2,23 @@
 内联分词器
 """
 
+import re
+
+# 令牌类型 -> 扫描器，参见 scanner
+_scanners = {}
+
 
 def tokenize(string, token_types):
     *token_types, fallback_token = token_types
-    tokens = find_tokens(string, token_types, fallback_token)
+    pattern, dispatch = scanner(token_types)
+    if pattern is None:
+        present = None
+    else:
+        present = set(pattern.findall(string))
+        # 纯文本
+        if not present:
+            return [fallback_token(string)] if string else []
+    tokens = find_tokens(string, token_types, fallback_token, present)
     token_buffer = []
     if tokens:
         prev = tokens[0]
@@ -15,12 +28,42 @@ def tokenize(string, token_types):
     return make_tokens(token_buffer, 0, len(string), string, fallback_token)
 
 
-def find_tokens(string, token_types, fallback_token):
+def scanner(token_types):
+    """
+    每种令牌只有在文本中出现其触发字符（token_type.trigger）时才可能匹配，
+    扫描器用一个正则一次找出文本中出现的全部触发字符。
+
+    :return: (触发字符正则, [(令牌类型, 触发字符)])，有令牌类型未声明触发字符时正则为 None
+    """
+    key = tuple(token_types)
+    result = _scanners.get(key)
+    if result is None:
+        dispatch = [(token_type, getattr(token_type, "trigger", None)) for token_type in token_types]
+        if any(trigger is None for _, trigger in dispatch):
+            pattern = None
+        else:
+            chars = sorted(set("".join(trigger for _, trigger in dispatch)))
+            pattern = re.compile("[" + "".join(map(re.escape, chars)) + "]")
+        result = _scanners[key] = (pattern, dispatch)
+    return result
+
+
+def find_tokens(string, token_types, fallback_token, present=None):
+    """
+    :param present: 文本中出现的触发字符，为 None 时执行全部令牌类型的查找
+    """
     tokens = []
-    for token_type in token_types:
+    for token_type, trigger in scanner(token_types)[1]:
+        if present is not None and trigger is not None and present.isdisjoint(trigger):
+            continue
         for m in token_type.find(string):
-            tokens.append(ParseToken(m.start(), m.end(), m, string, token_type, fallback_token))
-    return sorted(tokens)
+            tokens.append(ParseToken(m.start(), m.end(), m, token_type))
+    tokens.sort(key=_start)
+    return tokens
+
+
+def _start(token):
+    return token.start
 
 
 def eval_tokens(x, y, token_buffer):
@@ -66,7 +109,7 @@ def make_tokens(tokens, start, end, string, fallback_token):
             t = fallback_token(string[prev_end:token.start])
             if t is not None:
                 result.append(t)
-        t = token.make()
+        t = token.make(string, fallback_token)
         if t is not None:
             result.append(t)
         prev_end = token.end
@@ -76,15 +119,15 @@ def make_tokens(tokens, start, end, string, fallback_token):
 
 
 class ParseToken:
-    def __init__(self, start, end, match, string, cls, fallback_token):
+    __slots__ = ('start', 'end', 'parse_start', 'parse_end', 'match', 'cls', 'children')
+
+    def __init__(self, start, end, match, cls):
         self.start = start
         self.end = end
         self.parse_start = match.start(cls.parse_group)
         self.parse_end = match.end(cls.parse_group)
         self.match = match
-        self.string = string
         self.cls = cls
-        self.fallback_token = fallback_token
         self.children = []
 
     def append_child(self, child):
@@ -94,10 +137,10 @@ class ParseToken:
             else:
                 eval_new_child(self, child)
 
-    def make(self):
+    def make(self, string, fallback_token):
         if not self.cls.parse_inner:
             return self.cls(self.match)
-        children = make_tokens(self.children, self.parse_start, self.parse_end, self.string, self.fallback_token)
+        children = make_tokens(self.children, self.parse_start, self.parse_end, string, fallback_token)
         token = self.cls(self.match)
         token.children = children
         return token
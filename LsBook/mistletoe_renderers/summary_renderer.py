@@ -1,19 +1,22 @@
+import hashlib
 import logging
+import os
+import re
 
 from . import Document
+from .block_token import Heading, SetextHeading
 from .html_renderer import HTMLRenderer
-from ..utils.path import get_rel_path, get_relative_path
+from ..utils.path import get_pure_path, get_rel_path, get_relative_path
 
 
 class SummaryRenderer(HTMLRenderer):
-    def __init__(self, *extras, book_output=None, current_path=None, current_data_level=None, index=None, summary=None):
+    def __init__(self, *extras, book_output=None, current_path=None, current_data_level=None, summary=None):
         """目录生成器
 
         :param extras:
         :param book_output: 书籍输出目录
         :param current_path: 当前文件路径
         :param current_data_level: 当前文件级别
-        :param index: 本页所处索引位置
         """
         super().__init__(*extras)
         if summary is None:
@@ -31,20 +34,6 @@ class SummaryRenderer(HTMLRenderer):
         self._book_output = book_output
         # 当前页面级别
         self._current_data_level = current_data_level
-        # 本页所处索引位置
-        self._index = index
-        # 目录字典：记录整个目录信息，包括上下页
-        self.summary_dict = {}
-        # 上一页标题
-        self.prev_title = ""
-        # 上一页相对路径：相对本页面
-        self.prev_relative_path = ""
-        # 下一页标题
-        self.next_title = ""
-        # 下一页相对路径：相对本页面
-        self.next_relative_path = ""
-        # 本页面相对于根的相对路径
-        self.basePath = "."
         self._target = []
         # 标记是否为根标题
         self._is_root_heading = False
@@ -65,24 +54,13 @@ class SummaryRenderer(HTMLRenderer):
             self._count += 1
             if self._current_path:
                 # 计算相对路径
-                target = token.target
-                target = get_rel_path(book_output=self._book_output, ref=target,
-                                      current_ref=self._current_path) + ".html"
-                # 通过当前页码计数记录前后页
-                if self._index == self._count:
-                    self.basePath = get_relative_path(self._book_output, self._current_path)
-                elif self._index - 1 == self._count:
-                    self.prev_title = inner
-                    self.prev_relative_path = target
-                elif self._index + 1 == self._count:
-                    self.next_title = inner
-                    self.next_relative_path = target
-                pass
+                target = self.resolve_target(token.target)
             else:
                 self.summary[self._count] = {"data_level": self.get_data_level(), "target": target, "title": inner}
                 pass
         self._target.append(target)
-        logging.info(f"{inner}\t\t{self.get_data_level()}")
+        if not self._current_path:
+            logging.info(f"{inner}\t\t{self.get_data_level()}")
         return template.format(data_level=self.get_data_level(), inner=inner, target=target)
 
     def render_heading(self, token):
@@ -127,15 +105,20 @@ class SummaryRenderer(HTMLRenderer):
         _count = self._count + 1
         inner = '\n'.join([self.render(child) for child in token.children])
 
-        if self.get_data_level(_count) == self._current_data_level:
-            template = '<li class="chapter active" data-level="{data_level}" data-path="{target}">{inner}</li>' \
-                .format(data_level=self.get_data_level(_count), inner=inner, target=self._target.pop())
-        else:
-            template = '<li class="chapter" data-level="{data_level}" data-path="{target}">{inner}</li>' \
-                .format(data_level=self.get_data_level(_count), inner=inner, target=self._target.pop())
+        data_level = self.get_data_level(_count)
+        template = '<li class="chapter{active}" data-level="{data_level}" data-path="{target}">{inner}</li>' \
+            .format(active=self.chapter_class(data_level), data_level=data_level, inner=inner, target=self._target.pop())
 
         return template
 
+    def resolve_target(self, target):
+        """计算目录链接相对于当前页面的路径"""
+        return get_rel_path(book_output=self._book_output, ref=target, current_ref=self._current_path) + ".html"
+
+    def chapter_class(self, data_level):
+        """当前页面所在章节追加 active 标记"""
+        return " active" if data_level == self._current_data_level else ""
+
     def render_paragraph(self, token):
         return '{}'.format(self.render_inner(token))
 
@@ -143,7 +126,7 @@ class SummaryRenderer(HTMLRenderer):
         self.footnotes.update(token.footnotes)
         _inner = []
         for child in token.children:
-            if child.__class__.__name__ in ("Heading", "SetextHeading"):
+            if isinstance(child, (Heading, SetextHeading)):
                 self._is_root_heading = True
             _inner.append(self.render(child))
         inner = "\n".join(_inner)
@@ -157,20 +140,143 @@ class SummaryRenderer(HTMLRenderer):
     pass
 
 
-def renderer_summary(_book_output, _item, _index, _page, _summary):
-    with SummaryRenderer(book_output=_book_output, current_path=_item.get("target", ""),
-                         current_data_level=_item.get("data_level"), index=_index, summary=_summary) as renderer:
-        summary = renderer.render(Document(_page))
-
-    summary_classify = {
-        'title': _item.get("title", ""),
-        'level': _item.get("data_level", ""),
-        'prev_title': renderer.prev_title,
-        'prev_relative_path': renderer.prev_relative_path,
-        'next_title': renderer.next_title,
-        'next_relative_path': renderer.next_relative_path,
-        'summary': summary,
-        'href': _item.get("target", ""),
-        'basePath': renderer.basePath
-    }
-    return summary_classify
+class SummaryTreeRenderer(SummaryRenderer):
+    """目录模板生成器
+
+    与逐页渲染走同一套流程，但相对路径与 active 标记输出为占位符，
+    由 SummaryTree 为每个页面填充。
+    """
+
+    def __init__(self, *extras, book_output=None, summary=None):
+        super().__init__(*extras, book_output=book_output, current_path=_SLOT, summary=summary)
+        # 占位符：("target", 目录链接) 或 ("active", 目录级别)
+        self.slots = []
+
+    def _slot(self, *slot):
+        self.slots.append(slot)
+        return f"{_SLOT}{len(self.slots) - 1}{_SLOT}"
+
+    def resolve_target(self, target):
+        return self._slot("target", target)
+
+    def chapter_class(self, data_level):
+        return self._slot("active", data_level)
+
+
+_SLOT = "\x00"
+_slot_pattern = re.compile(f"{_SLOT}(\\d+){_SLOT}")
+
+
+class SummaryTree(object):
+    """目录导航树
+
+    目录只解析一次，每个页面的目录 html 由预编译片段拼接而成，
+    只替换相对路径与 active 标记。
+    """
+
+    def __init__(self, book_output, summary, template, slots):
+        """
+        :param book_output: 书籍输出目录
+        :param summary: 目录结构 {页码: {data_level, target, title}}
+        :param template: SummaryTreeRenderer 输出的目录模板
+        :param slots: 模板占位符
+        """
+        self.book_output = book_output
+        self.summary = summary
+        # 偶数位为静态片段，奇数位为占位符序号
+        self._segments = _slot_pattern.split(template)
+        self._slots = slots
+        # 同一目录下的页面相对路径一致，按目录缓存
+        self._dir_cache = {}
+
+    def __getstate__(self):
+        # 发送到工作进程时不携带缓存
+        state = self.__dict__.copy()
+        state["_dir_cache"] = {}
+        return state
+
+    @property
+    def digest(self):
+        """目录模板的哈希，目录修改后所有页面的目录 html 随之变化"""
+        _hash = hashlib.sha1("\x00".join(self._segments).encode("utf-8"))
+        _hash.update(repr(self._slots).encode("utf-8"))
+        return _hash.hexdigest()
+
+    def _compile(self, dirname):
+        """按页面所在目录填充相对路径，返回以 active 标记分隔的片段与对应目录级别"""
+        if dirname in self._dir_cache:
+            return self._dir_cache[dirname]
+        current_ref = get_pure_path(dirname, "_")
+        chunks = []
+        levels = []
+        buffer = []
+        for i, segment in enumerate(self._segments):
+            if i % 2 == 0:
+                buffer.append(segment)
+                continue
+            kind, value = self._slots[int(segment)]
+            if kind == "target":
+                buffer.append(self.resolve(value, current_ref))
+            else:
+                chunks.append("".join(buffer))
+                levels.append(value)
+                buffer = []
+        chunks.append("".join(buffer))
+        self._dir_cache[dirname] = chunks, levels
+        return chunks, levels
+
+    def resolve(self, target, current_ref):
+        """目录链接相对于当前页面的路径"""
+        return get_rel_path(book_output=self.book_output, ref=target, current_ref=current_ref) + ".html"
+
+    def render_page(self, href, data_level):
+        """根据页面路径与目录级别生成目录 html，供工作进程使用"""
+        chunks, levels = self._compile(os.path.dirname(href))
+        parts = [chunks[0]]
+        for level, chunk in zip(levels, chunks[1:]):
+            parts.append(" active" if level == data_level else "")
+            parts.append(chunk)
+        return "".join(parts)
+
+    def render_shared(self):
+        """生成共享目录 html：路径相对于书籍根目录，不含 active 标记"""
+        chunks, _ = self._compile("")
+        return "".join(chunks)
+
+    def classify(self, index):
+        """生成指定页面的前后页等信息，不含目录 html，目录在工作进程中由 render_page 生成
+
+        :param index: 页码
+        """
+        item = self.summary[index]
+        href = item.get("target", "")
+        prev_item = self.summary.get(index - 1, {})
+        next_item = self.summary.get(index + 1, {})
+        return {
+            'title': item.get("title", ""),
+            'level': item.get("data_level", ""),
+            'prev_title': prev_item.get("title", ""),
+            'prev_relative_path': self.resolve(prev_item.get("target", ""), href) if prev_item else "",
+            'next_title': next_item.get("title", ""),
+            'next_relative_path': self.resolve(next_item.get("target", ""), href) if next_item else "",
+            'href': href,
+            'basePath': get_relative_path(self.book_output, href)
+        }
+
+    def classify_list(self):
+        """按目录顺序生成全部页面的描述"""
+        return [self.classify(index) for index in self.summary]
+
+
+def summary_tree(book_output, page, summary):
+    """解析目录模板，生成导航树
+
+    :param book_output: 书籍输出目录
+    :param page: 目录文件内容
+    :param summary: 目录结构
+    :return: SummaryTree
+    """
+    with SummaryTreeRenderer(book_output=book_output, summary=summary) as renderer:
+        template = renderer.render(Document(page))
+    return SummaryTree(book_output, summary, template, renderer.slots)
+
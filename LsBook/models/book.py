@@ -1,13 +1,17 @@
-from concurrent.futures.process import ProcessPoolExecutor
+import os
+
+from ..utils.pool import WorkerPool
 
 
 class Book(object):
-    def __init__(self, book_path, book_output, pool: ProcessPoolExecutor, base_assets):
+    def __init__(self, book_path, book_output, pool: WorkerPool, base_assets, cache_dir=None, force=False,
+                 assets_mode="copy", assets_store=None):
         self._book_path = book_path
         self._book_output = book_output
         self._summary_path = "SUMMARY.md"
         self._summary_json = {}
         self._summary_classify_list = []
+        self._summary_tree = None
         self._config = {}
         self._assets_path = ["assets", "lsbook"]
         self._assets_path_out = "lsbook"
@@ -15,6 +19,14 @@ class Book(object):
         self.pool = pool
         self._base_assets = base_assets
         self._book_js = ""
+        self._cache_dir = cache_dir
+        self.force = force
+        # 主题资源安装方式与共享资源库
+        self.assets_mode = assets_mode
+        self.assets_store = assets_store
+        self._manifest = None
+        self._output_files = set()
+        self._hashed_outputs = set()
 
     @property
     def book_path(self):
@@ -91,6 +103,16 @@ class Book(object):
         """目录分类后结构"""
         return self._summary_classify_list
 
+    @property
+    def summary_tree(self):
+        """目录导航树"""
+        return self._summary_tree
+
+    @summary_tree.setter
+    def summary_tree(self, tree):
+        """目录导航树"""
+        self._summary_tree = tree
+
     @property
     def i18n(self):
         """语言字符"""
@@ -111,6 +133,46 @@ class Book(object):
         """自定义 js"""
         self._book_js = book_js
 
+    @property
+    def cache_dir(self):
+        """增量构建缓存目录，为空时使用输出目录"""
+        return self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, path):
+        """增量构建缓存目录"""
+        self._cache_dir = path
+
+    @property
+    def manifest(self):
+        """增量构建清单"""
+        return self._manifest
+
+    @manifest.setter
+    def manifest(self, manifest):
+        """增量构建清单"""
+        self._manifest = manifest
+
+    @property
+    def output_files(self):
+        """本次生成写入或保留的输出文件（规范化绝对路径），其余文件将被删除"""
+        return self._output_files
+
+    @property
+    def hashed_outputs(self):
+        """最近一次生成页面时写入、以内容哈希命名的文件（搜索索引分片、共享目录），其余同类文件已过期"""
+        return self._hashed_outputs
+
+    def add_output(self, *files, hashed=False):
+        """记录输出文件
+
+        :param hashed: 是否为随页面一同生成、以内容哈希命名的文件
+        """
+        files = [os.path.normpath(file) for file in files]
+        self._output_files.update(files)
+        if hashed:
+            self._hashed_outputs.update(files)
+
     @property
     def base_assets(self):
         return self._base_assets
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+
+
+class Manifest(object):
+    """增量构建清单
+
+    记录每个页面输入内容的哈希、搜索索引记录摘要、外部图片与生成耗时，
+    再次生成时只重新渲染输入发生变化的页面。
+    搜索索引记录按摘要保存在单独的记录文件中，每行为 "摘要\\t记录 json"，未变化的记录不重新序列化。
+    """
+    version = 4
+
+    def __init__(self, path, records_path):
+        """
+        :param path: 清单文件路径
+        :param records_path: 搜索索引记录文件路径
+        """
+        self._path = path
+        self._records_path = records_path
+        # 上次生成记录
+        self._pages = {}
+        # 本次生成记录
+        self._current = {}
+        # 搜索索引记录摘要 -> 记录 json
+        self._records = {}
+
+    @property
+    def path(self):
+        """清单文件路径"""
+        return self._path
+
+    def load(self):
+        """读取清单与搜索索引记录，无法识别时返回 False"""
+        if not os.path.isfile(self._path):
+            return False
+        try:
+            with open(self._path, encoding="utf-8") as f:
+                _json = json.load(f)
+            if _json.get("version") != self.version:
+                return False
+            records = {}
+            with open(self._records_path, encoding="utf-8") as f:
+                for line in f:
+                    digest, _, record = line.rstrip("\n").partition("\t")
+                    records[digest] = record
+        except (OSError, ValueError):
+            logging.warning(f"增量构建清单无法识别，完整生成：{self._path}")
+            return False
+        self._pages = _json.get("pages", {})
+        self._records = records
+        return True
+
+    def get(self, href, page_hash):
+        """获取未变化页面的记录
+
+        :param href: 页面路径
+        :param page_hash: 页面输入哈希
+        :return: 记录 {"hash", "search", "assets_img", "cost"}，页面需要重新生成时返回 None
+        """
+        page = self.previous(href)
+        if page is None or page.get("hash") != page_hash:
+            return None
+        return page
+
+    def previous(self, href):
+        """获取上次生成的页面记录，不校验哈希；搜索索引记录缺失时返回 None"""
+        page = self._pages.get(href)
+        if page is None or page.get("search") not in self._records:
+            return None
+        return page
+
+    def update(self, href, page_hash, index, assets_img, cost=None):
+        """记录本次生成的页面
+
+        :param index: 页面搜索索引记录，参见 page_record
+        :param cost: 页面生成耗时（秒），用于下次生成时安排任务
+        """
+        record = json.dumps(index, ensure_ascii=False, separators=(",", ":"))
+        digest = hashlib.sha1(record.encode("utf-8")).hexdigest()
+        self._records[digest] = record
+        self._current[href] = {
+            "hash": page_hash,
+            "search": digest,
+            "assets_img": sorted(assets_img),
+            "cost": cost,
+        }
+
+    def reuse(self, href, page):
+        """记录本次复用的页面
+
+        :param page: 上次生成的页面记录，参见 get
+        """
+        self._current[href] = page
+
+    def reset(self):
+        """丢弃未保存的本次生成记录"""
+        self._current = {}
+
+    @property
+    def unchanged(self):
+        """本次生成记录与上次完全相同（页面、顺序、哈希、耗时）"""
+        return list(self._current.items()) == list(self._pages.items())
+
+    @property
+    def search_unchanged(self):
+        """本次生成的搜索索引记录与上次相同，按页面顺序"""
+        return ([page["search"] for page in self._current.values()] ==
+                [page.get("search") for page in self._pages.values()])
+
+    def search_records(self):
+        """本次生成的页面的搜索索引记录，按页面顺序"""
+        return [json.loads(self._records[page["search"]]) for page in self._current.values()]
+
+    def save(self):
+        """写入清单与搜索索引记录，只保留本次生成的页面；与上次相同时不写入"""
+        if self.unchanged:
+            self._current = {}
+            return
+        records = {page["search"]: self._records[page["search"]] for page in self._current.values()}
+        os.makedirs(os.path.dirname(self._path), exist_ok=True)
+        # 先写入记录文件：在两次写入之间中断时，旧清单中找不到记录的页面在下次生成时重新生成
+        tmp = self._records_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(f"{digest}\t{record}\n" for digest, record in records.items())
+        os.replace(tmp, self._records_path)
+        tmp = self._path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"version": self.version, "pages": self._current}, f, ensure_ascii=False)
+        os.replace(tmp, self._path)
+        self._pages = self._current
+        self._records = records
+        self._current = {}
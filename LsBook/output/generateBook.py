@@ -1,12 +1,15 @@
 import logging
+import os
 import time
 
 from ..models.book import Book
 from ..parse.parse_config import is_config_exist
 from ..parse.parse_summary import is_summary_exist, parse_summary
 from ..renderer.renderer_html import renderer_html
-from ..utils.fs import copytree, rmdir, copy, is_file_exist
-from ..utils.path import process_input_output_path, get_pure_path
+from ..utils import profiler
+from ..utils.assets import install_assets
+from ..utils.fs import is_file_exist, prune_tree, stage_dir, swap_dir, sync_file, sync_tree
+from ..utils.path import get_pure_path, process_input_output_path, set_output_path
 
 
 def generateBook(book: Book):
@@ -17,26 +20,40 @@ def generateBook(book: Book):
     """
     start = time.time()
     logging.debug("处理输入输出路径")
-    process_input_output_path(book)
+    with profiler.span("paths"):
+        process_input_output_path(book)
 
-    logging.debug("验证书籍目录是否存在")
-    is_summary_exist(book)
+        logging.debug("验证书籍目录是否存在")
+        is_summary_exist(book)
 
     logging.debug("验证配置文件并处理")
-    is_config_exist(book)
+    with profiler.span("config"):
+        is_config_exist(book)
 
     logging.info("解析目录")
-    parse_summary(book)
+    with profiler.span("summary"):
+        parse_summary(book)
 
     # logging.info("验证 readme")
     # readme_exist(book)
 
-    logging.info("复制资源到输出目录")
-    rmdir(book.book_output)
-    copytree(book.book_path, book.book_output, "_book", "SUMMARY.md", "book.json", *book.config.get("ignore", ()))
+    # 在暂存目录中生成，完成后整体替换输出目录，生成过程中不影响已有输出
+    output = book.book_output
+    logging.debug("准备暂存目录")
+    with profiler.span("staging"):
+        set_output_path(book, stage_dir(output))
+
+    logging.debug("读取增量构建清单")
+    if not book.force and book.manifest.load():
+        logging.info("增量生成书籍")
+
+    logging.info("同步资源到输出目录")
+    with profiler.span("sync"):
+        book.add_output(*sync_tree(book.book_path, book.book_output, *source_ignore(book, output)))
     if not book.base_assets:
-        rmdir(book.assets_path_out)
-        copytree(book.assets_path, book.assets_path_out)
+        with profiler.span("assets"):
+            book.add_output(
+                *install_assets(book.assets_path, book.assets_path_out, book.assets_mode, book.assets_store))
 
     # 读取自定义 js
     if is_file_exist(book.book_path, "book.js"):
@@ -44,14 +61,48 @@ def generateBook(book: Book):
             book.book_js = f.read()
 
     logging.info("生成所有页面")
-    assets_img = renderer_html(book)
+    with profiler.span("pages"):
+        assets_img = renderer_html(book)
 
     logging.info("复制外部图片资源到输出目录")
-    img_import_path = get_pure_path(book.book_output, "lsbook_import_img")
-    rmdir(img_import_path)
-    while len(assets_img):
-        copy(assets_img.pop(), img_import_path)
+    with profiler.span("images"):
+        img_import_path = get_pure_path(book.book_output, "lsbook_import_img")
+        if assets_img:
+            os.makedirs(img_import_path, exist_ok=True)
+        img_out = [get_pure_path(img_import_path, os.path.basename(img)) for img in assets_img]
+        book.pool.map(sync_file, assets_img, img_out)
+        book.add_output(*img_out)
+
+    logging.info("清理过期文件")
+    with profiler.span("prune"):
+        prune_output(book, book.output_files)
+
+    logging.debug("替换输出目录")
+    with profiler.span("swap"):
+        swap_dir(book.book_output, output)
+    set_output_path(book, output)
+
+    # 输出目录替换后才写入清单，生成失败时下次生成不会把未发布的页面当作已生成
+    with profiler.span("manifest"):
+        book.manifest.save()
 
     logging.info("完成生成")
     end = time.time()
     logging.info(f'共计成功生成 {len(book.summary_classify_list)} 个页面完毕，耗时：{end - start}s !')
+
+
+def prune_output(book: Book, keep, patterns=None):
+    """删除输出目录中的过期文件
+
+    :param keep: 保留的文件路径集合（规范化绝对路径）
+    :param patterns: 只清理相对路径匹配其中之一的文件，参见 prune_tree
+    """
+    count = prune_tree(book.book_output, keep, patterns)
+    if count:
+        logging.info(f"删除 {count} 个过期文件")
+
+
+def source_ignore(book: Book, output=None):
+    """复制书籍目录到输出目录时忽略的文件与文件夹"""
+    name = os.path.basename(output or book.book_output)
+    return ("_book", name, f"{name}.lsbook_*", "SUMMARY.md", "book.json", *book.config.get("ignore", ()))
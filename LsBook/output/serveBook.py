@@ -0,0 +1,305 @@
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from .generateBook import source_ignore
+from ..models.book import Book
+from ..parse.parse_config import is_config_exist
+from ..parse.parse_markdown.file_imports import import_dependencies
+from ..parse.parse_summary import is_summary_exist, parse_summary
+from ..renderer.renderer_html import build_context, page_args, page_out_path, render_page, shared_summary_name
+from ..renderer.search_index import build_index, page_record, shard_index
+from ..utils.path import get_abs_path, get_pure_path, process_input_output_path
+
+
+def serveBook(book: Book, port=4000, host="127.0.0.1", cache_size=256):
+    """启动预览服务，页面在请求时才生成，不写入磁盘
+
+    :param book: 书籍
+    :param port: 端口
+    :param host: 监听地址
+    :param cache_size: 页面缓存数量
+    """
+    start = time.time()
+    process_input_output_path(book)
+    is_summary_exist(book)
+    preview = BookPreview(book, cache_size)
+    preview.reload()
+
+    server = ThreadingHTTPServer((host, port), _handler(preview))
+    server.daemon_threads = True
+    logging.info(f"预览服务已启动，耗时：{time.time() - start}s")
+    logging.info(f"访问地址：http://{host}:{port}/（Ctrl+C 退出）")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("停止预览服务")
+    finally:
+        server.server_close()
+
+
+class BookPreview(object):
+    """按需生成页面的书籍预览
+
+    目录只解析一次保存在内存中，页面在请求时生成并放入 LRU 缓存；
+    页面源文件或引入文件修改后缓存失效，目录与配置修改后清空缓存。
+    """
+
+    def __init__(self, book: Book, cache_size=256):
+        self.book = book
+        self._cache_size = cache_size
+        # 页面地址 -> (校验戳, 页面, ETag, 页面源文件与引入文件)
+        self._cache = OrderedDict()
+        # 页面地址 -> 目录结构
+        self._pages = {}
+        # 页面地址 -> 搜索索引记录
+        self._index = {}
+        # 搜索索引 (清单, {分片文件名: 分片})，页面生成或重新加载后失效
+        self._search_index = None
+        # 外部图片文件名 -> 图片路径
+        self._assets_img = {}
+        self._shared_summary = ("", "")
+        self._context = None
+        self._watch = ()
+        self._watch_stamp = None
+        # 请求线程共享目录与页面缓存，页面在锁外生成
+        self._lock = threading.RLock()
+
+    def _watch_files(self):
+        return (self.book.summary_path,
+                get_pure_path(self.book.book_path, "book.json"),
+                get_pure_path(self.book.book_path, "book.js"))
+
+    def reload(self):
+        """读取配置与目录，清空页面缓存"""
+        book = self.book
+        with self._lock:
+            self._watch_stamp = _stamp(self._watch_files())
+            is_config_exist(book)
+            book.book_js = ""
+            book_js = get_pure_path(book.book_path, "book.js")
+            if os.path.isfile(book_js):
+                with open(book_js, encoding="utf-8") as f:
+                    book.book_js = f.read()
+            parse_summary(book)
+
+            self._pages = {self.url(item.get("href", "")): item for item in book.summary_classify_list}
+            self._cache.clear()
+            self._index = {}
+            self._search_index = None
+            self._shared_summary = ("", "")
+            if book.config.get("shared_summary", False):
+                summary = book.summary_tree.render_shared()
+                self._shared_summary = (shared_summary_name(summary), summary)
+            self._context = build_context(book, self._shared_summary[0])
+
+    def check(self):
+        """目录、配置或自定义 js 修改后重新加载"""
+        if _stamp(self._watch_files()) != self._watch_stamp:
+            logging.info("目录或配置已修改，重新加载")
+            self.reload()
+
+    def url(self, href):
+        """页面地址"""
+        return get_pure_path(os.path.relpath(page_out_path(self.book.book_output, href), self.book.book_output))
+
+    def page(self, url):
+        """获取页面，返回 (页面, ETag)，不是页面时返回 None
+
+        只在查找与写入缓存时持有锁，页面在锁外生成，不阻塞其它请求。
+        """
+        with self._lock:
+            item = self._pages.get(url)
+            if item is None:
+                return None
+            context = self._context
+            cached = self._cache.get(url)
+        if cached:
+            # 缓存命中时只检查已知文件的状态，不重新读取页面分析引入
+            if _stamp(cached[3]) == cached[0]:
+                with self._lock:
+                    if url in self._cache:
+                        self._cache.move_to_end(url)
+                return cached[1], cached[2]
+        files = self._page_files(item.get("href", ""))
+        stamp = _stamp(files)
+
+        start = time.time()
+        page, index, assets_img = render_page(*page_args(context, item, self.book.book_output))
+        page = "".join(page).encode("utf-8")
+        etag = _etag(page)
+        with self._lock:
+            # 生成期间重新加载过，结果不写入缓存
+            if context is self._context:
+                self._index[index["url"]] = index
+                self._search_index = None
+                self._assets_img.update((os.path.basename(img), img) for img in assets_img)
+                self._cache[url] = (stamp, page, etag, files)
+                self._cache.move_to_end(url)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        logging.info(f"生成页面：{url}，耗时：{time.time() - start}s")
+        return page, etag
+
+    def _page_files(self, href):
+        """分析页面源文件与引入文件，缓存中的文件状态变化后重新分析"""
+        source = get_pure_path(self.book.book_path, href)
+        files = [source]
+        try:
+            with open(source, encoding="utf-8") as f:
+                files.extend(import_dependencies(os.path.dirname(source), f.read()))
+        except (OSError, UnicodeDecodeError):
+            pass
+        return files
+
+    def search_index(self, name="search_index.json"):
+        """搜索索引清单或分片：已生成页面包含正文，未生成页面只有标题，参见 shard_index
+
+        :return: (内容, ETag)，分片不存在时返回 None
+        """
+        with self._lock:
+            if self._search_index is None:
+                records = [self._index.get(url) or page_record(url, item.get("title", ""), "")
+                           for url, item in self._pages.items()]
+                self._search_index = shard_index(build_index(records))
+            manifest, shards = self._search_index
+            content = manifest if name == "search_index.json" else shards.get(name)
+            if content is None:
+                return None
+            content = content.encode("utf-8")
+            return content, _etag(content)
+
+    def shared_summary(self, name):
+        """共享目录片段"""
+        if self._shared_summary[0] and self._shared_summary[0] == name:
+            content = self._shared_summary[1].encode("utf-8")
+            return content, _etag(content)
+        return None
+
+    def file(self, url):
+        """资源文件路径：主题资源、外部图片与书籍目录中的文件"""
+        parts = url.split("/")
+        if parts[0] == "lsbook":
+            return get_abs_path(self.book.assets_path, *parts[1:])
+        if parts[0] == "lsbook_import_img" and len(parts) == 2:
+            return self._assets_img.get(parts[1])
+        ignore = shutil.ignore_patterns(*source_ignore(self.book))
+        path = self.book.book_path
+        for part in parts:
+            if ignore(path, [part]):
+                return None
+            path = os.path.join(path, part)
+        return path
+
+
+def _stamp(files):
+    """文件修改时间与大小"""
+    stamp = []
+    for file in files:
+        try:
+            stat = os.stat(file)
+            stamp.append((file, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            stamp.append((file, None, None))
+    return tuple(stamp)
+
+
+def _etag(content):
+    return f'"{hashlib.sha1(content).hexdigest()}"'
+
+
+def _handler(preview: BookPreview):
+    class BookRequestHandler(BaseHTTPRequestHandler):
+        """预览请求处理"""
+        server_version = "LsBook"
+
+        def do_HEAD(self):
+            self.do_GET(head=True)
+
+        def do_GET(self, head=False):
+            path = posixpath.normpath(unquote(urlsplit(self.path).path)).lstrip("/")
+            if path in ("", "."):
+                path = "index.html"
+            elif self.path.split("?")[0].endswith("/"):
+                path = f"{path}/index.html"
+            if path.startswith("..") or "\\" in path:
+                return self.send_error(HTTPStatus.NOT_FOUND)
+
+            try:
+                preview.check()
+                ret = self._content(path)
+            except Exception as e:
+                logging.exception(e)
+                return self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, str(e))
+            if ret is None:
+                return self.send_error(HTTPStatus.NOT_FOUND)
+            content, etag = ret
+            if isinstance(content, str):
+                return self._send_file(content, etag, head)
+            self._send(content, etag, mimetypes.guess_type(path)[0], head)
+
+        def _content(self, path):
+            """返回 (内容, ETag)，文件返回 (路径, ETag)"""
+            ret = preview.page(path)
+            if ret is not None:
+                return ret
+            if path.startswith("search_"):
+                ret = preview.search_index(path)
+                if ret is not None:
+                    return ret
+            if path.startswith("summary."):
+                ret = preview.shared_summary(path)
+                if ret is not None:
+                    return ret
+            file = preview.file(path)
+            if not file or not os.path.isfile(file):
+                return None
+            stat = os.stat(file)
+            return file, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+        def _not_modified(self, etag):
+            if etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return True
+            return False
+
+        def _headers(self, etag, content_type, length):
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type or "application/octet-stream")
+            self.send_header("Content-Length", str(length))
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+
+        def _send(self, content, etag, content_type, head):
+            if self._not_modified(etag):
+                return
+            if content_type and (content_type.startswith("text/") or content_type.endswith(("json", "javascript"))):
+                content_type += "; charset=utf-8"
+            self._headers(etag, content_type, len(content))
+            if not head:
+                self.wfile.write(content)
+
+        def _send_file(self, file, etag, head):
+            if self._not_modified(etag):
+                return
+            self._headers(etag, mimetypes.guess_type(file)[0], os.path.getsize(file))
+            if not head:
+                with open(file, "rb") as f:
+                    shutil.copyfileobj(f, self.wfile)
+
+        def log_message(self, format, *args):
+            logging.debug(f"{self.address_string()} {format % args}")
+
+    return BookRequestHandler
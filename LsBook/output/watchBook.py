@@ -0,0 +1,154 @@
+import logging
+import os
+import shutil
+import time
+
+from .generateBook import prune_output, source_ignore
+from ..models.book import Book
+from ..parse.parse_config import is_config_exist
+from ..parse.parse_markdown.file_imports import import_dependencies
+from ..parse.parse_summary import parse_summary
+from ..renderer.renderer_html import HASHED_OUTPUTS, page_out_path, renderer_html
+from ..utils.fs import remove_path, sync_file
+from ..utils.path import get_pure_path
+
+
+def watchBook(book: Book, interval=1.0):
+    """监视书籍目录，文件修改后只重新生成受影响的页面
+
+    须在 generateBook 完成首次生成后调用，复用进程池与已解析的目录。
+    重新生成出错时记录日志并继续监视，只有 Ctrl+C 退出。
+
+    :param book: 书籍
+    :param interval: 轮询间隔（秒）
+    """
+    watcher = BookWatcher(book)
+    logging.info(f"监视书籍目录：{book.book_path}（Ctrl+C 退出）")
+    try:
+        while True:
+            time.sleep(interval)
+            changed = watcher.poll()
+            if changed:
+                try:
+                    watcher.rebuild(changed)
+                except Exception as e:
+                    # 页面或目录有误时保持监视，文件修改后再次生成
+                    logging.exception(e)
+    except KeyboardInterrupt:
+        logging.info("停止监视")
+
+
+class BookWatcher(object):
+    """书籍目录监视器：记录文件状态与页面引入关系，计算受修改影响的页面"""
+
+    def __init__(self, book: Book):
+        self.book = book
+        self._summary_path = os.path.normpath(book.summary_path)
+        self._config_path = os.path.normpath(get_pure_path(book.book_path, "book.json"))
+        self._book_js_path = os.path.normpath(get_pure_path(book.book_path, "book.js"))
+        self._snapshot = self._scan()
+        # 页面 -> 页面源文件与引入文件
+        self._dependencies = {}
+        self._update_dependencies(item.get("href", "") for item in book.summary_classify_list)
+
+    def _scan(self):
+        """扫描书籍目录，返回 {文件: (修改时间, 大小)}"""
+        ignore = shutil.ignore_patterns(*source_ignore(self.book))
+        snapshot = {}
+        for root, dirs, files in os.walk(self.book.book_path):
+            ignored = ignore(root, dirs + files)
+            dirs[:] = [d for d in dirs if d not in ignored]
+            for name in files:
+                if name not in ignored:
+                    self._stat(snapshot, os.path.normpath(os.path.join(root, name)))
+        # 目录与配置文件不复制到输出目录，单独监视
+        self._stat(snapshot, self._summary_path)
+        self._stat(snapshot, self._config_path)
+        return snapshot
+
+    @staticmethod
+    def _stat(snapshot, file):
+        try:
+            stat = os.stat(file)
+        except OSError:
+            return
+        snapshot[file] = stat.st_mtime_ns, stat.st_size
+
+    def _update_dependencies(self, hrefs):
+        for href in hrefs:
+            source = os.path.normpath(get_pure_path(self.book.book_path, href))
+            dependencies = {source}
+            try:
+                with open(source, encoding="utf-8") as f:
+                    page = f.read()
+                dependencies.update(os.path.normpath(file)
+                                    for file in import_dependencies(os.path.dirname(source), page))
+            except (OSError, UnicodeDecodeError):
+                pass
+            self._dependencies[href] = dependencies
+
+    def poll(self):
+        """返回自上次轮询以来新增、修改、删除的文件"""
+        snapshot = self._scan()
+        changed = {file for file in snapshot.keys() | self._snapshot.keys()
+                   if snapshot.get(file) != self._snapshot.get(file)}
+        self._snapshot = snapshot
+        return changed
+
+    def rebuild(self, changed):
+        """重新生成受影响的页面，同步修改的资源文件"""
+        start = time.time()
+        book = self.book
+        for file in sorted(changed):
+            logging.info(f"文件修改：{file}")
+
+        # 配置或自定义 js 修改影响所有页面
+        full = self._config_path in changed or self._book_js_path in changed
+        if full:
+            is_config_exist(book)
+            book.book_js = ""
+            if os.path.isfile(self._book_js_path):
+                with open(self._book_js_path, encoding="utf-8") as f:
+                    book.book_js = f.read()
+
+        pages = set()
+        if full or self._summary_path in changed:
+            # 目录修改：只重新生成目录结构（前后页、目录）发生变化的页面
+            old = {item.get("href", ""): item for item in book.summary_classify_list}
+            old_digest = book.summary_tree.digest
+            parse_summary(book)
+            new = {item.get("href", ""): item for item in book.summary_classify_list}
+            pages.update(href for href, item in new.items() if old.get(href) != item)
+            if not book.config.get("shared_summary", False) and book.summary_tree.digest != old_digest:
+                # 每个页面都内嵌完整目录，目录 html 变化时全部重新生成
+                pages.update(new)
+            self._update_dependencies(new.keys() - old.keys())
+            for href in old.keys() - new.keys():
+                self._dependencies.pop(href, None)
+                remove_path(page_out_path(book.book_output, href))
+        for href, dependencies in self._dependencies.items():
+            if dependencies & changed:
+                pages.add(href)
+
+        # 同步资源文件
+        for file in changed - {self._summary_path, self._config_path}:
+            out = get_pure_path(book.book_output, os.path.relpath(file, book.book_path))
+            if os.path.isfile(file):
+                os.makedirs(os.path.dirname(out), exist_ok=True)
+                sync_file(file, out)
+            elif os.path.isfile(out):
+                remove_path(out)
+
+        if full or pages:
+            assets_img = renderer_html(book, None if full else pages)
+            # 搜索索引分片与共享目录文件名随内容变化，删除被替换的旧文件
+            prune_output(book, book.hashed_outputs, HASHED_OUTPUTS)
+            img_import_path = get_pure_path(book.book_output, "lsbook_import_img")
+            if assets_img:
+                os.makedirs(img_import_path, exist_ok=True)
+            book.pool.map(sync_file, assets_img,
+                          [get_pure_path(img_import_path, os.path.basename(img)) for img in assets_img])
+            book.manifest.save()
+            self._update_dependencies(pages)
+
+        logging.info(f"{'检查全部页面' if full else f'重新生成 {len(pages)} 个页面'}，耗时：{time.time() - start}s")
@@ -19,13 +19,42 @@ def process_file_import(book_path: str, page: str, base_path: str):
     # 记录引入文件的图片资源
     assets_img = set()
     # 按行处理
-    pages = re.split(r"\n|\r\n", page)
+    new_page = "".join(_import_lines(book_path, re.split(r"\n|\r\n", page), base_path, assets_img))
+    return new_page, assets_img
+
+
+def iter_file_import(book_path: str, file, base_path: str, assets_img: set):
+    """逐行读取页面并处理引入语法，不将整个页面读入内存
+
+    结果与 process_file_import(...)[0].splitlines(keepends=True) 一致
+
+    :param book_path: 书籍目录
+    :param file: 以文本方式打开的页面文件
+    :param base_path: 相对于跟的相对路径
+    :param assets_img: 记录引入文件的图片资源
+    :return: 页面行迭代器
+    """
+    for text in _import_lines(book_path, _split_lines(file), base_path, assets_img):
+        yield from text.splitlines(keepends=True)
+
+
+def _split_lines(file):
+    """逐行读取文件，去掉换行符，结果与 re.split(r"\n|\r\n", file.read()) 一致"""
+    line = ""
+    for line in file:
+        yield line[:-1] if line.endswith("\n") else line
+    # 以换行结尾（或空文件）时末尾还有一个空行
+    if line.endswith("\n") or not line:
+        yield ""
+
+
+def _import_lines(book_path, lines, base_path, assets_img):
+    """处理引入语法，每行返回处理后的内容（以换行结尾，引入文件时包含多行）"""
     tag = True
-    new_page = ""
-    for line in pages:
+    for line in lines:
         if line.find("```") != -1:
             tag = not tag
-            new_page += line + "\n"
+            yield line + "\n"
             continue
         if tag:
             resurt_ = split_import(line, book_path)
@@ -37,8 +66,7 @@ def process_file_import(book_path: str, page: str, base_path: str):
                 else:
                     # line = read_code(prefix_, lang_, import_file_)
                     line = read_code(*resurt_)
-        new_page += line + "\n"
-    return new_page, assets_img
+        yield line + "\n"
 
 
 def read_code(prefix_, lang_, import_file_):
@@ -127,3 +155,46 @@ def md_file(assets_img, base_path, book_path, import_file):
         new_code += line_ + "\n"
     line = new_code
     return line
+
+
+def import_dependencies(book_path: str, page: str):
+    """分析页面引入的文件，与 process_file_import 规则一致，用于增量构建
+
+    :param book_path: 页面所在目录
+    :param page: 页面内容
+    :return: 引入文件路径列表，包含 md 引入文件中的代码引入
+    """
+    dependencies = []
+    # 大多数页面没有引入，不逐行分析
+    if "@import" not in page:
+        return dependencies
+    tag = True
+    for line in re.split(r"\n|\r\n", page):
+        if line.find("```") != -1:
+            tag = not tag
+            continue
+        if tag and "@import" in line:
+            result_ = split_import(line, book_path)
+            if result_:
+                _, lang_, import_file_ = result_
+                dependencies.append(import_file_)
+                if lang_ == 'markdown' and os.path.isfile(import_file_):
+                    dependencies.extend(_md_file_dependencies(import_file_))
+    return dependencies
+
+
+def _md_file_dependencies(import_file):
+    """md 引入文件中的代码引入"""
+    with open(import_file, encoding="utf-8") as f:
+        code = f.read()
+    dirname = os.path.abspath(os.path.dirname(import_file))
+    dependencies = []
+    tag_1 = True
+    for line_ in re.split(r"\n|\r\n", code):
+        if line_.find("```") != -1:
+            tag_1 = not tag_1
+        elif tag_1 and "@import" in line_:
+            result_ = split_import(line_, dirname)
+            if result_:
+                dependencies.append(result_[2])
+    return dependencies
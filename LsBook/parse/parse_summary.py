@@ -4,7 +4,7 @@ import re
 import time
 
 from ..mistletoe_renderers import Document, summary_renderer
-from ..mistletoe_renderers.summary_renderer import SummaryRenderer, renderer_summary
+from ..mistletoe_renderers.summary_renderer import summary_tree
 from ..models.book import Book
 from ..utils.error import file_not_found_error
 from ..utils.path import get_abs_path
@@ -20,19 +20,14 @@ def parse_summary(book: Book):
     # 生成目录结构
     renderer = summary_renderer(page_su)
 
-    summary_classify_list = []
-    p_list = []
     start = time.time()
-    for _index, _item in renderer.summary.items():
-        # 根据目录结构为每个页面生成目录
-        # 计算相对路径
-        p_list.append(book.pool.submit(renderer_summary, book.book_output, _item, _index, page, renderer.summary))
-
-    for ret in p_list:
-        summary_classify_list.append(ret.result())
+    # 目录只解析一次，每个页面的目录在生成页面时根据导航树生成
+    tree = summary_tree(book.book_output, page, renderer.summary)
+    summary_classify_list = tree.classify_list()
 
     end = time.time()
     logging.info(f"生成 {len(summary_classify_list)} 个目录结构，耗时：{end - start}s")
+    book.summary_tree = tree
     book._summary_classify_list = summary_classify_list
 
 
@@ -1,19 +1,21 @@
 import os
 
-from ..mistletoe_renderers import html_renderer
-from ..parse.parse_markdown.file_imports import process_file_import
+from ..mistletoe_renderers import PlainText, html_renderer
+from ..parse.parse_markdown.file_imports import iter_file_import
 
 
-def parse_file(file, base_path):
-    """解析文件"""
-    with open(file, encoding="utf-8") as f:
-        page = f.read()
+def parse_file(file, base_path, search=None):
+    """解析文件，逐行读取并处理引入文件，不将整个页面读入内存
 
+    :param search: 搜索正文配置 {"rules", "max_bytes"}，参见 PlainText
+    :return: 页面 html 为分段列表，按顺序写出即可，无需拼接；搜索正文在生成 html 时一并收集
+    """
+    search = search or {}
     dirname = os.path.dirname(file)
-    # 处理引入文件
-    page, assets_img = process_file_import(dirname, page, base_path)
-
-    renderer, page_html = html_renderer(page)
+    assets_img = set()
+    plain_text = PlainText(search.get("rules"), search.get("max_bytes", PlainText.default_limit))
+    with open(file, encoding="utf-8") as f:
+        renderer, page_html = html_renderer(iter_file_import(dirname, f, base_path, assets_img), [], plain_text)
 
-    return (page_html, renderer.toc_tree, renderer.tag_katex, renderer.tag_mermaid,
+    return (page_html, plain_text.text(), renderer.toc_tree, renderer.tag_katex, renderer.tag_mermaid,
             renderer.tag_prism, renderer.tag_lightbox, assets_img)
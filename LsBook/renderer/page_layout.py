@@ -0,0 +1,194 @@
+"""
+页面版式
+
+constants.layouts_html 中的模板在构建开始时编译为 [(文本, 占位符)] 片段，嵌套模板展开为一个版式，
+全书不变的值（作者、语言、i18n 文本、页脚、css 与 js）在编译时填入，每个页面只需按顺序输出文本与占位符的值。
+"""
+import time
+
+from ..constants.layouts_html import book_body_4, css, html_body_2, html_head_1, html_root_0, js, \
+    next_page_link_5_2, previous_page_link_5_1, summary_js
+
+
+class Layout(object):
+    """编译后的模板
+
+    segments 为 [(文本, 占位符名称)]，输出时依次输出文本与占位符的值，最后一段的占位符为 None
+    """
+    __slots__ = ("segments",)
+
+    def __init__(self, segments):
+        self.segments = segments
+
+    @classmethod
+    def compile(cls, template):
+        """按占位符切分 string.Template，$$ 转义为 $"""
+        segments = []
+        text = template.template
+        start = 0
+        literal = ""
+        for mo in template.pattern.finditer(text):
+            name = mo.group("named") or mo.group("braced")
+            literal += text[start:mo.start()]
+            start = mo.end()
+            if name:
+                segments.append((literal, name))
+                literal = ""
+            elif mo.group("escaped") is not None:
+                literal += template.delimiter
+            else:
+                raise ValueError(f"模板中的占位符无效：{text[mo.start():mo.start() + 20]!r}")
+        segments.append((literal + text[start:], None))
+        return cls(segments)
+
+    @classmethod
+    def slot(cls, name):
+        """只有一个占位符的版式，用于在 bind 中重命名占位符"""
+        return cls([("", name), ("", None)])
+
+    def __add__(self, other):
+        """依次输出两个版式"""
+        return Layout([("", "_0"), ("", "_1"), ("", None)]).bind(_0=self, _1=other)
+
+    def bind(self, **values):
+        """填入部分占位符，返回新的版式
+
+        值为 Layout 时展开到当前位置，其余值转为文本并与前后文本合并；未给出的占位符保留。
+        """
+        segments = []
+        literal = ""
+        for text, name in self.segments:
+            literal += text
+            if name is None:
+                continue
+            if name not in values:
+                segments.append((literal, name))
+                literal = ""
+                continue
+            value = values[name]
+            if isinstance(value, Layout):
+                for inner_text, inner_name in value.segments:
+                    literal += inner_text
+                    if inner_name is not None:
+                        segments.append((literal, inner_name))
+                        literal = ""
+            else:
+                literal += "%s" % (value,)
+        segments.append((literal, None))
+        return Layout(segments)
+
+    def stream(self, values):
+        """依次产生文本片段，值为列表时视为片段序列，逐个产生，不拼接为字符串"""
+        for text, name in self.segments:
+            if text:
+                yield text
+            if name is None:
+                continue
+            value = values[name]
+            if isinstance(value, list):
+                yield from value
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield "%s" % (value,)
+
+    def render(self, **values):
+        return "".join(self.stream(values))
+
+
+previous_page_link = Layout.compile(previous_page_link_5_1)
+next_page_link = Layout.compile(next_page_link_5_2)
+
+
+def page_layout(book_title, author, language, i18n, github_url, book_js, shared_summary=""):
+    """编译整个页面的版式，全书不变的值在此填入
+
+    剩余占位符：title、basePath、base_assets_path、next_relative_path、book_summary、toc、book_page、
+    previous_page_link、next_page_link、prev_relative_path、js_dict
+    """
+    footer = f"""<footer class="page-footer">
+<span class="copyright">© {time.localtime().tm_year} {author}. All rights reserved.</span>
+<span class="footer-modification">
+<span id="busuanzi_container_site_uv" style="display:none">本站访客数 <span id="busuanzi_value_site_uv">
+</span> 人次</span></span>
+</footer>""" + """<script>
+function busuanzi(){
+    if (document.domain != "127.0.0.1") {$.getScript("//busuanzi.ibruce.info/busuanzi/2.3/busuanzi.pure.mini.js");}
+}
+setTimeout('busuanzi()', 2000);
+</script>""" + f"""<script>
+{book_js}
+</script>"""
+    # <script async src="//busuanzi.ibruce.info/busuanzi/2.3/busuanzi.pure.mini.js"></script>
+
+    # 正文
+    book_body = Layout.compile(book_body_4).bind(
+        footer=footer,
+        SEARCH_RESULTS_TITLE=i18n.get("SEARCH_RESULTS_TITLE"),
+        SEARCH_NO_RESULTS_TITLE=i18n.get("SEARCH_NO_RESULTS_TITLE")
+    )
+
+    # 身体：previous_page_link、next_page_link 在此处为前后页路径，js 为按需加载 js 字典
+    body = Layout.compile(html_body_2).bind(
+        book_body=book_body,
+        language=language,
+        LsBook_LINK=i18n.get("LsBook_LINK"),
+        github_url=github_url,
+        SEARCH_PLACEHOLDER=i18n.get("SEARCH_PLACEHOLDER"),
+        js=Layout.slot("js_dict"),
+        previous_page_link=Layout.slot("prev_relative_path"),
+        next_page_link=Layout.slot("next_relative_path")
+    )
+
+    # 头
+    head = Layout.compile(html_head_1).bind(
+        title=Layout([(f"{book_title} - ", "title"), ("", None)]),
+        author=author,
+        css=Layout.compile(css),
+        description=Layout.slot("title")
+    )
+
+    # 整体
+    _js_block = Layout.compile(js)
+    if shared_summary:
+        _js_block += Layout.compile(summary_js)
+    return Layout.compile(html_root_0).bind(
+        head=head,
+        body=body,
+        lang=language,
+        js=_js_block
+    )
+
+
+def page_toc(toc_tree, summary_toggle):
+    """页内导航 html
+
+    :param toc_tree: 标题树，参见 HTMLRenderer.toc_tree
+    :param summary_toggle: 目录开关文本
+    """
+    if len(toc_tree) == 0:
+        return ""
+    toc = ["<div id='anchor-navigation-ex-navbar'><i class='fa fa-anchor'></i><ul><li>"
+           "<span class='title-icon fa fa-hand-o-right'></span><a aria-label class='on-toolbar-action' href='' "
+           f"""onclick="$('.fa.fa-align-justify').parent()[0].click();">{summary_toggle}</a></li>"""]
+    _toc_item(toc, toc_tree, 2)
+    toc.append("</ul></div><a href='#")
+    toc.append(toc_tree[0]["url"])
+    toc.append("' id='anchorNavigationExGoTop'><i class='fa fa-arrow-up'></i></a>")
+    return "".join(toc)
+
+
+def _toc_item(toc, items, depth):
+    """追加标题项，depth 为还可展开的子级层数"""
+    for item in items:
+        toc.append("<li><span class='title-icon fa fa-hand-o-right'></span><a href='#")
+        toc.append(item["url"])
+        toc.append("'><b>")
+        toc.append(item["level"])
+        toc.append("</b>")
+        toc.append(item["name"])
+        toc.append("</a></li>")
+        if depth and len(item["children"]) > 0:
+            toc.append("<ul>")
+            _toc_item(toc, item["children"], depth - 1)
+            toc.append("</ul>")
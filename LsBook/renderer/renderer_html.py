@@ -1,121 +1,334 @@
+import hashlib
 import json
 import logging
 import os
-import re
 import time
 
 from .html_renderer import parse_file
-from ..constants.layouts_html import book_body_4, css, html_body_2, html_head_1, html_root_0, js, next_page_link_5_2, \
-    previous_page_link_5_1
+from .page_layout import next_page_link, page_layout, page_toc, previous_page_link
+from .search_index import VERSION as SEARCH_INDEX_VERSION, build_index, page_record, shard_index
+from .. import __version__
+from ..constants.layouts_html import book_summary_shared
 from ..models.book import Book
+from ..parse.parse_markdown.file_imports import import_dependencies
+from ..utils import profiler
+from ..utils.fs import write_file
 from ..utils.path import get_pure_path, set_extension
+from ..utils.schedule import estimate_costs, schedule
 
 
-def renderer_html(book: Book):
-    search_plus_index = {}
+# 文件名携带内容哈希的输出文件：搜索索引分片、共享目录，内容变化后旧文件即过期
+HASHED_OUTPUTS = ("search_*.????????.json", "summary.????????.html")
+
+
+def renderer_html(book: Book, pages=None):
+    """生成页面，写入搜索索引，记录增量构建清单
+
+    清单不在此写入，由调用方在输出生效后调用 book.manifest.save()，
+    生成中断时清单仍与已发布的输出一致。
+
+    :param book: 书籍
+    :param pages: 需要检查的页面路径集合，为空时检查全部页面；其余页面直接复用上次生成结果
+    :return: 外部图片资源
+    """
     assets_img = set()
-    p_list = []
-    # config
-    author = book.config.get("author", "")
-    book_title = book.config.get("title", "")
-    language = book.config.get("language", "")
-    github_url = book.config.get("github_url", "")
-
-    for item in book.summary_classify_list:
+    # 页码 -> (页面输入哈希, 生成记录)
+    results = {}
+    # 需要生成的页面：(页码, 页面输入哈希, 输入大小)
+    tasks = []
+    book.hashed_outputs.clear()
+    book.manifest.reset()
+    # 共享目录
+    shared_summary = book.config.get("shared_summary", False) and write_shared_summary(book) or ""
+    context = build_context(book, shared_summary)
+    # 增量构建
+    book_hash = _book_hash(book, shared_summary or book.summary_tree.digest)
+    skip_count = 0
+
+    for page_index, item in enumerate(context["pages"]):
         title = item.get("title", "")
         level = item.get("level", "")
-        prev_title = item.get("prev_title", "")
-        prev_relative_path = item.get("prev_relative_path", "")
-        next_title = item.get("next_title", "")
-        next_relative_path = item.get("next_relative_path", "")
-        book_summary = item.get("summary", "")
         href = item.get("href", "")
-        base_path = item.get("basePath", "")
-
-        # dict_, assets_img_ = _render_html(book_title, title, author, basePath, book_summary,
-        #                                   prev_title, prev_relative_path, next_title, next_relative_path,
-        #                                   href, book.book_path, book.book_output, language, book.i18n, github_url,
-        #                                   book.base_assets, book.book_js)
-        #
-        # search_plus_index.update(dict_)
-        # assets_img.update(assets_img_)
-
-        p_list.append(
-            book.pool.submit(
-                _render_html, book_title, title, author, base_path, book_summary,
-                prev_title, prev_relative_path, next_title, next_relative_path,
-                href, book.book_path, book.book_output, language, book.i18n, github_url,
-                book.base_assets, book.book_js
-            )
-        )
+        book.add_output(page_out_path(book.book_output, href))
+
+        if pages is not None and href not in pages:
+            cached = book.manifest.previous(href)
+            if cached and os.path.isfile(page_out_path(book.book_output, href)):
+                results[page_index] = cached["hash"], cached
+                skip_count += 1
+                continue
+
+        page_hash, size = _page_hash(book_hash, item, get_pure_path(book.book_path, href))
+        cached = book.manifest.get(href, page_hash)
+        if cached and os.path.isfile(page_out_path(book.book_output, href)):
+            # 页面输入未变化，复用上次生成结果
+            results[page_index] = page_hash, cached
+            skip_count += 1
+            logging.debug(f"跳过未修改页面：{level, title, href}")
+            continue
+
+        tasks.append((page_index, page_hash, size))
         logging.debug(f"生成页面：{level, title, href}")
 
-    for ret in p_list:
-        dict_, assets_img_ = ret.result()
-        search_plus_index.update(dict_)
-        assets_img.update(assets_img_)
+    if tasks:
+        # 构建上下文在每个工作进程中只安装一次，任务只携带页码
+        book.pool.start(_context_key(book_hash, context), _init_worker, context,
+                        pages=len(tasks), size=sum(size for _, _, size in tasks))
+        # 按上次生成耗时或输入大小估计耗时，最长任务优先，小页面合并提交
+        costs = estimate_costs([size for _, _, size in tasks], [
+            (book.manifest.previous(context["pages"][page_index].get("href", "")) or {}).get("cost")
+            for page_index, _, _ in tasks
+        ])
+        futures = []
+        for batch in schedule(costs, book.pool.workers):
+            batch = [tasks[i] for i in batch]
+            futures.append((batch, profiler.submit(
+                book.pool, _render_html, [page_index for page_index, _, _ in batch], book.book_output)))
+        for batch, future in futures:
+            for (page_index, page_hash, _), record in zip(batch, profiler.result(future)):
+                results[page_index] = page_hash, record
+
+    for page_index, item in enumerate(context["pages"]):
+        page_hash, record = results[page_index]
+        assets_img.update(record["assets_img"])
+        if "index" in record:
+            book.manifest.update(item.get("href", ""), page_hash, record["index"], record["assets_img"],
+                                 record.get("cost"))
+        else:
+            # 未重新生成的页面沿用上次的记录
+            book.manifest.reuse(item.get("href", ""), record)
+    if skip_count:
+        logging.info(f"跳过 {skip_count} 个未修改页面")
 
     # 写入索引
-    with open(get_pure_path(book.book_output, "search_plus_index.json"), 'w', encoding="utf-8") as f:
-        f.write(json.dumps(search_plus_index, ensure_ascii=False))
+    with profiler.span("index"):
+        # 页面的搜索索引记录与上次相同时，已有索引文件完整则直接沿用
+        files = search_index_files(book.book_output) if book.manifest.search_unchanged else None
+        if files is not None:
+            book.add_output(files[0])
+            book.add_output(*files[1:], hashed=True)
+            logging.debug("沿用搜索索引")
+        else:
+            write_search_index(book)
 
     return assets_img
 
 
-def _render_html(book_title, title, author, base_path, book_summary,
-                 prev_title, prev_relative_path, next_title, next_relative_path, href, book_path, book_output,
-                 language, i18n, github_url, base_assets, book_js):
-    """生产HTML，返回索引"""
+def build_context(book: Book, shared_summary=""):
+    """构建上下文：全书共享、生成期间不变的数据
+
+    :param book: 书籍
+    :param shared_summary: 共享目录文件名
+    """
+    return {
+        # 页面版式，全书不变的值已填入
+        "layout": page_layout(
+            book.config.get("title", ""), book.config.get("author", ""), book.config.get("language", ""),
+            book.i18n, book.config.get("github_url", ""), book.book_js, shared_summary
+        ),
+        "summary_toggle": book.i18n.get("SUMMARY_TOGGLE"),
+        "search": book.config.get("search", {}),
+        "book_path": book.book_path,
+        "base_assets": book.base_assets,
+        "shared_summary": shared_summary,
+        # 共享目录模式下无需生成本页目录
+        "summary_tree": None if shared_summary else book.summary_tree,
+        "pages": book.summary_classify_list,
+    }
+
+
+def _context_key(book_hash, context):
+    """构建上下文标识，上下文变化时重建进程池"""
+    _hash = hashlib.sha1(book_hash.encode("utf-8"))
+    _hash.update(json.dumps(context["pages"], ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    return _hash.hexdigest()
+
+
+def page_args(context, item, book_output):
+    """页面生成参数，参见 render_page
+
+    :param context: 构建上下文，参见 build_context
+    :param item: 页面描述，参见 SummaryTree.classify
+    :param book_output: 书籍输出目录
+    """
+    return (
+        context["layout"], item.get("title", ""),
+        item.get("basePath", ""), page_summary(context["summary_tree"], item, context["shared_summary"]),
+        item.get("prev_title", ""), item.get("prev_relative_path", ""),
+        item.get("next_title", ""), item.get("next_relative_path", ""),
+        item.get("href", ""), context["book_path"], book_output, context["base_assets"], context["summary_toggle"],
+        context["search"]
+    )
+
+
+def page_summary(summary_tree, item, shared_summary=""):
+    """本页目录 html：共享目录模式下为占位符，否则根据导航树生成
+
+    :param summary_tree: 目录导航树
+    :param item: 页面描述，参见 SummaryTree.classify
+    :param shared_summary: 共享目录文件名
+    """
+    if shared_summary:
+        return book_summary_shared.substitute(summary=shared_summary, data_level=item.get("level", ""))
+    return summary_tree.render_page(item.get("href", ""), item.get("level", ""))
+
+
+def _book_hash(book: Book, summary):
+    """全书公共输入的哈希：版本、配置、语言、自定义 js、目录等
+
+    :param summary: 共享目录文件名或目录模板的哈希
+    """
+    return hashlib.sha1(json.dumps([
+        __version__, time.localtime().tm_year, book.book_path, book.base_assets,
+        book.config, book.i18n, book.book_js, summary
+    ], ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _page_hash(book_hash, item, file):
+    """页面输入的哈希：页面内容、引入文件、目录中的位置与前后页
+
+    :return: (哈希值, 页面与引入文件的总大小)，页面或引入文件无法读取时哈希值为 None
+    """
+    _hash = hashlib.sha1(book_hash.encode("utf-8"))
+    _hash.update(json.dumps(item, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+    size = 0
+    try:
+        with open(file, "rb") as f:
+            content = f.read()
+        _hash.update(content)
+        size += len(content)
+        for dependency in import_dependencies(os.path.dirname(file), content.decode("utf-8")):
+            _hash.update(dependency.encode("utf-8"))
+            with open(dependency, "rb") as f:
+                content = f.read()
+            _hash.update(content)
+            size += len(content)
+    except (OSError, UnicodeDecodeError):
+        return None, size
+    return _hash.hexdigest(), size
+
+
+def write_search_index(book: Book):
+    """生成搜索索引，写入清单与分片"""
+    manifest, shards = shard_index(build_index(book.manifest.search_records()))
+    for name, shard in shards.items():
+        shard_path = get_pure_path(book.book_output, name)
+        # 分片文件名携带内容哈希，已存在时内容相同，不重新写入以保留修改时间
+        if not os.path.isfile(shard_path):
+            write_file(shard_path, shard)
+        book.add_output(shard_path, hashed=True)
+    search_index_path = get_pure_path(book.book_output, "search_index.json")
+    write_file(search_index_path, manifest, skip_unchanged=True)
+    book.add_output(search_index_path)
+    logging.debug(f"生成搜索索引：{len(shards)} 个分片")
+
+
+def search_index_files(book_output):
+    """已有搜索索引的清单与分片文件，文件缺失或无法识别时返回 None
+
+    :return: [清单, 分片, ...]
+    """
+    search_index_path = get_pure_path(book_output, "search_index.json")
+    try:
+        with open(search_index_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != SEARCH_INDEX_VERSION:
+        return None
+    files = [search_index_path] + [get_pure_path(book_output, name) for name in manifest.get("pages", [])] + \
+            [get_pure_path(book_output, name) for _, name in manifest.get("terms", [])]
+    if not all(os.path.isfile(file) for file in files):
+        return None
+    return files
+
+
+def page_out_path(book_output, href):
+    """页面输出路径：readme.md 生成为 index.html"""
+    out_path = get_pure_path(book_output, href)
+
+    if os.path.basename(href).lower() == "readme.md":
+        return get_pure_path(os.path.dirname(out_path), "index.html")
+    return set_extension(out_path, ".html")
+
+
+def write_shared_summary(book: Book):
+    """写入共享目录片段，文件名携带内容哈希以便长期缓存
+
+    :return: 共享目录文件名
+    """
+    summary = book.summary_tree.render_shared()
+    name = shared_summary_name(summary)
+    summary_path = get_pure_path(book.book_output, name)
+    if not os.path.isfile(summary_path):
+        write_file(summary_path, summary)
+    book.add_output(summary_path, hashed=True)
+    logging.debug(f"生成共享目录：{name}")
+    return name
+
+
+def shared_summary_name(summary):
+    """共享目录文件名"""
+    return f"summary.{hashlib.sha1(summary.encode('utf-8')).hexdigest()[:8]}.html"
+
+
+# 工作进程中的构建上下文，由 _init_worker 安装
+_context = None
+
+
+def _init_worker(context):
+    """工作进程初始化：安装构建上下文"""
+    global _context
+    _context = context
+
+
+def _render_html(page_indexes, book_output):
+    """在工作进程中生成一批页面：生成本页目录，生产HTML并写入输出目录，只返回索引
+
+    :param page_indexes: 页码列表，对应构建上下文中的页面描述
+    :param book_output: 书籍输出目录
+    :return: 各页面的生成记录 {"index", "assets_img", "cost"}
+    """
+    records = []
+    for page_index in page_indexes:
+        start = time.perf_counter()
+        item = _context["pages"][page_index]
+        href = item.get("href", "")
+        with profiler.span("sidebar", href=href):
+            args = page_args(_context, item, book_output)
+        page, index, assets_img = render_page(*args)
+        with profiler.span("write", href=href):
+            # 按版式顺序逐段写入，不拼接整个页面
+            write_file(page_out_path(book_output, href), page)
+        records.append({"index": index, "assets_img": assets_img, "cost": time.perf_counter() - start})
+    return records
+
+
+def render_page(layout, title, base_path, book_summary,
+                prev_title, prev_relative_path, next_title, next_relative_path, href, book_path, book_output,
+                base_assets, summary_toggle, search=None):
+    """生产HTML，返回页面、索引与外部图片资源
+
+    页面为按版式顺序产生 html 片段的生成器，正文片段直接取自解析结果，不复制整个页面；
+    索引为页面的搜索索引记录，参见 page_record
+
+    :param layout: 页面版式，参见 page_layout
+    :param search: 搜索正文配置，参见 parse_file
+    """
     # 解析页面
     if base_assets:
         base_assets_path = get_pure_path(base_path, base_assets)  # 资源路径
     else:
         base_assets_path = get_pure_path(base_path)  # 资源路径
 
-    book_page, toc_tree, tag_katex, tag_mermaid, tag_prism, tag_lightbox, assets_img = parse_file(
-        get_pure_path(book_path, href),
-        base_path
-    )
+    with profiler.span("parse", href=href):
+        book_page, body, toc_tree, tag_katex, tag_mermaid, tag_prism, tag_lightbox, assets_img = parse_file(
+            get_pure_path(book_path, href),
+            base_path,
+            search
+        )
+    render_start = profiler.clock()
 
-    # 组装页内导航
-    toc = ""
-    if len(toc_tree) > 0:
-        toc = "<div id='anchor-navigation-ex-navbar'><i class='fa fa-anchor'></i><ul><li>" \
-              "<span class='title-icon fa fa-hand-o-right'></span><a aria-label class='on-toolbar-action' href='' " \
-              f"""onclick="$('.fa.fa-align-justify').parent()[0].click();">{i18n.get('SUMMARY_TOGGLE')}</a></li>"""
-
-        for h1Toc in toc_tree:
-            toc += "<li><span class='title-icon fa fa-hand-o-right'></span>" \
-                   "<a href='#" + h1Toc["url"] + "'><b>" + h1Toc["level"] + "</b>" + h1Toc["name"] + "</a></li>"
-            if len(h1Toc["children"]) > 0:
-                toc += "<ul>"
-                for h2Toc in h1Toc["children"]:
-                    toc += "<li><span class='title-icon fa fa-hand-o-right'></span>" \
-                           "<a href='#" + h2Toc["url"] + "'><b>" + h2Toc["level"] + "</b>" + h2Toc["name"] + "</a></li>"
-                    if len(h2Toc["children"]) > 0:
-                        toc += "<ul>"
-                        for h3Toc in h2Toc["children"]:
-                            toc += "<li><span class='title-icon fa fa-hand-o-right'></span><a href='#" + h3Toc[
-                                "url"] + "'><b>" + h3Toc["level"] + "</b>" + h3Toc["name"] + "</a></li>"
-                        toc += "</ul>"
-                toc += "</ul>"
-
-        toc += "</ul></div><a href='#" + toc_tree[0]['url'] + \
-               "' id='anchorNavigationExGoTop'><i class='fa fa-arrow-up'></i></a>"
-    footer = f"""<footer class="page-footer">
-<span class="copyright">© {time.localtime().tm_year} {author}. All rights reserved.</span>
-<span class="footer-modification">
-<span id="busuanzi_container_site_uv" style="display:none">本站访客数 <span id="busuanzi_value_site_uv">
-</span> 人次</span></span>
-</footer>""" + """<script>
-function busuanzi(){
-    if (document.domain != "127.0.0.1") {$.getScript("//busuanzi.ibruce.info/busuanzi/2.3/busuanzi.pure.mini.js");}
-}
-setTimeout('busuanzi()', 2000);
-</script>""" + f"""<script>
-{book_js}
-</script>"""
-    # <script async src="//busuanzi.ibruce.info/busuanzi/2.3/busuanzi.pure.mini.js"></script>
     # js
     _js = {}
     if tag_katex:
@@ -129,79 +342,34 @@ setTimeout('busuanzi()', 2000);
         _js["prism"] = [get_pure_path(f"{base_assets_path}/lsbook/prismjs/clipboard.min.js"),
                         get_pure_path(f"{base_assets_path}/lsbook/prismjs/prism.js")]
 
-    # 上下页
-    previous_page_link = prev_relative_path != "" and previous_page_link_5_1.substitute(
-        prev_title=prev_title,
-        prev_relative_path=prev_relative_path
-    ) or ""
-    next_page_link = next_relative_path != "" and next_page_link_5_2.substitute(
-        next_title=next_title,
-        next_relative_path=next_relative_path,
-    ) or ""
-
-    # 组装正文
-    book_body = book_body_4.substitute(
-        previous_page_link=previous_page_link,
-        next_page_link=next_page_link,
-        title=title,
-        basePath=base_path,
-        toc=toc,
-        footer=footer,
-        book_page=book_page,
-        SEARCH_RESULTS_TITLE=i18n.get("SEARCH_RESULTS_TITLE"),
-        SEARCH_NO_RESULTS_TITLE=i18n.get("SEARCH_NO_RESULTS_TITLE")
-    )
-
-    # 组装身体
-    body = html_body_2.substitute(
-        book_summary=book_summary,
-        book_body=book_body,
-        basePath=base_path,
-        language=language,
-        LsBook_LINK=i18n.get("LsBook_LINK"),
-        github_url=github_url,
-        SEARCH_PLACEHOLDER=i18n.get("SEARCH_PLACEHOLDER"),
-        js=_js,
-        previous_page_link=prev_relative_path,
-        next_page_link=next_relative_path
-    )
-
-    # 组装头
-    head = html_head_1.substitute(
-        title=f"{book_title} - {title}",
-        author=author,
-        base_assets_path=base_assets_path,
-        next_relative_path=next_relative_path,
-        css=css.substitute(base_assets_path=base_assets_path),
-        description=title
-    )
-
-    # 组装整体
-    page = html_root_0.substitute(
-        head=head,
-        body=body,
-        lang=language,
-        js=js.substitute(base_assets_path=base_assets_path)
-    )
-
-    out_path = get_pure_path(book_output, href)
-
-    if os.path.basename(href).lower() == "readme.md":
-        out_path = get_pure_path(os.path.dirname(out_path), "index.html")
-    else:
-        out_path = set_extension(out_path, ".html")
+    # 组装页面
+    page = layout.stream({
+        "title": title,
+        "basePath": base_path,
+        "base_assets_path": base_assets_path,
+        "book_summary": book_summary,
+        # 页内导航
+        "toc": page_toc(toc_tree, summary_toggle),
+        "book_page": book_page,
+        # 上下页
+        "previous_page_link": prev_relative_path != "" and previous_page_link.render(
+            prev_title=prev_title,
+            prev_relative_path=prev_relative_path
+        ) or "",
+        "next_page_link": next_relative_path != "" and next_page_link.render(
+            next_title=next_title,
+            next_relative_path=next_relative_path,
+        ) or "",
+        "prev_relative_path": prev_relative_path,
+        "next_relative_path": next_relative_path,
+        "js_dict": _js,
+    })
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(page)
+    profiler.record("render", render_start, href=href)
 
-    body = re.sub(r"(<([^>]+)>)", "", book_page)
-    body = re.sub(r"[\n ]+", "", body)
+    out_path = page_out_path(book_output, href)
 
     url = get_pure_path(os.path.relpath(out_path, book_output))
 
-    return {url: {
-        "url": url,
-        "title": title,
-        "keywords": "",
-        "body": body,
-    }}, assets_img
+    return page, page_record(url, title, body), assets_img
+
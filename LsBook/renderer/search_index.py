@@ -0,0 +1,139 @@
+"""
+搜索索引
+
+构建时生成倒排索引，按词的范围、页码范围切分为分片，文件名携带内容哈希，可以长期缓存。
+浏览器端由 lsbook/search.js 在搜索框获得焦点时读取清单 search_index.json，只获取查询需要的分片：
+
+    search_index.json：
+    {
+        "version": 2,
+        "count": 页面数量,
+        "page_size": 每个页面分片的页面数量,
+        "pages": [页面分片文件名, ...],
+        "terms": [[分片首个词, 词分片文件名], ...]
+    }
+
+    页面分片 search_pages.<哈希>.json：[[页面地址, 标题, 摘要], ...]
+    词分片 search_terms.<哈希>.json：{词: [页码, 词频, 页码增量, 词频, ...], ...}
+
+词按字符顺序排列后切分，第一个分片的首个词为空串，查询词所在分片为首个词不大于它的最后一个分片。
+
+分词：中日韩文字编入每个单字与相邻两字，其它文字按单词切分，均转为小写。
+search.js 中的 tokenize 使用相同的字符范围，单字查询匹配单字，多字查询匹配相邻两字；修改时需同时修改。
+"""
+import hashlib
+import json
+import re
+
+# 索引格式版本，与 search.js 一致
+VERSION = 2
+# 摘要长度（字符）
+SNIPPET_SIZE = 160
+# 标题中的词按此倍数计入词频
+TITLE_WEIGHT = 5
+# 超过此长度的单词（哈希值、长串等）不编入索引
+MAX_WORD_SIZE = 32
+# 每个页面分片的页面数量
+PAGE_SHARD_SIZE = 500
+# 词分片大小上限（字节），单个词超过时独占一个分片
+TERM_SHARD_SIZE = 64 * 1024
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_WORD = "0-9a-z_\u00c0-\u00d6\u00d8-\u00f6\u00f8-\u024f\u0370-\u03ff\u0400-\u04ff"
+_token = re.compile(f"([{_CJK}]+)|([{_WORD}]+)")
+
+
+def tokenize(text):
+    """切分文本，产生索引词"""
+    for cjk, word in _token.findall(text.lower()):
+        if word:
+            if len(word) <= MAX_WORD_SIZE:
+                yield word
+        else:
+            # 单字供单字查询，相邻两字供多字查询
+            yield from cjk
+            for i in range(len(cjk) - 1):
+                yield cjk[i:i + 2]
+
+
+def page_record(url, title, text):
+    """页面的索引记录，由工作进程生成，保存在缓存目录的搜索索引记录文件中
+
+    :param url: 页面地址
+    :param title: 页面标题
+    :param text: 页面纯文本，参见 PlainText
+    :return: {"url", "title", "snippet", "terms": {词: 词频}}
+    """
+    terms = {}
+    for term in tokenize(text):
+        terms[term] = terms.get(term, 0) + 1
+    for term in tokenize(title):
+        terms[term] = terms.get(term, 0) + TITLE_WEIGHT
+    return {"url": url, "title": title, "snippet": text[:SNIPPET_SIZE], "terms": terms}
+
+
+def build_index(records):
+    """合并页面索引记录，生成倒排索引
+
+    :param records: 页面索引记录，按页面顺序
+    :return: {"pages": [[页面地址, 标题, 摘要], ...], "terms": {词: 倒排列表}}，词按顺序排列
+    """
+    pages = []
+    postings = {}
+    # 词 -> 上一个页码
+    last = {}
+    for doc, record in enumerate(records):
+        pages.append([record["url"], record["title"], record.get("snippet", "")])
+        for term, tf in record.get("terms", {}).items():
+            posting = postings.get(term)
+            if posting is None:
+                postings[term] = [doc, tf]
+            else:
+                # 页码按增量保存
+                posting.append(doc - last[term])
+                posting.append(tf)
+            last[term] = doc
+    return {"pages": pages, "terms": dict(sorted(postings.items()))}
+
+
+def shard_index(index, page_size=PAGE_SHARD_SIZE, shard_size=TERM_SHARD_SIZE):
+    """切分索引
+
+    :param index: 索引，参见 build_index
+    :return: (清单, {分片文件名: 分片内容})
+    """
+    shards = {}
+
+    def add(kind, content):
+        content = _dumps(content)
+        name = f"search_{kind}.{hashlib.sha1(content.encode('utf-8')).hexdigest()[:8]}.json"
+        shards[name] = content
+        return name
+
+    pages = index["pages"]
+    page_names = [add("pages", pages[i:i + page_size]) for i in range(0, len(pages), page_size)]
+
+    term_names = []
+    shard, start, size = {}, "", 0
+    for term, posting in index["terms"].items():
+        item_size = len(_dumps({term: posting}).encode("utf-8"))
+        if shard and size + item_size > shard_size:
+            term_names.append([start, add("terms", shard)])
+            shard, start, size = {}, term, 0
+        shard[term] = posting
+        size += item_size
+    if shard or not term_names:
+        term_names.append([start, add("terms", shard)])
+
+    manifest = {
+        "version": VERSION,
+        "count": len(pages),
+        "page_size": page_size,
+        "pages": page_names,
+        "terms": term_names,
+    }
+    return _dumps(manifest), shards
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
@@ -1,6 +1,8 @@
 import argparse
 import sys
 
+from .pool import BACKENDS
+
 
 def cmd_argument():
     """处理控制台输入参数
@@ -13,6 +15,11 @@ def cmd_argument():
     parser = argparse.ArgumentParser(description='编译 Markdown 书籍为 Html')
 
     parser.add_argument('-b', dest='build', action='store_true', default=False, help='编译书籍')
+    parser.add_argument('-w', dest='watch', action='store_true', default=False,
+                        help='编译书籍后监视书籍目录，文件修改后增量生成')
+    parser.add_argument('-s', dest='serve', action='store_true', default=False,
+                        help='启动预览服务，页面在访问时生成，不写入输出目录')
+    parser.add_argument('--port', dest='port', type=int, default=4000, help='预览服务端口，默认 4000')
     parser.add_argument('--log', dest='log',
                         choices={"debug", "info", "warn", "error", "disabled"}, default="info",
                         help="最小日志级别显示（默认值为 info; 可选值：debug, info, warn, error, disabled）")
@@ -25,6 +32,26 @@ def cmd_argument():
                         help="本站资源附加基础目录，内部测试用，误用！")
     parser.add_argument('--assets', dest="assets", default=None,
                         help="释放资源文件到指定目录")
+    parser.add_argument('--assets_mode', dest="assets_mode",
+                        choices={"copy", "link", "symlink"}, default="copy",
+                        help="主题资源安装方式（默认值为 copy; 可选值：copy 复制, link 从共享资源库 reflink 或硬链接, "
+                             "symlink 符号链接到共享资源库），不支持时回退为复制")
+    parser.add_argument('--assets_store', dest="assets_store", default=None,
+                        help="共享资源库目录，默认为环境变量 LSBOOK_ASSETS_STORE 或 ~/.cache/lsbook/assets")
+    parser.add_argument('--cache', dest="cache_dir", default=None,
+                        help="增量构建缓存目录，默认为 <output>.lsbook_cache")
+    parser.add_argument('--profile', dest="profile", nargs="?", const="lsbook_trace.json", default=None,
+                        help="记录各阶段耗时（含进程池中每个页面的解析、渲染、写入），"
+                             "写入 Chrome trace_event 文件（默认 lsbook_trace.json），可在 chrome://tracing 中查看")
+    parser.add_argument('-j', dest="jobs", type=int, default=None,
+                        help="并发数量，默认为 CPU 数量")
+    parser.add_argument('--executor', dest="executor", choices=BACKENDS, default="auto",
+                        help="执行方式（默认值为 auto; 可选值：auto 按页面数量与大小选择, serial 主进程依次执行, "
+                             "thread 线程池，适用于自由线程版本, process 进程池）")
+    parser.add_argument('-f', '--force', dest="force", action='store_true', default=False,
+                        help="忽略增量构建缓存，完整生成书籍")
 
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"-j 并发数量必须为正整数：{args.jobs}")
     return args
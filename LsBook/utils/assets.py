@@ -0,0 +1,64 @@
+import hashlib
+import logging
+import os
+
+from .. import __version__
+from ..utils.fs import copytree, install_tree, rmdir
+from ..utils.path import get_abs_path
+
+
+def default_assets_store():
+    """默认共享资源库目录：环境变量 LSBOOK_ASSETS_STORE，或用户缓存目录"""
+    return os.environ.get("LSBOOK_ASSETS_STORE") or get_abs_path(
+        os.environ.get("XDG_CACHE_HOME") or get_abs_path(os.path.expanduser("~"), ".cache"), "lsbook", "assets")
+
+
+def assets_digest(assets_path):
+    """资源目录摘要：按相对路径排序的文件路径、大小与修改时间"""
+    _hash = hashlib.sha1()
+    for root, dirs, files in os.walk(assets_path):
+        dirs.sort()
+        for name in sorted(files):
+            file = os.path.join(root, name)
+            stat = os.stat(file)
+            rel = os.path.relpath(file, assets_path).replace(os.sep, "/")
+            _hash.update(f"{rel}\x00{stat.st_size}\x00{stat.st_mtime_ns}\n".encode("utf-8"))
+    return _hash.hexdigest()[:8]
+
+
+def assets_store(assets_path, store=None):
+    """按版本与资源摘要保存主题资源的共享资源库，本机所有书籍链接到同一份资源
+
+    首次使用时从安装包复制，之后直接复用；安装包中的资源改变时（开发安装修改资源、升级未改版本号）摘要改变，另建资源目录。
+
+    :param assets_path: 安装包中的资源目录
+    :param store: 资源库目录
+    :return: 资源库中本版本资源的目录
+    """
+    path = get_abs_path(store or default_assets_store(), f"{__version__}-{assets_digest(assets_path)}", "lsbook")
+    if not os.path.isdir(path):
+        logging.info(f"创建共享资源库：{path}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.lsbook_tmp"
+        rmdir(tmp)
+        copytree(assets_path, tmp)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            # 其它进程已创建
+            rmdir(tmp)
+    return path
+
+
+def install_assets(assets_path, assets_path_out, mode="copy", store=None):
+    """安装主题资源到输出目录
+
+    :param assets_path: 安装包中的资源目录
+    :param assets_path_out: 资源输出目录
+    :param mode: copy：复制；link：从共享资源库 reflink 或硬链接；symlink：符号链接到共享资源库
+    :param store: 共享资源库目录
+    :return: 输出目录中的资源文件集合
+    """
+    if mode != "copy":
+        assets_path = assets_store(assets_path, store)
+    return install_tree(assets_path, assets_path_out, mode)
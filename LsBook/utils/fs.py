@@ -1,9 +1,18 @@
+import fnmatch
 import logging
 import os
 import shutil
 
 from ..utils.path import get_pure_path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Linux ioctl：写时复制克隆文件
+FICLONE = 0x40049409
+
 
 def rmdir(file_path: str):
     """删除目录
@@ -16,6 +25,14 @@ def rmdir(file_path: str):
         shutil.rmtree(file_path)
 
 
+def remove_path(path: str):
+    """删除文件、符号链接或目录"""
+    if os.path.islink(path) or os.path.isfile(path):
+        os.remove(path)
+    else:
+        rmdir(path)
+
+
 def mkdir(file_path: str):
     """创建目录
 
@@ -38,6 +55,258 @@ def copy(src, dst):
     shutil.copy(src, dst)
 
 
+def write_file(path, content, skip_unchanged=False):
+    """写入文本文件
+
+    先写入临时文件再替换，不会修改硬链接到同一文件的其它路径。
+
+    :param content: 文本，或文本片段的可迭代对象（逐段写入，不拼接）
+    :param skip_unchanged: 已有文件内容相同时不写入，保留修改时间；content 须为文本
+    :return: 是否写入
+    """
+    if skip_unchanged and is_same_content(path, content.encode("utf-8")):
+        return False
+    tmp = f"{path}.lsbook_tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            if isinstance(content, str):
+                f.write(content)
+            else:
+                f.writelines(content)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+    return True
+
+
+def is_same_content(path, data):
+    """文件内容是否与 data 相同，文件不存在时返回 False"""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def copy_file(src, dst):
+    """复制文件，保留修改时间，不会修改硬链接到同一文件的其它路径"""
+    tmp = f"{dst}.lsbook_tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+def is_same_file(src, dst):
+    """按大小与修改时间判断目标文件是否与源文件一致"""
+    try:
+        src_stat = os.stat(src)
+        dst_stat = os.stat(dst)
+    except OSError:
+        return False
+    return src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) == int(dst_stat.st_mtime)
+
+
+def sync_file(src, dst):
+    """同步文件：目标文件不存在或已修改时复制
+
+    :return: 是否复制
+    """
+    if is_same_file(src, dst):
+        return False
+    copy_file(src, dst)
+    return True
+
+
+def sync_tree(src, dst, *ignore):
+    """同步目录：只复制新增或修改的文件，未修改的文件保持原样
+
+    :param src: 源目录
+    :param dst: 目标目录
+    :param ignore: 忽略的文件与文件夹
+    :return: 目标目录中同步的文件路径集合
+    """
+    _ignore = shutil.ignore_patterns(*ignore)
+    synced = set()
+    count = 0
+    for root, dirs, files in os.walk(src):
+        ignored = _ignore(root, dirs + files)
+        dirs[:] = [d for d in dirs if d not in ignored]
+        target = os.path.normpath(os.path.join(dst, os.path.relpath(root, src)))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            if name in ignored:
+                continue
+            dst_file = os.path.join(target, name)
+            if sync_file(os.path.join(root, name), dst_file):
+                count += 1
+            synced.add(dst_file)
+    logging.debug(f"同步目录：{src} -> {dst}，复制 {count} 个文件，共 {len(synced)} 个文件")
+    return synced
+
+
+def reflink_file(src, dst):
+    """写时复制（reflink）文件，文件系统不支持时抛出 OSError"""
+    if fcntl is None:
+        raise OSError("不支持 reflink")
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+    shutil.copystat(src, dst)
+
+
+def link_file(src, dst):
+    """以 reflink、硬链接方式安装文件，均不支持时复制
+
+    :return: 实际使用的方式
+    """
+    tmp = f"{dst}.lsbook_tmp"
+    for method, func in (("reflink", reflink_file), ("hardlink", os.link)):
+        try:
+            func(src, tmp)
+        except OSError:
+            continue
+        os.replace(tmp, dst)
+        return method
+    copy_file(src, dst)
+    return "copy"
+
+
+def install_tree(src, dst, mode="copy"):
+    """安装目录
+
+    :param src: 源目录
+    :param dst: 目标目录
+    :param mode: copy：同步复制；link：reflink 或硬链接，不支持时复制；symlink：符号链接到源目录，不支持时按 link 处理
+    :return: 目标目录中的文件集合
+    """
+    if mode == "symlink":
+        if os.path.islink(dst) and os.readlink(dst) == src:
+            return {os.path.normpath(dst)}
+        remove_path(dst)
+        try:
+            os.symlink(src, dst, target_is_directory=True)
+            logging.debug(f"符号链接：{dst} -> {src}")
+            return {os.path.normpath(dst)}
+        except OSError as e:
+            logging.warning(f"无法创建符号链接，改用硬链接：{dst}\n{e}")
+            mode = "link"
+
+    # 不能写入符号链接指向的目录
+    if os.path.islink(dst):
+        os.remove(dst)
+    if mode != "link":
+        return sync_tree(src, dst)
+
+    installed = set()
+    methods = {}
+    for root, dirs, files in os.walk(src):
+        target = os.path.normpath(os.path.join(dst, os.path.relpath(root, src)))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            dst_file = os.path.join(target, name)
+            if not is_same_file(os.path.join(root, name), dst_file):
+                method = link_file(os.path.join(root, name), dst_file)
+                methods[method] = methods.get(method, 0) + 1
+            installed.add(dst_file)
+    logging.debug(f"安装目录：{src} -> {dst}，{methods}")
+    return installed
+
+
+def link_tree(src, dst):
+    """以硬链接镜像目录，不支持硬链接时复制，符号链接保持为符号链接"""
+    for root, dirs, files in os.walk(src):
+        target = os.path.join(dst, os.path.relpath(root, src))
+        os.makedirs(target, exist_ok=True)
+        for name in dirs + files:
+            src_file = os.path.join(root, name)
+            if os.path.islink(src_file):
+                os.symlink(os.readlink(src_file), os.path.join(target, name))
+            elif name in files:
+                try:
+                    os.link(src_file, os.path.join(target, name))
+                except OSError:
+                    shutil.copy2(src_file, os.path.join(target, name))
+        dirs[:] = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+
+
+def prune_tree(path, keep, patterns=None):
+    """删除目录中不在 keep 内的文件与空目录
+
+    :param path: 目录
+    :param keep: 保留的文件路径集合（规范化绝对路径）
+    :param patterns: 只删除相对路径匹配其中之一的文件，不删除目录；为空时删除全部过期文件
+    :return: 删除的文件数
+    """
+    count = 0
+    for root, dirs, files in os.walk(path, topdown=False):
+        for name in files + [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            file = os.path.normpath(os.path.join(root, name))
+            if patterns is not None and not any(fnmatch.fnmatch(os.path.relpath(file, path), pattern)
+                                                for pattern in patterns):
+                continue
+            if file not in keep:
+                logging.debug(f"删除过期文件：{file}")
+                os.remove(file)
+                count += 1
+        if patterns is None and root != path and not os.listdir(root):
+            os.rmdir(root)
+    return count
+
+
+def stage_dir(path):
+    """准备暂存目录：以硬链接镜像已有目录，生成完毕后通过 swap_dir 替换
+
+    :return: 暂存目录
+    """
+    staging = f"{path}.lsbook_staging"
+    old = f"{path}.lsbook_old"
+    if os.path.isdir(old):
+        if os.path.exists(path):
+            rmdir(old)
+        else:
+            # 上次 swap_dir 在两次重命名之间中断，恢复原目录
+            logging.warning(f"恢复上次未完成替换的目录：{path}")
+            os.rename(old, path)
+    rmdir(staging)
+    if os.path.isdir(path):
+        link_tree(path, staging)
+    else:
+        mkdir(staging)
+    return staging
+
+
+def swap_dir(staging, path):
+    """用暂存目录替换目标目录，目录无法重命名时就地同步
+
+    替换由两次重命名完成：目标目录移至 <path>.lsbook_old，再将暂存目录移至目标目录。
+    这不是原子操作，两次重命名之间目标目录不存在；此时中断则原目录保留在 <path>.lsbook_old，
+    下次生成时由 stage_dir 恢复。
+    """
+    old = f"{path}.lsbook_old"
+    rmdir(old)
+    try:
+        if os.path.isdir(path):
+            os.rename(path, old)
+        try:
+            os.rename(staging, path)
+        except BaseException:
+            if not os.path.exists(path) and os.path.isdir(old):
+                os.rename(old, path)
+            raise
+    except OSError as e:
+        logging.warning(f"无法替换目录，就地同步：{path}\n{e}")
+        prune_tree(path, sync_tree(staging, path))
+        rmdir(staging)
+    rmdir(old)
+
+
 def is_file_exist(root: str, filename):
     """验证文件是否存在
 
@@ -3,6 +3,7 @@ import os
 from pathlib import Path
 
 from ..models.book import Book
+from ..models.manifest import Manifest
 from ..utils.error import dir_not_found_error
 
 
@@ -19,13 +20,24 @@ def process_input_output_path(book: Book):
     if not os.path.isdir(book.book_path):
         dir_not_found_error(book.book_path)
 
-    book.book_output = get_abs_path(book.book_path, book.book_output)
-    logging.info(f"输出目录：{book.book_output}")
-
     book.assets_path = get_abs_path(os.path.split(os.path.dirname(__file__))[0], *book.assets_path)
     logging.debug(f"资源路径：{book.assets_path}")
 
-    book.assets_path_out = get_abs_path(book.book_output, book.assets_path_out)
+    set_output_path(book, get_abs_path(book.book_path, book.book_output))
+    logging.info(f"输出目录：{book.book_output}")
+
+    # 缓存目录默认与输出目录并列，清单与搜索索引记录不随输出目录发布
+    book.cache_dir = get_abs_path(book.book_path, book.cache_dir or f"{book.book_output}.lsbook_cache")
+    book.manifest = Manifest(get_pure_path(book.cache_dir, ".lsbook_manifest.json"),
+                             get_pure_path(book.cache_dir, ".lsbook_search.jsonl"))
+    logging.debug(f"增量构建清单：{book.manifest.path}")
+
+
+def set_output_path(book: Book, book_output):
+    """设置输出路径与资源输出路径"""
+    book.book_output = book_output
+
+    book.assets_path_out = get_abs_path(book_output, "lsbook")
     logging.debug(f"资源输出路径：{book.assets_path_out}")
 
 
@@ -0,0 +1,132 @@
+import logging
+import os
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import ProcessPoolExecutor
+
+# 执行方式
+BACKENDS = ("auto", "serial", "thread", "process")
+# auto：页面数量或输入大小低于阈值时直接在主进程中生成，启动进程的开销大于生成页面
+AUTO_SERIAL_PAGES = 16
+AUTO_SERIAL_BYTES = 128 * 1024
+
+
+def is_free_threaded():
+    """当前解释器是否为自由线程（无 GIL）版本"""
+    return not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class SerialExecutor(object):
+    """在当前线程中依次执行任务，接口与 concurrent.futures 的执行器一致"""
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class WorkerPool(object):
+    """任务执行器
+
+    支持 serial（主进程依次执行）、thread（线程池）、process（进程池）与 auto（按任务量选择）。
+    工作进程启动时由初始化函数安装一次共享的构建上下文，任务只携带页面序号；
+    上下文变化（配置、目录、自定义 js 修改）时重建进程池。
+    """
+
+    def __init__(self, backend="auto", max_workers=None):
+        """
+        :param backend: 执行方式，参见 BACKENDS
+        :param max_workers: 并发数量，为空时使用 CPU 数量
+        """
+        if backend not in BACKENDS:
+            raise ValueError(f"不支持的执行方式：{backend}")
+        self.backend = backend
+        self.max_workers = max_workers
+        # 执行方式 -> [执行器, 上下文标识]，auto 模式下切换执行方式时保留已启动的进程池
+        self._executors = {}
+        # 当前使用的执行方式
+        self._current = None
+
+    @property
+    def workers(self):
+        """并发数量"""
+        if self._current == "serial":
+            return 1
+        return self.max_workers_configured
+
+    @property
+    def max_workers_configured(self):
+        """配置的并发数量，与当前执行方式无关"""
+        return self.max_workers or os.cpu_count() or 1
+
+    @property
+    def in_process(self):
+        """任务是否在主进程中执行"""
+        return self._current in ("serial", "thread")
+
+    def choose(self, pages=0, size=0):
+        """选择执行方式
+
+        :param pages: 任务数量
+        :param size: 输入总大小（字节）
+        """
+        if self.backend != "auto":
+            return self.backend
+        if self.max_workers_configured == 1 or pages < AUTO_SERIAL_PAGES or size < AUTO_SERIAL_BYTES:
+            return "serial"
+        # 自由线程版本中线程可以并行执行，无需启动进程
+        return "thread" if is_free_threaded() else "process"
+
+    def start(self, key, initializer, *initargs, pages=0, size=0):
+        """以指定上下文启动执行器，上下文未变化时复用已有执行器
+
+        :param key: 上下文标识
+        :param initializer: 初始化函数，进程池中每个工作进程执行一次，其余方式在主进程中执行一次
+        :param initargs: 初始化函数参数
+        :param pages: 任务数量，auto 模式下用于选择执行方式
+        :param size: 输入总大小（字节），auto 模式下用于选择执行方式
+        """
+        backend = self.choose(pages, size)
+        if backend != self._current:
+            logging.debug(f"执行方式：{backend}")
+        self._current = backend
+        executor, _key = self._executors.get(backend, (None, None))
+        if executor is not None and _key == key:
+            return self
+        if backend == "process":
+            if executor is not None:
+                executor.shutdown()
+            executor = ProcessPoolExecutor(self.max_workers, initializer=initializer, initargs=initargs)
+        else:
+            # 线程与主进程共用上下文，只需重新执行初始化函数
+            initializer(*initargs)
+            if executor is None:
+                executor = ThreadPoolExecutor(self.max_workers) if backend == "thread" else SerialExecutor()
+        self._executors[backend] = [executor, key]
+        return self
+
+    def submit(self, func, *args):
+        """提交任务，需先调用 start"""
+        return self._executors[self._current][0].submit(func, *args)
+
+    def map(self, func, *iterables):
+        """执行与构建上下文无关的任务，执行器未启动时在主进程中依次执行
+
+        :return: 结果列表
+        """
+        if self._current is None:
+            return list(map(func, *iterables))
+        return [future.result() for future in [self.submit(func, *args) for args in zip(*iterables)]]
+
+    def shutdown(self, wait=True):
+        """关闭所有执行器"""
+        for executor, _ in self._executors.values():
+            executor.shutdown(wait)
+        self._executors = {}
+        self._current = None
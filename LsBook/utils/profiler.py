@@ -0,0 +1,127 @@
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 是否记录耗时
+_enabled = False
+# Chrome trace_event 事件
+_events = []
+# 已命名的进程
+_processes = set()
+
+
+def enable():
+    """开启耗时记录"""
+    global _enabled
+    _enabled = True
+    _name_process("main")
+
+
+def is_enabled():
+    return _enabled
+
+
+def clock():
+    """当前时间（微秒），进程间共用时钟"""
+    return time.time() * 1e6
+
+
+def _name_process(name):
+    pid = os.getpid()
+    if pid in _processes:
+        return
+    _processes.add(pid)
+    _events.append({"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": f"{name} {pid}"}})
+
+
+@contextmanager
+def span(name, **args):
+    """记录一段耗时，未开启时不做任何事
+
+    :param name: 阶段名称
+    :param args: 附加信息，显示在 trace 详情中
+    """
+    if not _enabled:
+        yield
+        return
+    start = clock()
+    try:
+        yield
+    finally:
+        record(name, start, **args)
+
+
+def record(name, start, **args):
+    """记录从 start（clock 的返回值）到现在的耗时，用于不便使用 span 的代码段"""
+    if _enabled:
+        _events.append({
+            "name": name, "ph": "X", "ts": start, "dur": clock() - start,
+            "pid": os.getpid(), "tid": threading.get_ident(), "args": args
+        })
+
+
+def profile_call(func, *args):
+    """在进程池中执行并记录耗时
+
+    :return: (函数返回值, 本次记录的事件)
+    """
+    global _enabled
+    _enabled = True
+    start = len(_events)
+    _name_process("worker")
+    with span(func.__name__.lstrip("_")):
+        ret = func(*args)
+    events = _events[start:]
+    del _events[start:]
+    return ret, events
+
+
+def _span_call(func, *args):
+    """在主进程中（依次或线程池）执行并记录耗时，返回值与 profile_call 一致"""
+    with span(func.__name__.lstrip("_")):
+        return func(*args), []
+
+
+def submit(pool, func, *args):
+    """提交任务到进程池，开启记录时同时记录任务在工作进程中的耗时
+
+    结果使用 result 获取。
+    """
+    if not _enabled:
+        return pool.submit(func, *args)
+    if getattr(pool, "in_process", False):
+        return pool.submit(_span_call, func, *args)
+    return pool.submit(profile_call, func, *args)
+
+
+def result(future):
+    """获取 submit 提交的任务结果，合并工作进程的事件"""
+    if not _enabled:
+        return future.result()
+    with span("wait"):
+        ret, events = future.result()
+    for event in events:
+        if event["ph"] == "M":
+            if event["pid"] in _processes:
+                continue
+            _processes.add(event["pid"])
+        _events.append(event)
+    return ret
+
+
+def write_trace(path):
+    """写入 Chrome trace_event 文件，可在 chrome://tracing 或 Perfetto 中打开，并输出各阶段耗时汇总"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+    logging.info(f"耗时记录：{os.path.abspath(path)}")
+
+    total = {}
+    for event in _events:
+        if event["ph"] == "X":
+            count, dur = total.get(event["name"], (0, 0))
+            total[event["name"]] = count + 1, dur + event["dur"]
+    for name, (count, dur) in sorted(total.items(), key=lambda x: -x[1][1]):
+        logging.info(f"{name:<16}{count:>8} 次{dur / 1e6:>12.3f}s")
@@ -0,0 +1,47 @@
+def estimate_costs(sizes, history):
+    """估计任务耗时
+
+    有历史耗时的任务使用历史耗时，其余任务按历史耗时与输入大小的比例由输入大小换算；
+    无法得到比例（没有历史耗时，或有历史耗时的任务大小或耗时之和为 0）时全部任务以输入大小作为耗时。
+
+    :param sizes: 各任务输入大小（字节）
+    :param history: 各任务上次生成的耗时（秒），没有时为 None
+    :return: 各任务估计耗时
+    """
+    known = [(size, cost) for size, cost in zip(sizes, history) if cost is not None]
+    known_size = sum(size for size, _ in known)
+    known_cost = sum(cost for _, cost in known)
+    if not known_size or not known_cost:
+        return list(sizes)
+    rate = known_cost / known_size
+    return [size * rate if cost is None else cost for size, cost in zip(sizes, history)]
+
+
+def schedule(costs, workers, chunks_per_worker=4):
+    """按估计耗时安排任务：最长任务优先，小任务合并为批次以减少进程间通信
+
+    进程池按提交顺序分配任务，耗时长的任务先提交，避免书籍末尾的大页面拖慢整体完成时间。
+
+    :param costs: 各任务估计耗时
+    :param workers: 工作进程数量
+    :param chunks_per_worker: 每个工作进程平均分得的批次数，越大负载越均衡，进程间通信越多
+    :return: 批次列表，每个批次为任务序号列表，按估计耗时从大到小排列
+    """
+    order = sorted(range(len(costs)), key=lambda i: -costs[i])
+    target = sum(costs) / (max(workers, 1) * chunks_per_worker)
+    batches = []
+    batch = []
+    batch_cost = 0
+    for i in order:
+        if costs[i] >= target:
+            batches.append([i])
+            continue
+        batch.append(i)
+        batch_cost += costs[i]
+        if batch_cost >= target:
+            batches.append(batch)
+            batch = []
+            batch_cost = 0
+    if batch:
+        batches.append(batch)
+    return batches
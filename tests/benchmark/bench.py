@@ -0,0 +1,303 @@
+"""
+合成书籍性能测试
+
+    python -m tests.benchmark                   # 与基线比较
+    python -m tests.benchmark --update          # 更新基线
+    python -m tests.benchmark --case cjk heavy  # 只测试部分书籍
+
+各项耗时除以校准耗时后与基线比较，以减少不同机器之间的差异；
+超过容差时输出 REGRESSION 并以非 0 状态退出。
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from LsBook.mistletoe_renderers import Document, HTMLRenderer, block_token, parse_context, span_token
+from LsBook.mistletoe_renderers.block_tokenizer import tokenize_block
+from LsBook.models.book import Book
+from LsBook.output.generateBook import generateBook, source_ignore
+from LsBook.parse.parse_config import is_config_exist
+from LsBook.parse.parse_markdown.file_imports import process_file_import
+from LsBook.parse.parse_summary import is_summary_exist, parse_summary
+from LsBook.renderer.renderer_html import renderer_html
+from LsBook.utils.fs import sync_tree
+from LsBook.utils.path import process_input_output_path, set_output_path
+from LsBook.utils.pool import BACKENDS, WorkerPool
+from .synthetic import CASES, make_book
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# 性能测试项：名称 -> 函数(书籍目录, 输出目录, 进程池)，返回耗时（秒），或 (耗时, 处理数量)
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__[len("bench_"):]] = func
+    return func
+
+
+def calibrate():
+    """校准：固定的纯 Python 计算耗时"""
+    start = time.perf_counter()
+    d = {}
+    for i in range(300000):
+        d[str(i)] = i * i
+    "".join(sorted(d)[:1000])
+    return time.perf_counter() - start
+
+
+def _book(book_dir, out_dir, pool):
+    book = Book(book_dir, out_dir, pool, None, force=True)
+    process_input_output_path(book)
+    is_summary_exist(book)
+    is_config_exist(book)
+    return book
+
+
+def _pages(book: Book):
+    """读取全部页面，处理引入文件"""
+    pages = []
+    for item in book.summary_classify_list:
+        file = os.path.join(book.book_path, item["href"])
+        with open(file, encoding="utf-8") as f:
+            page, _ = process_file_import(os.path.dirname(file), f.read(), item["basePath"])
+        pages.append(page)
+    return pages
+
+
+@benchmark
+def bench_parse_summary(book_dir, out_dir, pool):
+    book = _book(book_dir, out_dir, pool)
+    start = time.perf_counter()
+    parse_summary(book)
+    return time.perf_counter() - start
+
+
+@benchmark
+def bench_block_tokenizer(book_dir, out_dir, pool):
+    """只划分块级令牌，不解析行内令牌"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    pages = [[line + "\n" for line in page.splitlines()] for page in _pages(book)]
+    with HTMLRenderer():
+        start = time.perf_counter()
+        for lines in pages:
+            with parse_context.parsing():
+                tokenize_block(lines, block_token.token_types())
+        return time.perf_counter() - start
+
+
+@benchmark
+def bench_block_long_document(book_dir, out_dir, pool):
+    """全部页面拼接为一个长文档后划分块级令牌，输出每秒处理的行数"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    lines = [line + "\n" for page in _pages(book) for line in page.splitlines()] * 5
+    with HTMLRenderer():
+        start = time.perf_counter()
+        with parse_context.parsing():
+            tokenize_block(lines, block_token.token_types())
+        return time.perf_counter() - start, len(lines)
+
+
+@benchmark
+def bench_span_tokenizer(book_dir, out_dir, pool):
+    """完整解析（块级与行内）减去块级划分的耗时"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    pages = _pages(book)
+    with HTMLRenderer():
+        start = time.perf_counter()
+        for page in pages:
+            Document(page)
+        total = time.perf_counter() - start
+    return max(total - bench_block_tokenizer(book_dir, out_dir, pool), 0.0)
+
+
+def _inline_strings(pages):
+    """解析页面，收集交给行内分词器的文本（段落、标题、表格单元格）及其所属文档"""
+    inline = []
+    tokenize_inner = span_token.tokenize_inner
+
+    def collect(content):
+        inline.append((parse_context.current().root, content))
+        return tokenize_inner(content)
+
+    span_token.tokenize_inner = collect
+    try:
+        with HTMLRenderer():
+            for page in pages:
+                Document(page)
+    finally:
+        span_token.tokenize_inner = tokenize_inner
+    return inline
+
+
+@benchmark
+def bench_span_paragraphs(book_dir, out_dir, pool):
+    """只执行行内分词，输出每秒处理的段落数"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    inline = _inline_strings(_pages(book))
+    with HTMLRenderer():
+        start = time.perf_counter()
+        for root, content in inline:
+            with parse_context.parsing(root):
+                span_token.tokenize_inner(content)
+        return time.perf_counter() - start, len(inline)
+
+
+@benchmark
+def bench_render(book_dir, out_dir, pool):
+    """解析后的文档生成 html"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    pages = _pages(book)
+    with HTMLRenderer() as renderer:
+        documents = [Document(page) for page in pages]
+        start = time.perf_counter()
+        for document in documents:
+            renderer.render(document)
+        return time.perf_counter() - start
+
+
+@benchmark
+def bench_render_large(book_dir, out_dir, pool):
+    """全部页面拼接为不小于 1MB 的文档后生成 html，输出每秒处理的字节数"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    page = "\n\n".join(_pages(book))
+    page = page * (1024 * 1024 // len(page.encode("utf-8")) + 1)
+    with HTMLRenderer() as renderer:
+        document = Document(page)
+        start = time.perf_counter()
+        renderer.render(document)
+        return time.perf_counter() - start, len(page.encode("utf-8"))
+
+
+@benchmark
+def bench_renderer_html(book_dir, out_dir, pool):
+    """生成全部页面（进程池）"""
+    book = _book(book_dir, out_dir, pool)
+    parse_summary(book)
+    set_output_path(book, book.book_output)
+    sync_tree(book.book_path, book.book_output, *source_ignore(book))
+    start = time.perf_counter()
+    renderer_html(book)
+    return time.perf_counter() - start
+
+
+@benchmark
+def bench_generate_book(book_dir, out_dir, pool):
+    """完整生成书籍"""
+    shutil.rmtree(out_dir, ignore_errors=True)
+    start = time.perf_counter()
+    generateBook(Book(book_dir, out_dir, pool, None, force=True))
+    return time.perf_counter() - start
+
+
+def _measure(func, book_dir, out_dir, pool):
+    """执行一次测试项，返回 (耗时, 处理数量)"""
+    result = func(book_dir, out_dir, pool)
+    return result if isinstance(result, tuple) else (result, 0)
+
+
+def run(cases, names, repeat, workdir, pool):
+    """执行性能测试，返回 {书籍: {测试项: 最短耗时}}"""
+    results = {}
+    for case in cases:
+        book_dir = make_book(os.path.join(workdir, case), **CASES[case])
+        out_dir = os.path.join(workdir, f"{case}_out")
+        results[case] = {}
+        for name in names:
+            seconds, count = min(_measure(BENCHMARKS[name], book_dir, out_dir, pool) for _ in range(repeat))
+            results[case][name] = seconds
+            rate = f"{count / seconds:>12.0f}/s" if count and seconds else ""
+            print(f"{case:<8}{name:<20}{seconds:>10.4f}s{rate}", file=sys.stderr)
+    return results
+
+
+def compare(baseline, current, tolerance):
+    """与基线比较，返回退化的测试项数量"""
+    base_calibration = baseline["calibration"]
+    calibration = current["calibration"]
+    regressions = 0
+    print(f"{'case':<8}{'benchmark':<20}{'baseline':>10}{'current':>10}{'change':>9}")
+    for case, results in current["results"].items():
+        for name, seconds in results.items():
+            base = baseline["results"].get(case, {}).get(name)
+            if base is None:
+                print(f"{case:<8}{name:<20}{'-':>10}{seconds:>10.4f}{'new':>9}")
+                continue
+            # 按校准耗时换算到基线机器
+            change = seconds / calibration / (base / base_calibration) - 1
+            flag = ""
+            if change > tolerance:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{case:<8}{name:<20}{base:>10.4f}{seconds:>10.4f}{change:>+9.1%}{flag}")
+    return regressions
+
+
+def update_baseline(path, current):
+    """更新基线：只写入本次测试的项目，未测试的项目保持原值
+
+    本次结果覆盖基线中的全部项目时重新生成基线；否则按校准耗时换算到基线的校准，
+    基线中未测试的项目不做换算。
+    """
+    baseline = None
+    if os.path.isfile(path):
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    measured = {(case, name) for case, results in current["results"].items() for name in results}
+    if baseline is None or all((case, name) in measured
+                               for case, results in baseline["results"].items() for name in results):
+        baseline = {"calibration": current["calibration"], "results": {}}
+    ratio = baseline["calibration"] / current["calibration"]
+    for case, results in current["results"].items():
+        baseline["results"].setdefault(case, {}).update((name, seconds * ratio) for name, seconds in results.items())
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="合成书籍性能测试")
+    parser.add_argument("--case", nargs="+", choices=sorted(CASES), default=sorted(CASES), help="测试的书籍")
+    parser.add_argument("--bench", nargs="+", choices=sorted(BENCHMARKS), default=list(BENCHMARKS),
+                        help="测试项")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数，取最短耗时")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许的退化比例，默认 0.2")
+    parser.add_argument("--baseline", default=BASELINE, help="基线文件")
+    parser.add_argument("--update", action="store_true", help="更新基线")
+    parser.add_argument("-j", dest="jobs", type=int, default=None, help="并发数量")
+    parser.add_argument("--executor", choices=BACKENDS, default="auto", help="执行方式")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level="WARNING")
+    workdir = tempfile.mkdtemp(prefix="lsbook_bench_")
+    pool = WorkerPool(args.executor, args.jobs)
+    try:
+        current = {
+            "calibration": min(calibrate() for _ in range(5)),
+            "results": run(args.case, args.bench, args.repeat, workdir, pool),
+        }
+    finally:
+        pool.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.update:
+        update_baseline(args.baseline, current)
+        print(f"基线已更新：{args.baseline}")
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f"基线不存在，请使用 --update 生成：{args.baseline}")
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    return 1 if compare(baseline, current, args.tolerance) else 0
@@ -0,0 +1,72 @@
+"""
+大文档解析内存测试
+
+    python -m tests.benchmark.memory              # 4MB 文档
+    python -m tests.benchmark.memory --size 20    # 20MB 文档
+
+由合成书籍页面拼接出指定大小的文档，使用 tracemalloc 统计解析与生成 html 的峰值内存，
+输出每个输入字节占用的字节数。
+"""
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+
+from LsBook.mistletoe_renderers import Document, HTMLRenderer
+from .synthetic import CASES, make_book
+
+
+def _document(book_dir, size):
+    """拼接书籍中的全部页面，重复到不小于 size 字节"""
+    pages = []
+    for root, _, files in os.walk(book_dir):
+        for file in sorted(files):
+            if file.endswith(".md") and file != "SUMMARY.md":
+                with open(os.path.join(root, file), encoding="utf-8") as f:
+                    pages.append(f.read())
+    page = "\n\n".join(pages)
+    return page * (size // len(page.encode("utf-8")) + 1)
+
+
+def measure(page):
+    """返回 (解析峰值, 生成 html 峰值)，单位字节，不含输入文本本身"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        document = Document(page)
+        _, parse_peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        with HTMLRenderer() as renderer:
+            renderer.render(document)
+        _, render_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return parse_peak, render_peak - base
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="大文档解析内存测试")
+    parser.add_argument("--case", nargs="+", choices=sorted(CASES), default=sorted(CASES), help="测试的书籍")
+    parser.add_argument("--size", type=float, default=4, help="文档大小（MB），默认 4")
+    args = parser.parse_args(argv)
+
+    workdir = tempfile.mkdtemp(prefix="lsbook_memory_")
+    try:
+        print(f"{'case':<8}{'input':>10}{'parse':>12}{'render':>12}{'parse/B':>10}{'render/B':>10}")
+        for case in args.case:
+            page = _document(make_book(os.path.join(workdir, case), **CASES[case]), int(args.size * 1024 * 1024))
+            size = len(page.encode("utf-8"))
+            parse_peak, render_peak = measure(page)
+            print(f"{case:<8}{size / 2 ** 20:>8.1f}MB{parse_peak / 2 ** 20:>10.1f}MB{render_peak / 2 ** 20:>10.1f}MB"
+                  f"{parse_peak / size:>10.1f}{render_peak / size:>10.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
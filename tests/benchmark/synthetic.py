@@ -0,0 +1,120 @@
+"""
+生成用于性能测试的合成书籍
+"""
+import json
+import os
+import random
+
+_ascii_words = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor incididunt ut labore "
+                "et dolore magna aliqua enim ad minim veniam quis nostrud exercitation ullamco laboris nisi aliquip "
+                "ex ea commodo consequat duis aute irure in reprehenderit voluptate velit esse cillum").split()
+_cjk_words = ("软件 测试 变量 函数 目录 页面 生成 书籍 解析 渲染 索引 搜索 资源 配置 模板 接口 缓存 进程 线程 文件 "
+              "路径 语法 代码 图片 表格 公式 链接 标题 段落 列表 引用 数据 结构 算法 网络 协议 服务 请求 响应").split()
+
+# 预置参数
+CASES = {
+    "ascii": dict(pages=200, depth=2, page_size=3000, cjk=False),
+    "cjk": dict(pages=200, depth=2, page_size=3000, cjk=True),
+    "deep": dict(pages=300, depth=5, page_size=800, cjk=True),
+    "heavy": dict(pages=100, depth=3, page_size=6000, cjk=True,
+                  code=0.3, math=0.2, mermaid=0.1, table=0.2, imports=0.2),
+}
+
+
+def make_book(path, pages=100, depth=3, page_size=3000, code=0.1, math=0.05, mermaid=0.02, table=0.05,
+              imports=0.05, cjk=True, seed=0):
+    """生成合成书籍，相同参数生成的书籍完全相同
+
+    :param path: 书籍目录
+    :param pages: 页面数量
+    :param depth: 目录最大层级
+    :param page_size: 每个页面的大约字符数
+    :param code: 代码块占段落的比例
+    :param math: 公式占段落的比例
+    :param mermaid: mermaid 图表占段落的比例
+    :param table: 表格占段落的比例
+    :param imports: @import 引入占段落的比例
+    :param cjk: 正文使用中文，否则为英文
+    :param seed: 随机种子
+    :return: 书籍目录
+    """
+    rnd = random.Random(seed)
+    words = _cjk_words if cjk else _ascii_words
+    sep = "" if cjk else " "
+    os.makedirs(path, exist_ok=True)
+
+    with open(os.path.join(path, "book.json"), "w", encoding="utf-8") as f:
+        json.dump({"title": "benchmark", "author": "benchmark", "language": "zh-cn"}, f)
+
+    # 引入文件
+    os.makedirs(os.path.join(path, "code"), exist_ok=True)
+    for i in range(10):
+        with open(os.path.join(path, "code", f"{i}.py"), "w", encoding="utf-8") as f:
+            f.write("\n".join(f"def func_{i}_{j}(x):\n    return x * {j}\n" for j in range(20)))
+        with open(os.path.join(path, "code", f"{i}.md"), "w", encoding="utf-8") as f:
+            f.write(f"### 引入 {i}\n\n{_sentence(rnd, words, sep, 40)}\n")
+
+    summary = ["# Summary\n\n* [介绍](README.md)\n"]
+    # 上级页面编号，子页面放在以上级页面命名的目录中
+    parents = []
+    for n in range(1, pages):
+        # 随机进入下一级或返回上级，构造不同深度的目录
+        level = rnd.randint(0, min(len(parents), depth - 1))
+        parents = parents[:level]
+        href = "".join(f"c{x}/" for x in parents) + f"p{n}.md"
+        summary.append(f"{'  ' * level}* [页面 {n}]({href})\n")
+        parents.append(n)
+        _write_page(path, href, rnd, words, sep, page_size, code, math, mermaid, table, imports)
+    _write_page(path, "README.md", rnd, words, sep, page_size, code, math, mermaid, table, imports)
+
+    with open(os.path.join(path, "SUMMARY.md"), "w", encoding="utf-8") as f:
+        f.write("".join(summary))
+    return path
+
+
+def _sentence(rnd, words, sep, count):
+    text = []
+    for i in range(count):
+        word = rnd.choice(words)
+        r = rnd.random()
+        if r < 0.05:
+            word = f"**{word}**"
+        elif r < 0.08:
+            word = f"`{word}`"
+        elif r < 0.1:
+            word = f"[{word}](https://example.com/{i})"
+        text.append(word)
+    return sep.join(text) + "。"
+
+
+def _write_page(path, href, rnd, words, sep, page_size, code, math, mermaid, table, imports):
+    file = os.path.join(path, href)
+    os.makedirs(os.path.dirname(file), exist_ok=True)
+    root = os.path.relpath(path, os.path.dirname(file)).replace(os.sep, "/")
+    blocks = [f"# {rnd.choice(words)} {href}"]
+    size = 0
+    while size < page_size:
+        r = rnd.random()
+        if r < code:
+            block = "```python\n" + "\n".join(f"value_{i} = {i} * {i}" for i in range(rnd.randint(3, 15))) + "\n```"
+        elif r < code + math:
+            block = "$$\n\\sum_{i=0}^{n} x_i^2 = \\frac{a}{b}\n$$" if rnd.random() < 0.5 else \
+                f"{_sentence(rnd, words, sep, 10)} $x^{rnd.randint(2, 9)}$ {_sentence(rnd, words, sep, 5)}"
+        elif r < code + math + mermaid:
+            block = "```mermaid\ngraph TD\n" + "\n".join(f"A{i}-->B{i}" for i in range(rnd.randint(2, 6))) + "\n```"
+        elif r < code + math + mermaid + table:
+            row = lambda: "| " + " | ".join(rnd.choice(words) for _ in range(4)) + " |"
+            block = "\n".join([row(), "| --- | --- | --- | --- |"] + [row() for _ in range(rnd.randint(2, 8))])
+        elif r < code + math + mermaid + table + imports:
+            ext = "md" if rnd.random() < 0.5 else "py"
+            block = f'@import "{root}/code/{rnd.randint(0, 9)}.{ext}"'
+        elif r < code + math + mermaid + table + imports + 0.1:
+            block = f"## {rnd.choice(words)} {size}"
+        elif r < code + math + mermaid + table + imports + 0.15:
+            block = "\n".join(f"* {_sentence(rnd, words, sep, 8)}" for _ in range(rnd.randint(2, 6)))
+        else:
+            block = _sentence(rnd, words, sep, rnd.randint(20, 80))
+        blocks.append(block)
+        size += len(block)
+    with open(file, "w", encoding="utf-8") as f:
+        f.write("\n\n".join(blocks) + "\n")
@@ -0,0 +1,34 @@
+"""
+命令行参数
+"""
+import contextlib
+import io
+import unittest
+from unittest import mock
+
+from LsBook.utils.argument import cmd_argument
+
+
+def _parse(*argv):
+    with mock.patch("sys.argv", ["lsbook", *argv]):
+        return cmd_argument()
+
+
+class JobsArgumentTest(unittest.TestCase):
+    def test_default(self):
+        self.assertIsNone(_parse("-b").jobs)
+
+    def test_positive(self):
+        self.assertEqual(_parse("-b", "-j", "4").jobs, 4)
+
+    def test_rejects_less_than_one(self):
+        for jobs in ("0", "-2"):
+            with self.subTest(jobs=jobs), contextlib.redirect_stderr(io.StringIO()) as err:
+                with self.assertRaises(SystemExit) as cm:
+                    _parse("-b", f"-j{jobs}")
+                self.assertEqual(cm.exception.code, 2)
+                self.assertIn("-j", err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
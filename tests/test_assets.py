@@ -0,0 +1,68 @@
+"""
+共享资源库：安装包中的资源改变后，链接安装使用新资源
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from LsBook.utils.assets import install_assets
+
+
+def _write(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+class InstallAssetsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.src = os.path.join(self.tmp, "src")
+        self.store = os.path.join(self.tmp, "store")
+        _write(os.path.join(self.src, "search.js"), "old")
+        _write(os.path.join(self.src, "fonts", "a.woff"), "font")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _change_source(self):
+        path = os.path.join(self.src, "search.js")
+        stat = os.stat(path)
+        _write(path, "new content")
+        # 修改时间精度不足时也能区分
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def _assert_source_change_installed(self, mode):
+        out1 = os.path.join(self.tmp, "out1")
+        install_assets(self.src, out1, mode, self.store)
+        self.assertEqual(_read(os.path.join(out1, "search.js")), "old")
+
+        self._change_source()
+        out2 = os.path.join(self.tmp, "out2")
+        install_assets(self.src, out2, mode, self.store)
+        self.assertEqual(_read(os.path.join(out2, "search.js")), "new content")
+        self.assertEqual(_read(os.path.join(out2, "fonts", "a.woff")), "font")
+        # 已安装的输出目录重新安装后也使用新资源
+        install_assets(self.src, out1, mode, self.store)
+        self.assertEqual(_read(os.path.join(out1, "search.js")), "new content")
+
+    def test_link_picks_up_changed_assets(self):
+        self._assert_source_change_installed("link")
+
+    def test_symlink_picks_up_changed_assets(self):
+        self._assert_source_change_installed("symlink")
+
+    def test_unchanged_assets_reuse_store(self):
+        install_assets(self.src, os.path.join(self.tmp, "out1"), "link", self.store)
+        install_assets(self.src, os.path.join(self.tmp, "out2"), "link", self.store)
+        self.assertEqual(len(os.listdir(self.store)), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+"""
+性能测试基线更新
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from tests.benchmark.bench import update_baseline
+
+
+class UpdateBaselineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "baseline.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"calibration": 0.1, "results": {
+                "cjk": {"render": 1.0, "parse_summary": 2.0},
+                "deep": {"render": 3.0},
+            }}, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _baseline(self):
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_partial_update_keeps_unmeasured(self):
+        update_baseline(self.path, {"calibration": 0.2, "results": {"cjk": {"render": 4.0}}})
+        baseline = self._baseline()
+        self.assertEqual(baseline["calibration"], 0.1)
+        # 本次结果换算到基线的校准
+        self.assertAlmostEqual(baseline["results"]["cjk"]["render"], 2.0)
+        # 未测试的项目保持原值
+        self.assertEqual(baseline["results"]["cjk"]["parse_summary"], 2.0)
+        self.assertEqual(baseline["results"]["deep"]["render"], 3.0)
+
+    def test_full_update_regenerates(self):
+        results = {"cjk": {"render": 4.0, "parse_summary": 5.0}, "deep": {"render": 6.0}}
+        update_baseline(self.path, {"calibration": 0.2, "results": results})
+        self.assertEqual(self._baseline(), {"calibration": 0.2, "results": results})
+
+
+if __name__ == '__main__':
+    unittest.main()
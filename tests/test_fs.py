@@ -0,0 +1,138 @@
+"""
+暂存目录替换：两次重命名之间中断时不丢失输出目录；内容未变化的输出文件保留修改时间
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from LsBook.models.book import Book
+from LsBook.output.generateBook import generateBook
+from LsBook.utils.fs import stage_dir, swap_dir, write_file
+from LsBook.utils.pool import WorkerPool
+from tests.benchmark.synthetic import make_book
+
+
+def _write(path, text):
+    # 暂存目录与原目录硬链接到同一文件，需要替换而不是修改文件
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_file(path, text)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _generated(output):
+    """搜索索引与共享目录文件"""
+    return sorted(name for name in os.listdir(output) if name.startswith(("search_", "summary.")))
+
+
+class SwapDirTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp, "out")
+        _write(os.path.join(self.output, "index.html"), "old")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _stage_new(self):
+        staging = stage_dir(self.output)
+        _write(os.path.join(staging, "index.html"), "new")
+        return staging
+
+    def test_swap(self):
+        staging = self._stage_new()
+        swap_dir(staging, self.output)
+        self.assertEqual(_read(os.path.join(self.output, "index.html")), "new")
+        self.assertFalse(os.path.exists(staging))
+        self.assertFalse(os.path.exists(f"{self.output}.lsbook_old"))
+
+    def test_interrupted_between_renames(self):
+        """第二次重命名时中断：恢复原目录"""
+        staging = self._stage_new()
+        rename = os.rename
+
+        def interrupt(src, dst):
+            if src == staging:
+                raise KeyboardInterrupt
+            rename(src, dst)
+
+        with mock.patch("os.rename", side_effect=interrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                swap_dir(staging, self.output)
+        self.assertEqual(_read(os.path.join(self.output, "index.html")), "old")
+
+    def test_killed_between_renames(self):
+        """进程在两次重命名之间终止：下次生成时由 stage_dir 恢复原目录"""
+        staging = self._stage_new()
+        os.rename(self.output, f"{self.output}.lsbook_old")
+        self.assertFalse(os.path.exists(self.output))
+
+        staging = stage_dir(self.output)
+        self.assertEqual(_read(os.path.join(self.output, "index.html")), "old")
+        self.assertEqual(_read(os.path.join(staging, "index.html")), "old")
+        self.assertFalse(os.path.exists(f"{self.output}.lsbook_old"))
+
+    def test_stale_old_dir(self):
+        """替换完成后、删除旧目录前终止：下次生成时删除旧目录"""
+        staging = self._stage_new()
+        os.rename(self.output, f"{self.output}.lsbook_old")
+        os.rename(staging, self.output)
+
+        stage_dir(self.output)
+        self.assertEqual(_read(os.path.join(self.output, "index.html")), "new")
+        self.assertFalse(os.path.exists(f"{self.output}.lsbook_old"))
+
+
+class WriteFileTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "search_index.json")
+        write_file(self.path, "same")
+        os.utime(self.path, ns=(0, 0))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_skip_unchanged(self):
+        self.assertFalse(write_file(self.path, "same", skip_unchanged=True))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+
+    def test_write_changed(self):
+        self.assertTrue(write_file(self.path, "diff", skip_unchanged=True))
+        self.assertEqual(_read(self.path), "diff")
+        self.assertNotEqual(os.stat(self.path).st_mtime_ns, 0)
+
+
+class UnchangedOutputTest(unittest.TestCase):
+    def test_rebuild_keeps_mtimes(self):
+        """再次生成时搜索索引与共享目录内容未变化，不重新写入"""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        book_dir = make_book(os.path.join(tmp, "book"), pages=5, depth=1, page_size=200)
+        with open(os.path.join(book_dir, "book.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        config["shared_summary"] = True
+        with open(os.path.join(book_dir, "book.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        output = os.path.join(tmp, "out")
+        pool = WorkerPool("serial")
+        self.addCleanup(pool.shutdown)
+        generateBook(Book(book_dir, output, pool, None, force=True))
+        files = _generated(output)
+        for name in files:
+            os.utime(os.path.join(output, name), ns=(0, 0))
+
+        generateBook(Book(book_dir, output, pool, None, force=True))
+        self.assertEqual(files, _generated(output))
+        for name in files:
+            self.assertEqual(os.stat(os.path.join(output, name)).st_mtime_ns, 0, name)
+
+
+if __name__ == '__main__':
+    unittest.main()
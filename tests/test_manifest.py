@@ -0,0 +1,118 @@
+"""
+增量构建清单：搜索索引记录保存在缓存目录中，不随输出目录发布
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from LsBook.models.book import Book
+from LsBook.models.manifest import Manifest
+from LsBook.output.generateBook import generateBook
+from LsBook.renderer.search_index import page_record
+from LsBook.utils.pool import WorkerPool
+from tests.benchmark.synthetic import make_book
+
+
+class ManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, ".lsbook_manifest.json")
+        self.records_path = os.path.join(self.tmp, ".lsbook_search.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_round_trip(self):
+        manifest = Manifest(self.path, self.records_path)
+        manifest.update("a.md", "h1", page_record("a.html", "甲", "正文\t一"), {"x.png"}, 0.5)
+        manifest.save()
+
+        with open(self.path, encoding="utf-8") as f:
+            self.assertNotIn("terms", f.read())
+        loaded = Manifest(self.path, self.records_path)
+        self.assertTrue(loaded.load())
+        page = loaded.get("a.md", "h1")
+        self.assertEqual(page["assets_img"], ["x.png"])
+        self.assertIsNone(loaded.get("a.md", "h2"))
+        loaded.reuse("a.md", page)
+        self.assertEqual(loaded.search_records(), [page_record("a.html", "甲", "正文\t一")])
+
+    def test_missing_records(self):
+        manifest = Manifest(self.path, self.records_path)
+        manifest.update("a.md", "h1", page_record("a.html", "甲", ""), set())
+        manifest.save()
+        os.remove(self.records_path)
+        self.assertFalse(Manifest(self.path, self.records_path).load())
+
+
+class CacheDirTest(unittest.TestCase):
+    def test_not_in_output(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        book_dir = make_book(os.path.join(tmp, "book"), pages=5, depth=1, page_size=200)
+        output = os.path.join(tmp, "out")
+        pool = WorkerPool("serial")
+        self.addCleanup(pool.shutdown)
+        generateBook(Book(book_dir, output, pool, None))
+
+        self.assertFalse(any(name.startswith(".lsbook_") for name in os.listdir(output)))
+        cache_dir = f"{output}.lsbook_cache"
+        with open(os.path.join(cache_dir, ".lsbook_manifest.json"), encoding="utf-8") as f:
+            self.assertEqual(len(json.load(f)["pages"]), 5)
+        self.assertTrue(os.path.isfile(os.path.join(cache_dir, ".lsbook_search.jsonl")))
+
+        # 增量生成时未修改页面的搜索索引记录来自缓存
+        with open(os.path.join(output, "search_index.json"), encoding="utf-8") as f:
+            search_index = f.read()
+        generateBook(Book(book_dir, output, pool, None))
+        with open(os.path.join(output, "search_index.json"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), search_index)
+
+    def test_noop_rebuild_writes_nothing(self):
+        """页面均未修改：不重新生成搜索索引，不重写清单"""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        book_dir = make_book(os.path.join(tmp, "book"), pages=5, depth=1, page_size=200)
+        output = os.path.join(tmp, "out")
+        pool = WorkerPool("serial")
+        self.addCleanup(pool.shutdown)
+        generateBook(Book(book_dir, output, pool, None))
+        cache_dir = f"{output}.lsbook_cache"
+        files = [os.path.join(cache_dir, name) for name in os.listdir(cache_dir)] + \
+                [os.path.join(output, name) for name in os.listdir(output) if name.startswith("search_")]
+        for file in files:
+            os.utime(file, ns=(0, 0))
+
+        with mock.patch("LsBook.renderer.renderer_html.build_index", side_effect=AssertionError):
+            generateBook(Book(book_dir, output, pool, None))
+        for file in files:
+            self.assertEqual(os.stat(file).st_mtime_ns, 0, file)
+
+
+class FailedBuildTest(unittest.TestCase):
+    def test_manifest_saved_after_swap(self):
+        """生成在替换输出目录前失败：清单不记录未发布的页面，下次生成重新生成"""
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, True)
+        book_dir = make_book(os.path.join(tmp, "book"), pages=5, depth=1, page_size=200)
+        output = os.path.join(tmp, "out")
+        pool = WorkerPool("serial")
+        self.addCleanup(pool.shutdown)
+        generateBook(Book(book_dir, output, pool, None))
+
+        with open(os.path.join(book_dir, "p1.md"), "w", encoding="utf-8") as f:
+            f.write("# 修改后\n")
+        with mock.patch("LsBook.output.generateBook.prune_output", side_effect=OSError):
+            with self.assertRaises(OSError):
+                generateBook(Book(book_dir, output, pool, None))
+
+        generateBook(Book(book_dir, output, pool, None))
+        with open(os.path.join(output, "p1.html"), encoding="utf-8") as f:
+            self.assertIn("修改后", f.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+"""
+markdown 解析
+"""
+import unittest
+
+from LsBook.mistletoe_renderers import html_renderer
+
+
+def _html(page):
+    return html_renderer(page)[1]
+
+
+class ListTest(unittest.TestCase):
+    def test_ascii_ordered_list(self):
+        self.assertIn("<ol>", _html("1. 第一\n2. 第二\n"))
+
+    def test_full_width_ordered_list(self):
+        html = _html("１. 第一\n２. 第二\n")
+        self.assertIn("<ol>", html)
+        self.assertEqual(html.count("<li>"), 2)
+        self.assertNotIn("<p>１.", html)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+"""
+任务执行器
+"""
+import unittest
+
+from LsBook.utils import pool
+from LsBook.utils.pool import AUTO_SERIAL_BYTES, AUTO_SERIAL_PAGES, WorkerPool
+
+
+def _noop(*args):
+    pass
+
+
+class AutoBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool("auto", 4)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_small_then_large(self):
+        self.pool.start("key", _noop, pages=1, size=1)
+        self.assertEqual(self.pool._current, "serial")
+        self.assertEqual(self.pool.workers, 1)
+
+        expected = "thread" if pool.is_free_threaded() else "process"
+        self.assertEqual(self.pool.choose(AUTO_SERIAL_PAGES * 100, AUTO_SERIAL_BYTES * 1000), expected)
+        self.pool.start("key", _noop, pages=AUTO_SERIAL_PAGES * 100, size=AUTO_SERIAL_BYTES * 1000)
+        self.assertEqual(self.pool._current, expected)
+        self.assertEqual(self.pool.workers, 4)
+
+    def test_single_worker_stays_serial(self):
+        single = WorkerPool("auto", 1)
+        self.assertEqual(single.choose(AUTO_SERIAL_PAGES * 100, AUTO_SERIAL_BYTES * 1000), "serial")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+"""
+任务耗时估计
+"""
+import unittest
+
+from LsBook.utils.schedule import estimate_costs
+
+
+class EstimateCostsTest(unittest.TestCase):
+    def test_rate_from_history(self):
+        self.assertEqual(estimate_costs([100, 200, 300], [1.0, None, 2.0]), [1.0, 1.5, 2.0])
+
+    def test_zero_cost_is_known(self):
+        self.assertEqual(estimate_costs([100, 100], [0.0, 2.0]), [0.0, 2.0])
+
+    def test_no_history(self):
+        self.assertEqual(estimate_costs([100, 200], [None, None]), [100, 200])
+
+    def test_no_usable_rate(self):
+        # 有历史耗时的页面大小为 0：不换算，全部以输入大小估计
+        self.assertEqual(estimate_costs([0, 200], [1.0, None]), [0, 200])
+        self.assertEqual(estimate_costs([100, 200], [0.0, None]), [100, 200])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+搜索索引
+"""
+import bisect
+import json
+import unittest
+
+from LsBook.renderer.search_index import build_index, page_record, shard_index, tokenize
+
+
+def _docs(index, term):
+    """包含词的页码"""
+    posting = index["terms"].get(term, [])
+    docs, doc = [], 0
+    for delta in posting[::2]:
+        doc += delta
+        docs.append(doc)
+    return docs
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_words(self):
+        self.assertEqual(list(tokenize("Hello, World_x 1.5")), ["hello", "world_x", "1", "5"])
+
+    def test_long_words_skipped(self):
+        self.assertEqual(list(tokenize("a" * 33 + " b")), ["b"])
+
+    def test_cjk_unigrams_and_bigrams(self):
+        self.assertEqual(list(tokenize("测试用例")), ["测", "试", "用", "例", "测试", "试用", "用例"])
+        self.assertEqual(list(tokenize("好")), ["好"])
+
+
+class BuildIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = build_index([
+            page_record("a.html", "页面甲", "软件测试。好"),
+            page_record("b.html", "页面乙", "Software testing 测量"),
+        ])
+
+    def test_single_cjk_char_at_end_of_run(self):
+        # 单字查询：只出现在词尾或单字成段的字也能找到
+        self.assertEqual(_docs(self.index, "试"), [0])
+        self.assertEqual(_docs(self.index, "好"), [0])
+        self.assertEqual(_docs(self.index, "测"), [0, 1])
+
+    def test_bigrams(self):
+        self.assertEqual(_docs(self.index, "测试"), [0])
+        self.assertEqual(_docs(self.index, "测量"), [1])
+        self.assertEqual(_docs(self.index, "software"), [1])
+
+    def test_pages(self):
+        self.assertEqual(self.index["pages"][0], ["a.html", "页面甲", "软件测试。好"])
+
+
+class ShardIndexTest(unittest.TestCase):
+    def test_every_term_in_its_shard(self):
+        records = [page_record(f"p{i}.html", f"页面 {i}", f"内容{i} word{i} 第{i}页") for i in range(40)]
+        index = build_index(records)
+        manifest, shards = shard_index(index, page_size=7, shard_size=200)
+        manifest = json.loads(manifest)
+
+        self.assertEqual(manifest["count"], 40)
+        self.assertEqual(len(manifest["pages"]), 6)
+        self.assertGreater(len(manifest["terms"]), 1)
+        self.assertEqual(manifest["terms"][0][0], "")
+        starts = [start for start, _ in manifest["terms"]]
+        for term, posting in index["terms"].items():
+            name = manifest["terms"][bisect.bisect_right(starts, term) - 1][1]
+            self.assertEqual(json.loads(shards[name])[term], posting)
+        pages = [page for name in manifest["pages"] for page in json.loads(shards[name])]
+        self.assertEqual(pages, index["pages"])
+
+
+if __name__ == '__main__':
+    unittest.main()
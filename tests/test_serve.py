@@ -0,0 +1,84 @@
+"""
+预览服务：页面在锁外生成，不阻塞其它请求；缓存命中时不重新分析引入文件
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from LsBook.models.book import Book
+from LsBook.output import serveBook
+from LsBook.parse.parse_summary import is_summary_exist
+from LsBook.utils.path import process_input_output_path
+from tests.benchmark.synthetic import make_book
+
+
+class BookPreviewTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        book_dir = make_book(os.path.join(self.tmp, "book"), pages=5, depth=1, page_size=200)
+        book = Book(book_dir, os.path.join(self.tmp, "out"), None, "")
+        process_input_output_path(book)
+        is_summary_exist(book)
+        self.preview = serveBook.BookPreview(book)
+        self.preview.reload()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def test_render_does_not_block_requests(self):
+        rendering = threading.Event()
+        release = threading.Event()
+        render_page = serveBook.render_page
+
+        def slow_render_page(*args):
+            rendering.set()
+            self.assertTrue(release.wait(10))
+            return render_page(*args)
+
+        results = {}
+        with mock.patch.object(serveBook, "render_page", side_effect=slow_render_page):
+            thread = threading.Thread(target=lambda: results.setdefault("page", self.preview.page("p1.html")))
+            thread.start()
+            self.assertTrue(rendering.wait(10))
+            # 页面生成期间，其它请求不等待
+            self.assertIsNone(self.preview.page("lsbook/lsbook.min.js"))
+            self.assertIsNotNone(self.preview.search_index())
+            release.set()
+            thread.join(10)
+
+        page, etag = results["page"]
+        self.assertIn("p1".encode("utf-8"), page)
+        # 生成结果写入缓存
+        self.assertEqual(self.preview.page("p1.html"), (page, etag))
+
+    def test_reload_during_render_discards_result(self):
+        render_page = serveBook.render_page
+
+        def reload_render_page(*args):
+            self.preview.reload()
+            return render_page(*args)
+
+        with mock.patch.object(serveBook, "render_page", side_effect=reload_render_page):
+            self.assertIsNotNone(self.preview.page("p1.html"))
+        self.assertNotIn("p1.html", self.preview._cache)
+
+    def test_cache_hit_only_stats_files(self):
+        first = self.preview.page("p1.html")
+        with mock.patch.object(serveBook, "import_dependencies", side_effect=AssertionError), \
+                mock.patch.object(serveBook, "render_page", side_effect=AssertionError):
+            self.assertEqual(self.preview.page("p1.html"), first)
+
+    def test_source_change_invalidates(self):
+        self.preview.page("p1.html")
+        source = os.path.join(self.preview.book.book_path, "p1.md")
+        with open(source, "w", encoding="utf-8") as f:
+            f.write("# 修改后的页面内容\n")
+        page, _ = self.preview.page("p1.html")
+        self.assertIn("修改后的页面内容".encode("utf-8"), page)
+
+
+if __name__ == '__main__':
+    unittest.main()
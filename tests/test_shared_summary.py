@@ -0,0 +1,89 @@
+"""
+共享目录：嵌套页面加载目录片段后与内联目录一致
+"""
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from LsBook.models.book import Book
+from LsBook.output.generateBook import generateBook
+from LsBook.utils.pool import WorkerPool
+from tests.benchmark.synthetic import make_book
+
+SUMMARY_JS = os.path.join(os.path.dirname(__file__), os.pardir, "LsBook", "assets", "lsbook", "summary.js")
+
+# 在 node 中加载 summary.js，输出目录片段转换后的目录 html
+_render_js = """
+const fs = require('fs');
+global.lsbook = {events: {bind() {}}};
+global.$ = function () {};
+eval(fs.readFileSync(process.argv[1], 'utf8'));
+process.stdout.write(lsbook.summary.render(fs.readFileSync(process.argv[2], 'utf8'), process.argv[3]));
+"""
+
+
+def _build(book_dir, out_dir, shared):
+    with open(os.path.join(book_dir, "book.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    config["shared_summary"] = shared
+    with open(os.path.join(book_dir, "book.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f)
+    pool = WorkerPool("serial")
+    try:
+        generateBook(Book(book_dir, out_dir, pool, None, force=True))
+    finally:
+        pool.shutdown()
+
+
+class SharedSummaryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        book_dir = make_book(os.path.join(cls.tmp, "book"), pages=20, depth=3, page_size=200)
+        cls.inline = os.path.join(cls.tmp, "inline")
+        cls.shared = os.path.join(cls.tmp, "shared")
+        _build(book_dir, cls.inline, False)
+        _build(book_dir, cls.shared, True)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp, ignore_errors=True)
+
+    def _nested_page(self):
+        for root, _, files in os.walk(self.shared):
+            for file in files:
+                path = os.path.relpath(os.path.join(root, file), self.shared).replace(os.sep, "/")
+                if path.count("/") >= 2 and path.endswith(".html"):
+                    return path
+        self.fail("没有嵌套页面")
+
+    def _read(self, *path):
+        with open(os.path.join(*path), encoding="utf-8") as f:
+            return f.read()
+
+    def test_placeholder(self):
+        page = self._read(self.shared, self._nested_page())
+        name, level = re.search(r'data-summary="([^"]+)" data-level="([^"]+)"', page).groups()
+        self.assertRegex(name, r"^summary\.[0-9a-f]{8}\.html$")
+        self.assertTrue(os.path.isfile(os.path.join(self.shared, name)))
+        self.assertIn('lsbook/summary.js"', page)
+        self.assertNotIn("summary.js", self._read(self.inline, self._nested_page()))
+
+    @unittest.skipUnless(shutil.which("node"), "需要 node")
+    def test_nested_page_matches_inline(self):
+        href = self._nested_page()
+        page = self._read(self.shared, href)
+        name, level = re.search(r'data-summary="([^"]+)" data-level="([^"]+)"', page).groups()
+        summary = subprocess.run(["node", "-e", _render_js, SUMMARY_JS, os.path.join(self.shared, name), level],
+                                 check=True, stdout=subprocess.PIPE).stdout.decode("utf-8")
+        self.assertIn(f'class="chapter active" data-level="{level}" data-path="{os.path.basename(href)}"', summary)
+        self.assertIn('href="../', summary)
+        self.assertIn(summary, self._read(self.inline, href))
+
+
+if __name__ == '__main__':
+    unittest.main()
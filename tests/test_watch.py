@@ -0,0 +1,83 @@
+"""
+监视模式：重新生成出错时继续监视，清理被替换的内容哈希文件
+"""
+import fnmatch
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from LsBook.models.book import Book
+from LsBook.output.generateBook import generateBook
+from LsBook.output.watchBook import BookWatcher, watchBook
+from LsBook.renderer.renderer_html import HASHED_OUTPUTS
+from LsBook.utils.pool import WorkerPool
+from tests.benchmark.synthetic import make_book
+
+
+class WatchBookTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.book_dir = make_book(os.path.join(self.tmp, "book"), pages=5, depth=1, page_size=200)
+        with open(os.path.join(self.book_dir, "book.json"), encoding="utf-8") as f:
+            config = json.load(f)
+        config["shared_summary"] = True
+        with open(os.path.join(self.book_dir, "book.json"), "w", encoding="utf-8") as f:
+            json.dump(config, f)
+        self.output = os.path.join(self.tmp, "out")
+        self.pool = WorkerPool("serial")
+        self.book = Book(self.book_dir, self.output, self.pool, None, force=True)
+        generateBook(self.book)
+
+    def tearDown(self):
+        self.pool.shutdown()
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write_page(self, text):
+        with open(os.path.join(self.book_dir, "p1.md"), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_failed_rebuild_keeps_watching(self):
+        # 每次轮询前执行一步：写入引入不存在文件的页面，修正页面，退出
+        steps = [
+            lambda: self._write_page('# 错误\n\n@import "missing.py"\n'),
+            lambda: self._write_page("# 已修正\n"),
+            mock.Mock(side_effect=KeyboardInterrupt),
+        ]
+        rebuild_errors = []
+
+        with mock.patch("LsBook.output.watchBook.time.sleep", side_effect=lambda _: steps.pop(0)()), \
+                mock.patch("LsBook.output.watchBook.logging.exception", side_effect=rebuild_errors.append):
+            watchBook(self.book, interval=0)
+
+        self.assertEqual(len(rebuild_errors), 1)
+        self.assertEqual(steps, [])
+        with open(os.path.join(self.output, "p1.html"), encoding="utf-8") as f:
+            self.assertIn("已修正", f.read())
+
+    def _hashed_files(self):
+        return sorted(name for name in os.listdir(self.output)
+                      if any(fnmatch.fnmatch(name, pattern) for pattern in HASHED_OUTPUTS))
+
+    def test_rebuild_prunes_superseded_hashed_files(self):
+        watcher = BookWatcher(self.book)
+        before = self._hashed_files()
+        self._write_page("# 新内容\n\n新的搜索词\n")
+        summary_path = os.path.join(self.book_dir, "SUMMARY.md")
+        with open(summary_path, encoding="utf-8") as f:
+            summary = f.read()
+        with open(summary_path, "w", encoding="utf-8") as f:
+            f.write(summary.replace("[页面 1]", "[新页面 1]"))
+        watcher.rebuild(watcher.poll())
+
+        after = self._hashed_files()
+        self.assertNotEqual(before, after)
+        self.assertEqual(len([name for name in after if name.startswith("summary.")]), 1)
+        self.assertEqual({os.path.join(self.output, name) for name in after},
+                         {os.path.normpath(file) for file in self.book.hashed_outputs})
+
+
+if __name__ == '__main__':
+    unittest.main()